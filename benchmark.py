@@ -0,0 +1,275 @@
+"""
+Pirate Browser Benchmark
+Drives AutoManager cycles, chatbot polls and the member tracker against the
+mock game server (mock_server.py) and reports throughput, latency and memory
+for N accounts × M vessels.
+
+    python benchmark.py --accounts 10 --vessels 50 --cycles 20 --latency 30
+
+The mock server runs in its own process so it does not share the GIL with
+the code being measured. Game calls use the direct API client; bunker reads
+and the member tracker's page scripts go through a fake driver that turns
+them into plain HTTP calls.
+"""
+
+import argparse
+import concurrent.futures
+import contextlib
+import io
+import json
+import os
+import re
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+from pathlib import Path
+
+# Keep benchmark accounts, settings and fleet caches out of the real data folder
+os.environ["APPDATA"] = tempfile.mkdtemp(prefix="pirate-bench-")
+sys.path.insert(0, str(Path(__file__).parent))
+
+import pirate_browser as pb
+import member_tracker as mt
+from mock_server import SESSION_COOKIE
+
+# ~10% wide latency buckets from 1 ms to ~36 s, for tighter percentiles than
+# the default LATENCY_BUCKETS
+BENCH_BUCKETS = tuple(0.001 * 1.1 ** i for i in range(110))
+
+BENCH_SETTINGS = {
+    "fuel_mode":          "basic",
+    "fuel_threshold":     1000,
+    "fuel_min_cash":      0,
+    "co2_mode":           "basic",
+    "co2_threshold":      30,
+    "co2_min_cash":       0,
+    "auto_depart":        True,
+    "api_direct":         True,
+    "depart_concurrency": 4,
+    "depart_rate":        0,      # no pacing: measure the client, not the limiter
+}
+
+
+# ── FAKE BROWSER ──────────────────────────────────────────────────────────────
+class FakeDriver:
+    """Stands in for a WebDriver: the page scripts we need become HTTP calls."""
+
+    def __init__(self, base_url: str, session: str):
+        self.base_url = base_url
+        self.session  = session
+
+    def _post(self, path: str, payload: dict) -> dict:
+        req = urllib.request.Request(
+            self.base_url + path, json.dumps(payload).encode(),
+            {"Content-Type": "application/json", "Cookie": f"{SESSION_COOKIE}={self.session}"})
+        try:
+            with urllib.request.urlopen(req, timeout=pb.API_TIMEOUT) as r:
+                return json.loads(r.read() or b"{}")
+        except Exception:
+            return {}
+
+    def execute_script(self, js: str, *args):
+        if "pbReadBunker" in js:          # the page's user store
+            return self._post("mock/bunker", {}).get("data")
+        m = re.search(r"/api/([\w/-]+)", js)
+        if m and "get-alliance-members" in js:   # member_tracker.fetch_members
+            body = json.loads(args[0]) if args else {}
+            return (self._post(m.group(1), body).get("data") or {}).get("members", [])
+        return None
+
+
+class FakeShared:
+    """Just enough of SharedBrowser for one BrowserController."""
+
+    script_timeout = pb.SCRIPT_TIMEOUT
+
+    def __init__(self, driver: FakeDriver):
+        self.driver = driver
+
+    def run(self, tab, fn, budget=None):
+        return fn(self.driver)
+
+    def set_script_timeout(self, seconds):
+        pass
+
+
+def make_controller(base_url: str, aid: str) -> pb.BrowserController:
+    c = pb.BrowserController(lambda m: None, aid, pool=None)
+    c.shared, c.tab_handle, c.ready = FakeShared(FakeDriver(base_url, aid)), aid, True
+    c.direct = pb.GameApiClient(base_url, {SESSION_COOKIE: aid})
+    return c
+
+
+# ── MOCK SERVER PROCESS ───────────────────────────────────────────────────────
+def start_mock(args) -> tuple:
+    cmd = [sys.executable, str(Path(__file__).parent / "mock_server.py"), "--port", "0",
+           "--vessels", str(args.vessels), "--latency", str(args.latency),
+           "--jitter", str(args.jitter), "--error-rate", str(args.error_rate),
+           "--members", str(args.members), "--chat-rate", str(args.chat_rate),
+           "--seed", "1"]
+    proc = subprocess.Popen(cmd, stdout=subprocess.PIPE, text=True, encoding="utf-8")
+    line = proc.stdout.readline()
+    m    = re.search(r"(http://\S+)", line)
+    if not m:
+        proc.kill()
+        raise RuntimeError(f"mock server did not start: {line!r}")
+    return proc, m.group(1)
+
+
+# ── MEASUREMENT ───────────────────────────────────────────────────────────────
+def percentile(values: list, p: float):
+    if not values:
+        return None
+    values = sorted(values)
+    return values[min(len(values) - 1, int(round(p / 100 * (len(values) - 1))))]
+
+def hist_percentile(series: dict, buckets: list, p: float):
+    """Percentile estimated from a METRICS histogram (linear within a bucket)."""
+    total = series["count"]
+    if not total:
+        return None
+    rank, acc, lo = p / 100 * total, 0, 0.0
+    for hi, c in zip(list(buckets) + [buckets[-1]], series["counts"]):
+        if c and acc + c >= rank:
+            return lo + (hi - lo) * (rank - acc) / c
+        acc, lo = acc + c, hi
+    return buckets[-1]
+
+def peak_rss_mb():
+    try:
+        import resource
+    except ImportError:   # Windows
+        return None
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss / (1024 * 1024) if sys.platform == "darwin" else rss / 1024
+
+def summary(name: str, durations: list, wall: float) -> dict:
+    return {"name": name, "runs": len(durations),
+            "per_sec": len(durations) / wall if wall else None,
+            "p50_ms": (percentile(durations, 50) or 0) * 1000,
+            "p99_ms": (percentile(durations, 99) or 0) * 1000}
+
+
+# ── SCENARIOS ─────────────────────────────────────────────────────────────────
+def bench_cycles(base_url: str, accounts: int, cycles: int) -> dict:
+    managers = []
+    for i in range(accounts):
+        aid = f"bench{i:03d}"
+        pb.STORE.set_settings(aid, BENCH_SETTINGS, persist=False)
+        managers.append(pb.AutoManager(make_controller(base_url, aid), aid, lambda m: None,
+                                       on_bunker=lambda d: None, on_prices=lambda d: None,
+                                       on_depart=lambda d: None))
+
+    def run(manager):
+        out = []
+        for _ in range(cycles):
+            t0 = time.perf_counter()
+            manager._cycle()
+            out.append(time.perf_counter() - t0)
+        return out
+
+    t0 = time.perf_counter()
+    with concurrent.futures.ThreadPoolExecutor(accounts) as ex:
+        durations = [d for ds in ex.map(run, managers) for d in ds]
+    wall = time.perf_counter() - t0
+    for m in managers:
+        if m.browser.direct:
+            m.browser.direct.close()
+    return summary(f"AutoManager._cycle × {accounts} accounts", durations, wall)
+
+def bench_chat(base_url: str, polls: int) -> dict:
+    bot = pb.AllianceChatBot(make_controller(base_url, "benchbot"), mt.ALLIANCE_ID,
+                             bot_user_id=1, log_fn=lambda m: None,
+                             on_chat_message=lambda e: None)
+    bot._last_ts = 0
+    durations = []
+    t0 = time.perf_counter()
+    for _ in range(polls):
+        t = time.perf_counter()
+        bot._poll()
+        durations.append(time.perf_counter() - t)
+    return summary("AllianceChatBot._poll", durations, time.perf_counter() - t0)
+
+def bench_tracker(base_url: str, runs: int) -> dict:
+    driver, durations = FakeDriver(base_url, "tracker"), []
+    t0 = time.perf_counter()
+    for _ in range(runs):
+        t = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            mt.fetch_all_stats(driver)
+        durations.append(time.perf_counter() - t)
+    return summary("member_tracker.fetch_all_stats", durations, time.perf_counter() - t0)
+
+def endpoint_latencies() -> list:
+    snap   = pb.METRICS.export()
+    merged = {}
+    for s in snap["metrics"].get("pirate_api_request_seconds", []):
+        m = merged.setdefault(s["labels"]["endpoint"],   # one histogram per endpoint across accounts
+                              {"count": 0, "counts": [0] * len(s["counts"])})
+        m["count"] += s["count"]
+        m["counts"] = [a + b for a, b in zip(m["counts"], s["counts"])]
+    return [(ep, m["count"], hist_percentile(m, snap["buckets"], 50) or 0,
+             hist_percentile(m, snap["buckets"], 99) or 0) for ep, m in sorted(merged.items())]
+
+
+# ── ENTRY POINT ───────────────────────────────────────────────────────────────
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Pirate Browser benchmark (mock game server)")
+    ap.add_argument("--accounts", type=int, default=5)
+    ap.add_argument("--vessels", type=int, default=20, help="vessels per account")
+    ap.add_argument("--cycles", type=int, default=10, help="AutoManager cycles per account")
+    ap.add_argument("--chat-polls", type=int, default=10)
+    ap.add_argument("--tracker-runs", type=int, default=1,
+                    help="member_tracker.fetch_all_stats runs (each sleeps 2s by design)")
+    ap.add_argument("--latency", type=float, default=20, help="mock latency per request (ms)")
+    ap.add_argument("--jitter", type=float, default=5, help="mock latency std deviation (ms)")
+    ap.add_argument("--error-rate", type=float, default=0.0)
+    ap.add_argument("--members", type=int, default=40)
+    ap.add_argument("--chat-rate", type=float, default=0.5)
+    ap.add_argument("--url", help="use an already running mock server instead of starting one")
+    ap.add_argument("--json", type=Path, help="also write the results here")
+    args = ap.parse_args(argv)
+
+    pb.METRICS = pb.Metrics(BENCH_BUCKETS)
+    proc = None
+    if args.url:
+        base_url = args.url
+    else:
+        proc, base_url = start_mock(args)
+    print(f"⚙ {args.accounts} accounts × {args.vessels} vessels against {base_url} "
+          f"({args.latency:g}±{args.jitter:g} ms, {args.error_rate:.0%} errors)")
+    try:
+        results = [bench_cycles(base_url, args.accounts, args.cycles)]
+        if args.chat_polls:
+            results.append(bench_chat(base_url, args.chat_polls))
+        if args.tracker_runs:
+            results.append(bench_tracker(base_url, args.tracker_runs))
+    finally:
+        if proc:
+            proc.terminate()
+            proc.wait(5)
+
+    print(f"\n{'scenario':<44}{'runs':>6}{'per sec':>10}{'p50 ms':>10}{'p99 ms':>10}")
+    for r in results:
+        print(f"{r['name']:<44}{r['runs']:>6}{r['per_sec']:>10.2f}"
+              f"{r['p50_ms']:>10.1f}{r['p99_ms']:>10.1f}")
+    endpoints = endpoint_latencies()
+    print(f"\n{'endpoint':<44}{'calls':>6}{'p50 ms':>10}{'p99 ms':>10}")
+    for ep, n, p50, p99 in endpoints:
+        print(f"{ep:<44}{n:>6}{p50 * 1000:>10.1f}{p99 * 1000:>10.1f}")
+    rss = peak_rss_mb()
+    print(f"\nPeak RSS: {rss:.1f} MB" if rss is not None else "\nPeak RSS: n/a on this platform")
+    if args.json:
+        args.json.write_text(json.dumps({
+            "config":    vars(args) | {"json": str(args.json), "url": base_url},
+            "results":   results,
+            "endpoints": [{"endpoint": ep, "calls": n, "p50_ms": p50 * 1000, "p99_ms": p99 * 1000}
+                          for ep, n, p50, p99 in endpoints],
+            "peak_rss_mb": rss,
+        }, indent=2), encoding="utf-8")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
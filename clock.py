@@ -0,0 +1,185 @@
+"""
+Clock service shared by Pirate Browser and the member tracker.
+
+Game logic asks this module for the time and for sleeps instead of calling
+time/datetime directly. The real clock is the default. Soak tests and
+replays install a SimClock, which jumps straight to the next sleeper's
+deadline so a simulated month passes in minutes:
+
+    import clock
+    sim = clock.install(clock.SimClock(start=1_760_000_000))
+"""
+
+import asyncio
+import datetime
+import heapq
+import itertools
+import threading
+import time as _time
+
+
+class Clock:
+    """The real wall clock."""
+
+    def time(self) -> float:
+        return _time.time()
+
+    def now(self, tz=None) -> datetime.datetime:
+        """Like datetime.now(tz): naive local time unless a tz is given."""
+        return datetime.datetime.fromtimestamp(self.time(), tz)
+
+    def sleep(self, seconds: float):
+        if seconds > 0:
+            _time.sleep(seconds)
+
+    async def asleep(self, seconds: float):
+        await asyncio.sleep(max(0.0, seconds))
+
+    async def wait_for(self, aw, timeout: float):
+        """asyncio.wait_for measured on this clock; raises TimeoutError."""
+        return await asyncio.wait_for(aw, timeout)
+
+
+class SimClock(Clock):
+    """Virtual time that jumps straight to the next sleeper's deadline.
+
+    Every sleep (thread or asyncio task) is queued on a heap. A driver
+    thread wakes the earliest sleeper, moving the time to its deadline, as
+    soon as the previous one has gone back to sleep — or after `settle`
+    real seconds if it did something else. Work between sleeps takes no
+    virtual time.
+    """
+
+    def __init__(self, start: float = None, settle: float = 0.1):
+        self.settle    = settle
+        self.wakes     = 0       # sleepers woken so far
+        self._now      = _time.time() if start is None else float(start)
+        self._cond     = threading.Condition()
+        self._heap     = []      # [deadline, seq, wake]; wake is None once cancelled
+        self._seq      = itertools.count()
+        self._live     = 0       # queued, not cancelled
+        self._activity = 0       # bumped by every new sleeper
+        self._driver   = None
+
+    def time(self) -> float:
+        with self._cond:
+            return self._now
+
+    def set_time(self, ts: float):
+        """Move the clock forward to `ts` (replays follow recorded times)."""
+        with self._cond:
+            self._now = max(self._now, float(ts))
+
+    def advance(self, seconds: float):
+        with self._cond:
+            self._now += max(0.0, seconds)
+
+    def pending(self) -> int:
+        with self._cond:
+            return self._live
+
+    # ── Sleepers ──────────────────────────────────────────────────────────────
+    def _schedule(self, seconds: float, wake) -> list:
+        with self._cond:
+            entry = [self._now + max(0.0, seconds), next(self._seq), wake]
+            heapq.heappush(self._heap, entry)
+            self._live     += 1
+            self._activity += 1
+            if self._driver is None:
+                self._driver = threading.Thread(target=self._drive, daemon=True,
+                                                 name="sim-clock")
+                self._driver.start()
+            self._cond.notify_all()
+            return entry
+
+    def _cancel(self, entry: list):
+        with self._cond:
+            if entry[2] is not None:
+                entry[2] = None
+                self._live -= 1
+                self._cond.notify_all()
+
+    def sleep(self, seconds: float):
+        woken = threading.Event()
+        self._schedule(seconds, woken.set)
+        woken.wait()
+
+    async def asleep(self, seconds: float):
+        loop = asyncio.get_running_loop()
+        fut  = loop.create_future()
+        def wake():
+            loop.call_soon_threadsafe(lambda: fut.done() or fut.set_result(None))
+        entry = self._schedule(seconds, wake)
+        try:
+            await fut
+        finally:
+            self._cancel(entry)   # a cancelled task leaves the heap
+
+    async def wait_for(self, aw, timeout: float):
+        if timeout is None:
+            return await aw
+        task  = asyncio.ensure_future(aw)
+        timer = asyncio.ensure_future(self.asleep(timeout))
+        try:
+            await asyncio.wait({task, timer}, return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            for f in (task, timer):
+                if not f.done():
+                    f.cancel()
+        if task.done() and not task.cancelled():
+            return task.result()
+        raise TimeoutError
+
+    # ── Driver ────────────────────────────────────────────────────────────────
+    def _drive(self):
+        quiet = True   # wait for start-up (or a slow sleeper) to settle first
+        while True:
+            with self._cond:
+                while True:
+                    self._cond.wait_for(lambda: self._live)
+                    if not quiet:
+                        break
+                    seen = self._activity
+                    self._cond.wait(self.settle)
+                    if seen == self._activity:
+                        break
+                while self._heap[0][2] is None:
+                    heapq.heappop(self._heap)
+                entry = heapq.heappop(self._heap)
+                wake, entry[2] = entry[2], None
+                self._live -= 1
+                self._now   = max(self._now, entry[0])
+                self.wakes += 1
+                before      = self._live
+            wake()
+            # Let the woken sleeper run until it queues its next sleep
+            with self._cond:
+                quiet = not self._cond.wait_for(lambda: self._live > before, self.settle)
+
+
+# ── MODULE API ────────────────────────────────────────────────────────────────
+_clock: Clock = Clock()
+
+def install(c: Clock) -> Clock:
+    """Make `c` the clock for everything that uses this module; returns it."""
+    global _clock
+    _clock = c
+    return c
+
+def current() -> Clock:
+    return _clock
+
+def time() -> float:
+    return _clock.time()
+
+def now(tz=None) -> datetime.datetime:
+    return _clock.now(tz)
+
+def sleep(seconds: float):
+    _clock.sleep(seconds)
+
+async def asleep(seconds: float):
+    await _clock.asleep(seconds)
+
+async def wait_for(aw, timeout: float):
+    return await _clock.wait_for(aw, timeout)
@@ -13,10 +13,13 @@ import datetime
 import sys
 import hashlib
 import struct
+import sqlite3
 import urllib.request
 import urllib.error
 from pathlib import Path
 
+import clock   # real time by default; soak tests install a SimClock
+
 # ── CONFIG ────────────────────────────────────────────────────────────────────
 CHECK_INTERVAL_MINUTES = 60
 SPREADSHEET_ID         = "1uOPfGe8qk5asPCS2ozJNKdAycCg8Z_XTKZR93b8JTfI"
@@ -43,14 +46,37 @@ def get_data_dir() -> Path:
     app_data = os.environ.get("APPDATA")
     return Path(app_data) / "PirateBrowser" if app_data else Path(__file__).parent
 
-def load_credentials():
-    data_dir      = get_data_dir()
+def _read_accounts(data_dir: Path):
+    """Accounts and stored credentials from Pirate Browser's database.
+
+    Returns (accounts, creds_for) where creds_for(aid) gives the stored
+    credential record as a dict, or None. Falls back to the pre-database
+    accounts.json / .creds_<id> files.
+    """
+    db_file = data_dir / "pirate_browser.db"
+    if db_file.exists():
+        db = sqlite3.connect(f"file:{db_file}?mode=ro", uri=True)
+        try:
+            accounts = [{"id": i, "name": n} for i, n in
+                        db.execute("SELECT id, name FROM accounts ORDER BY position")]
+            creds = {aid: {"backend": b, "email": e, "password": p} for aid, b, e, p in
+                     db.execute("SELECT account_id, backend, email, password FROM credentials")}
+        finally:
+            db.close()
+        return accounts, creds.get
     accounts_file = data_dir / "accounts.json"
     if not accounts_file.exists():
-        print("❌ No Pirate Browser accounts found."); sys.exit(1)
-    accounts = json.loads(accounts_file.read_text(encoding="utf-8"))
+        return [], lambda aid: None
+    def creds_for(aid):
+        creds_file = data_dir / f".creds_{aid}"
+        return json.loads(creds_file.read_text(encoding="utf-8")) if creds_file.exists() else None
+    return json.loads(accounts_file.read_text(encoding="utf-8")), creds_for
+
+def load_credentials():
+    data_dir            = get_data_dir()
+    accounts, creds_for = _read_accounts(data_dir)
     if not accounts:
-        print("❌ No accounts saved."); sys.exit(1)
+        print("❌ No Pirate Browser accounts found."); sys.exit(1)
     if len(accounts) > 1:
         print("Multiple accounts:")
         for i, a in enumerate(accounts):
@@ -61,11 +87,10 @@ def load_credentials():
             account = accounts[0]
     else:
         account = accounts[0]
-    aid        = account["id"]
-    creds_file = data_dir / f".creds_{aid}"
-    if not creds_file.exists():
+    aid  = account["id"]
+    data = creds_for(aid)
+    if not data:
         print(f"❌ No saved credentials for '{account['name']}'"); sys.exit(1)
-    data = json.loads(creds_file.read_text(encoding="utf-8"))
     xkey = b"PirateBrowserKey1234567890ABCDEF"
     def deobf(t):
         d = base64.b64decode(t.encode())
@@ -154,10 +179,10 @@ def fetch_members(driver, mode="24h") -> list:
 def fetch_all_stats(driver) -> list:
     print("  Fetching 24h stats…")
     members_24h     = fetch_members(driver, "24h")
-    time.sleep(1)
+    clock.sleep(1)
     print("  Fetching current season stats…")
     members_current = fetch_members(driver, "current")
-    time.sleep(1)
+    clock.sleep(1)
     print("  Fetching last season stats…")
     members_last    = fetch_members(driver, "season")
 
@@ -224,7 +249,7 @@ def get_prev_snapshot(history: list) -> dict:
 
 def get_snapshot_at_offset(history: list, hours_ago: int) -> dict:
     """Return snapshot closest to N hours ago."""
-    now = int(time.time())
+    now = int(clock.time())
     target = now - (hours_ago * 3600)
     best = None
     best_diff = float("inf")
@@ -305,7 +330,7 @@ def push_to_github(data: dict, history: list):
     # Build payload: current snapshot + last 14 days history
     payload = {
         "alliance":    ALLIANCE_NAME,
-        "updated_at":  datetime.datetime.utcnow().isoformat() + "Z",
+        "updated_at":  clock.now(datetime.timezone.utc).replace(tzinfo=None).isoformat() + "Z",
         "members":     data,
         "history":     history,  # up to 90 days (downsampled beyond 14d)
     }
@@ -342,7 +367,7 @@ def push_to_github(data: dict, history: list):
 
     # Push new content
     body = {
-        "message": f"Update member stats {datetime.datetime.utcnow().strftime('%Y-%m-%d %H:%M')} UTC",
+        "message": f"Update member stats {clock.now(datetime.timezone.utc).strftime('%Y-%m-%d %H:%M')} UTC",
         "content": base64.b64encode(repo_json.encode()).decode(),
         "branch":  GITHUB_BRANCH,
     }
@@ -397,7 +422,7 @@ def delete_charts(service, sheet_id: int) -> list:
 # ── MAIN STATS SHEET ──────────────────────────────────────────────────────────
 def write_stats_sheet(service, members: list, history: list):
     sheet_id = ensure_sheet(service, "Member Stats")
-    now_str  = datetime.datetime.now().strftime("%d/%m/%Y %H:%M")
+    now_str  = clock.now().strftime("%d/%m/%Y %H:%M")
 
     prev_snap   = get_prev_snapshot(history)
     snap_24h    = get_snapshot_at_offset(history, 24)
@@ -788,9 +813,11 @@ def main():
     service = get_sheets_service()
     history = load_history()
 
+    interval = CHECK_INTERVAL_MINUTES * 60
+    next_run = clock.time()
     while True:
-        now = int(time.time())
-        print(f"⏱  {datetime.datetime.now().strftime('%d/%m/%Y %H:%M:%S')}")
+        now = int(clock.time())
+        print(f"⏱  {clock.now().strftime('%d/%m/%Y %H:%M:%S')}")
         print(f"🔍 Fetching member stats…")
 
         try:
@@ -823,8 +850,13 @@ def main():
             except Exception:
                 pass
 
-        print(f"\n⏳ Next update in {CHECK_INTERVAL_MINUTES} minutes…\n")
-        time.sleep(CHECK_INTERVAL_MINUTES * 60)
+        # Keep to the hourly schedule however long this run took
+        next_run += interval
+        while next_run <= clock.time():
+            next_run += interval
+        wait = next_run - clock.time()
+        print(f"\n⏳ Next update in {wait / 60:.0f} minutes…\n")
+        clock.sleep(wait)
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,361 @@
+"""
+Mock ShippingManager API
+A local stand-in for https://shippingmanager.cc/api/ used by benchmark.py.
+Implements the endpoints Pirate Browser and the member tracker call, with
+configurable latency, error rate and fleet size. Stdlib only.
+
+    python mock_server.py --port 8765 --vessels 50 --latency 40 --error-rate 0.01
+
+Each client is an account identified by its `mock_session` cookie; unknown
+sessions get a fresh account (cash, bunker and fleet) on first use.
+"""
+
+import argparse
+import collections
+import http.server
+import json
+import random
+import threading
+import time
+
+import clock   # game time; soak runs install a SimClock
+
+# ── CONFIG ────────────────────────────────────────────────────────────────────
+DEFAULT_PORT    = 8765
+SESSION_COOKIE  = "mock_session"
+START_CASH      = 50_000_000
+START_FUEL      = 2_000_000      # kg (the game API counts bunker in kg)
+START_CO2       = 2_000_000      # kg
+MAX_FUEL        = 5_000_000      # kg
+MAX_CO2         = 5_000_000      # kg
+FUEL_PER_TRIP   = 2_000          # kg burned per departure
+CO2_PER_TRIP    = 1_500          # kg emitted per departure
+CHAT_HISTORY    = 200            # messages kept per alliance
+
+
+class MockConfig:
+    def __init__(self, vessels: int = 20, latency_ms: float = 0, jitter_ms: float = 0,
+                 error_rate: float = 0.0, voyage_secs: float = 0, members: int = 40,
+                 chat_rate: float = 0.5, seed: int = None, chat_per_min: float = 0):
+        self.vessels     = vessels       # fleet size of every new account
+        self.latency_ms  = latency_ms    # mean added latency per request
+        self.jitter_ms   = jitter_ms     # std deviation of that latency
+        self.error_rate  = error_rate    # share of requests answered with HTTP 503
+        self.voyage_secs = voyage_secs   # mean voyage (±50%); 0 = back in port at once
+        self.members     = members       # alliance size
+        self.chat_rate   = chat_rate     # new chat messages per chat-feed poll (mean)…
+        self.chat_per_min = chat_per_min # …or, if set, per minute of game time
+        self.seed        = seed
+
+
+# ── GAME STATE ────────────────────────────────────────────────────────────────
+class MockGame:
+    """All accounts, fleets and alliance chat; every handler holds one lock."""
+
+    def __init__(self, config: MockConfig):
+        self.cfg      = config
+        self.rng      = random.Random(config.seed)
+        self._lock    = threading.Lock()
+        self.accounts = {}    # session -> account dict
+        self.chat     = collections.deque(maxlen=CHAT_HISTORY)
+        self.requests = collections.Counter()   # endpoint -> calls
+        self.errors   = collections.Counter()   # endpoint -> injected errors
+        self.lag      = {"count": 0, "total": 0.0, "max": 0.0}   # arrival -> next departure (s)
+        self._next_id = 1
+        self._chat_at = clock.time()    # game time chat was last generated up to
+        self.members  = [{
+            "user_id":         100_000 + i,
+            "company_name":    f"Captain {i:03d} Shipping",
+            "role":            "member" if i else "ceo",
+            "time_last_login": int(clock.time()) - self.rng.randint(0, 86400),
+            "is_rookie":       i % 7 == 0,
+        } for i in range(config.members)]
+
+    def account(self, session: str) -> dict:
+        acc = self.accounts.get(session)
+        if acc is None:
+            acc = self.accounts[session] = {
+                "user_id": 1000 + len(self.accounts),
+                "cash":    START_CASH, "fuel": START_FUEL, "co2": START_CO2,
+                "vessels": {},
+            }
+            for n in range(self.cfg.vessels):
+                vid = self._next_id
+                self._next_id += 1
+                acc["vessels"][vid] = {
+                    "id":                vid,
+                    "name":              f"MV {session[:8]} {n + 1:03d}",
+                    "status":            "port",
+                    "is_parked":         False,
+                    "route_id":          5000 + vid,
+                    "route_origin":      "rotterdam",
+                    "route_destination": "singapore",
+                    "route_speed":       20,
+                    "route_guards":      0,
+                    "capacity":          1000,
+                    "route_cargo":       self.rng.randint(300, 1000),
+                    "route_end_time":    0,
+                }
+        return acc
+
+    def _arrive(self, acc: dict, now: float):
+        for v in acc["vessels"].values():
+            if v["status"] == "enroute" and v["route_end_time"] <= now:
+                v["status"] = "port"
+
+    # ── Endpoints (session, payload) -> (HTTP status, body) ───────────────────
+    def get_prices(self, session, payload):
+        day   = int(clock.time() // 86400)
+        rng   = random.Random(day)
+        table = [{"time": f"{h:02d}:{m:02d}",
+                  "fuel_price": rng.randint(350, 900),
+                  "co2_price":  rng.randint(5, 25)}
+                 for h in range(24) for m in (0, 30)]
+        return 200, {"data": {"prices": table}}
+
+    def _purchase(self, session, payload, kind, price_key):
+        amount = int(payload.get("amount") or 0)
+        _, body = self.get_prices(session, payload)
+        slot   = time.gmtime(clock.time())
+        entry  = body["data"]["prices"][slot.tm_hour * 2 + (slot.tm_min >= 30)]
+        cost   = amount / 1000 * entry[price_key]
+        cap    = MAX_FUEL if kind == "fuel" else MAX_CO2
+        with self._lock:
+            acc = self.account(session)
+            if amount <= 0 or acc[kind] + amount > cap:
+                return 200, {"error": "invalid_amount"}
+            if cost > acc["cash"]:
+                return 200, {"error": "not_enough_cash"}
+            acc["cash"] -= cost
+            acc[kind]   += amount
+            return 200, {"user": {"cash": acc["cash"], kind: acc[kind]}}
+
+    def purchase_fuel(self, session, payload):
+        return self._purchase(session, payload, "fuel", "fuel_price")
+
+    def purchase_co2(self, session, payload):
+        return self._purchase(session, payload, "co2", "co2_price")
+
+    def get_vessels(self, session, payload):
+        full = bool(payload.get("include_routes"))
+        with self._lock:
+            acc = self.account(session)
+            self._arrive(acc, clock.time())
+            for v in acc["vessels"].values():
+                if v["status"] == "port":   # cargo waiting at the port changes between reads
+                    v["route_cargo"] = self.rng.randint(300, 1000)
+            if full:
+                vessels = [dict(v) for v in acc["vessels"].values()]
+            else:
+                vessels = [{k: v[k] for k in ("id", "status", "is_parked", "route_id",
+                                              "route_end_time")}
+                           for v in acc["vessels"].values()]
+        return 200, {"data": {"user_vessels": vessels}}
+
+    def depart(self, session, payload):
+        now = clock.time()
+        with self._lock:
+            acc = self.account(session)
+            v   = acc["vessels"].get(payload.get("user_vessel_id"))
+            if v is None:
+                return 200, {"error": "vessel_not_found"}
+            self._arrive(acc, now)
+            if v["status"] != "port" or v["is_parked"]:
+                return 200, {"error": "vessel_not_in_port"}
+            if acc["fuel"] < FUEL_PER_TRIP:
+                return 200, {"error": "not_enough_fuel"}
+            if v["route_end_time"]:
+                lag = max(0.0, now - v["route_end_time"])
+                self.lag["count"] += 1
+                self.lag["total"] += lag
+                self.lag["max"]    = max(self.lag["max"], lag)
+            income = v["route_cargo"] * 120
+            acc["fuel"] -= FUEL_PER_TRIP
+            acc["co2"]   = max(0, acc["co2"] - CO2_PER_TRIP)
+            acc["cash"] += income
+            v["status"]  = "enroute"
+            v["route_end_time"] = int(now + self.cfg.voyage_secs * self.rng.uniform(0.5, 1.5))
+            v["route_cargo"]    = self.rng.randint(300, 1000)
+        return 200, {"data": {"depart_info": {
+            "depart_income": income, "fuel_usage": FUEL_PER_TRIP,
+            "co2_emission": CO2_PER_TRIP, "harbor_fee": 500}}}
+
+    def moor(self, session, payload):
+        with self._lock:
+            v = self.account(session)["vessels"].get(payload.get("user_vessel_id"))
+            if v is None:
+                return 200, {"error": "vessel_not_found"}
+            v["is_parked"] = True
+        return 200, {"success": True}
+
+    def chat_feed(self, session, payload):
+        now = int(clock.time())
+        with self._lock:
+            if self.cfg.chat_per_min:
+                expected, self._chat_at = (now - self._chat_at) / 60 * self.cfg.chat_per_min, now
+                n = int(expected + self.rng.random())
+            else:
+                n = int(self.rng.random() * 2 * self.cfg.chat_rate + 0.5)
+            for _ in range(n):
+                roll = self.rng.random()
+                m    = self.rng.choice(self.members) if self.members else {"user_id": 1}
+                if roll < 0.1:
+                    self.chat.append({"type": "feed", "feed_type": "member_joined",
+                                      "time_created": now,
+                                      "replacements": {"company_name": m.get("company_name", "?")}})
+                else:
+                    text = self.rng.choice(("!stats", "!help", "ahoy", "fair winds", "gg"))
+                    self.chat.append({"type": "chat", "user_id": m["user_id"],
+                                      "message": text, "time_created": now})
+            offset = int(payload.get("offset") or 0)
+            limit  = int(payload.get("limit") or 50)
+            feed   = list(reversed(self.chat))[offset:offset + limit]   # newest first
+        return 200, {"data": {"chat_feed": feed}}
+
+    def post_chat(self, session, payload):
+        with self._lock:
+            self.chat.append({"type": "chat", "user_id": self.account(session)["user_id"],
+                              "message": str(payload.get("text", ""))[:500],
+                              "time_created": int(clock.time())})
+        return 200, {"success": True}
+
+    def get_alliance(self, session, payload):
+        return 200, {"data": {"alliance": {
+            "id": payload.get("alliance_id"), "members": len(self.members),
+            "benefit_level": 4,
+            "stats": {"departures_24h": 12_345, "coops_24h": 678}}}}
+
+    def get_members(self, session, payload):
+        season = payload.get("last_season_stats")
+        day    = payload.get("last_24h_stats")
+        scale  = 1 if day else (30 if not season else 90)
+        members = [dict(m, contribution=(m["user_id"] % 97) * 1000 * scale,
+                        departures=(m["user_id"] % 53) * 10 * scale)
+                   for m in self.members]
+        return 200, {"data": {"members": members}}
+
+    def bunker(self, session, payload):
+        """Not a game endpoint: what the page's user store holds (read by fake drivers)."""
+        with self._lock:
+            acc = self.account(session)
+            return 200, {"data": {"fuel": acc["fuel"] / 1000, "co2": acc["co2"] / 1000,
+                                  "cash": acc["cash"], "maxFuel": MAX_FUEL / 1000,
+                                  "maxCO2": MAX_CO2 / 1000}}
+
+    ROUTES = {
+        "bunker/get-prices":              get_prices,
+        "bunker/purchase-fuel":           purchase_fuel,
+        "bunker/purchase-co2":            purchase_co2,
+        "vessel/get-all-user-vessels":    get_vessels,
+        "route/depart":                   depart,
+        "vessel/moor":                    moor,
+        "alliance/get-chat-feed":         chat_feed,
+        "alliance/post-chat":             post_chat,
+        "alliance/get-alliance":          get_alliance,
+        "alliance/get-alliance-members":  get_members,
+        "mock/bunker":                    bunker,
+    }
+
+    def handle(self, endpoint: str, session: str, payload: dict):
+        fn = self.ROUTES.get(endpoint)
+        if fn is None:
+            return 404, {"error": "unknown_endpoint"}
+        with self._lock:
+            self.requests[endpoint] += 1
+            failed = self.rng.random() < self.cfg.error_rate
+            if failed:
+                self.errors[endpoint] += 1
+            delay = max(0.0, self.rng.gauss(self.cfg.latency_ms, self.cfg.jitter_ms)) / 1000
+        if delay:
+            time.sleep(delay)
+        if failed:
+            return 503, {"error": "mock_unavailable"}
+        if not session:
+            return 401, {"error": "unauthorized"}
+        return fn(self, session, payload)
+
+
+# ── HTTP SERVER ───────────────────────────────────────────────────────────────
+class MockServer:
+    """Threaded keep-alive HTTP server around a MockGame."""
+
+    def __init__(self, config: MockConfig = None, host: str = "127.0.0.1", port: int = 0):
+        self.game = MockGame(config or MockConfig())
+        game      = self.game
+
+        class Handler(http.server.BaseHTTPRequestHandler):
+            protocol_version        = "HTTP/1.1"
+            disable_nagle_algorithm = True   # headers and body go out as two writes
+
+            def do_POST(self):
+                length = int(self.headers.get("Content-Length") or 0)
+                try:
+                    payload = json.loads(self.rfile.read(length) or b"{}")
+                except ValueError:
+                    payload = {}
+                path    = self.path.split("?")[0]
+                cookies = dict(c.strip().split("=", 1) for c in
+                               (self.headers.get("Cookie") or "").split(";") if "=" in c)
+                if path.startswith("/api/"):
+                    status, body = game.handle(path[len("/api/"):], cookies.get(SESSION_COOKIE),
+                                               payload if isinstance(payload, dict) else {})
+                else:
+                    status, body = 404, {"error": "not_found"}
+                raw = json.dumps(body).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(raw)))
+                self.end_headers()
+                self.wfile.write(raw)
+
+            def log_message(self, *args):
+                pass
+
+        self.httpd = http.server.ThreadingHTTPServer((host, port), Handler)
+        self.httpd.daemon_threads = True
+        self.host, self.port = self.httpd.server_address[:2]
+
+    @property
+    def base_url(self) -> str:
+        return f"http://{self.host}:{self.port}/api/"
+
+    def start(self) -> "MockServer":
+        threading.Thread(target=self.httpd.serve_forever, daemon=True, name="mock-server").start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+# ── ENTRY POINT ───────────────────────────────────────────────────────────────
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Mock ShippingManager API server")
+    ap.add_argument("--host", default="127.0.0.1")
+    ap.add_argument("--port", type=int, default=DEFAULT_PORT, help="0 picks a free port")
+    ap.add_argument("--vessels", type=int, default=20, help="fleet size per account")
+    ap.add_argument("--latency", type=float, default=0, help="mean added latency (ms)")
+    ap.add_argument("--jitter", type=float, default=0, help="latency std deviation (ms)")
+    ap.add_argument("--error-rate", type=float, default=0.0, help="share of requests failing with 503")
+    ap.add_argument("--voyage", type=float, default=0, help="mean seconds a departed vessel stays at sea")
+    ap.add_argument("--members", type=int, default=40, help="alliance size")
+    ap.add_argument("--chat-rate", type=float, default=0.5, help="new chat messages per poll")
+    ap.add_argument("--chat-per-min", type=float, default=0,
+                    help="new chat messages per minute instead of per poll")
+    ap.add_argument("--seed", type=int)
+    args = ap.parse_args(argv)
+    server = MockServer(MockConfig(args.vessels, args.latency, args.jitter, args.error_rate,
+                                   args.voyage, args.members, args.chat_rate, args.seed,
+                                   args.chat_per_min),
+                        args.host, args.port)
+    # benchmark.py reads the URL from this first line
+    print(f"🏴‍☠️ Mock game API listening on {server.base_url}", flush=True)
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.httpd.server_close()
+
+if __name__ == "__main__":
+    main()
@@ -3,21 +3,43 @@ Pirate Browser
 - Multiple accounts running simultaneously
 - Each account has its own browser window, settings and logs
 - Selenium auto-detects Chrome, Edge or Firefox
-- CustomTkinter dashboard with per-account tabs
+- CustomTkinter dashboard with per-account tabs (pirate_gui.py)
+- --headless daemon mode that never loads Tk
 """
 
 import threading
+import asyncio
 import time
 import json
 import datetime
-import tkinter as tk
-import customtkinter as ctk
 import urllib.request
-import webbrowser
 import base64
 import os
+import queue
+import http.client
+import http.server
+import http.cookies
+import urllib.parse
+import concurrent.futures
+import collections
+import heapq
+import gzip
+import zlib
+import bisect
+import sqlite3
+import contextlib
+import re
+import shlex
+import sys
+import argparse
+import signal
+import shutil
+import subprocess
+import multiprocessing
 from pathlib import Path
 
+import clock
+
 # ── DATA DIRECTORY ────────────────────────────────────────────────────────────
 def _get_data_dir() -> Path:
     app_data = os.environ.get("APPDATA")
@@ -37,11 +59,343 @@ try:
 except ImportError:
     KEYRING_AVAILABLE = False
 
+# ── LOG SINK ──────────────────────────────────────────────────────────────────
+LOG_DIR       = DATA_DIR / "logs"
+LOG_MAX_BYTES = 1_000_000   # rotate a source's file past this size…
+LOG_BACKUPS   = 3           # …keeping this many older files (.1 newest)
+LOG_TAIL      = 2000        # records kept in memory for the dashboard / grep
+
+class LogSink:
+    """Structured log stream: workers enqueue, one writer thread does the I/O.
+
+    Records are {"ts", "source", "level", "msg"}. The writer batches them
+    into LOG_DIR/<source>.jsonl (size-rotated), echoes them to the console,
+    keeps a bounded in-memory tail and notifies subscribers.
+    """
+
+    def __init__(self, log_dir: Path = LOG_DIR, echo: bool = True):
+        self.log_dir = log_dir
+        self.echo    = echo
+        self._q      = queue.SimpleQueue()
+        self._tail   = collections.deque(maxlen=LOG_TAIL)
+        self._subs   = []
+        self._files  = {}           # source -> open file
+        self._names  = {}           # source -> display name for the console
+        self._lock   = threading.Lock()
+        self._thread = None
+
+    @staticmethod
+    def _level(msg: str) -> str:
+        if msg.startswith("❌"): return "error"
+        if msg.startswith("⚠"):  return "warn"
+        return "info"
+
+    def name(self, source: str, display: str):
+        """Label used for a source on the console (e.g. account name)."""
+        self._names[source] = display
+
+    def emit(self, source: str, msg: str, level: str = None):
+        """Queue a record; never blocks on I/O."""
+        if self._thread is None:
+            self._start()
+        self._q.put({"ts": time.time(), "source": source,
+                     "level": level or self._level(msg), "msg": msg})
+
+    def subscribe(self, fn):
+        """fn(record) is called on the writer thread for every record."""
+        with self._lock:
+            self._subs.append(fn)
+
+    def unsubscribe(self, fn):
+        with self._lock:
+            if fn in self._subs:
+                self._subs.remove(fn)
+
+    def tail(self, source: str = None, limit: int = 200) -> list:
+        """Most recent records, oldest first, optionally for one source."""
+        with self._lock:
+            recs = [r for r in self._tail if source is None or r["source"] == source]
+        return recs[-limit:]
+
+    def grep(self, pattern: str, source: str = None, limit: int = 100) -> list:
+        """Recent records whose message matches a case-insensitive regex."""
+        rx = re.compile(pattern, re.IGNORECASE)
+        return [r for r in self.tail(source, LOG_TAIL) if rx.search(r["msg"])][-limit:]
+
+    def close(self, timeout: float = 2.0):
+        """Flush what is queued and stop the writer."""
+        if self._thread:
+            self._q.put(None)
+            self._thread.join(timeout)
+
+    def _start(self):
+        with self._lock:
+            if self._thread is None:
+                self.log_dir.mkdir(parents=True, exist_ok=True)
+                self._thread = threading.Thread(target=self._writer, daemon=True)
+                self._thread.start()
+
+    def _writer(self):
+        while True:
+            batch = [self._q.get()]
+            while len(batch) < 500:
+                try:
+                    batch.append(self._q.get_nowait())
+                except queue.Empty:
+                    break
+            stop = None in batch
+            batch = [r for r in batch if r is not None]
+            self._write(batch)
+            if stop:
+                for f in self._files.values():
+                    f.close()
+                self._files.clear()
+                return
+
+    def _write(self, batch: list):
+        by_source = collections.defaultdict(list)
+        for r in batch:
+            by_source[r["source"]].append(json.dumps(r, ensure_ascii=False))
+        for source, lines in by_source.items():
+            try:
+                f = self._file(source)
+                f.write("\n".join(lines) + "\n")
+                f.flush()
+                if f.tell() > LOG_MAX_BYTES:
+                    self._rotate(source)
+            except OSError:
+                pass
+        if self.echo:
+            try:
+                sys.stdout.write("".join(
+                    f"[{self._names.get(r['source'], r['source'])}] {r['msg']}\n" for r in batch))
+                sys.stdout.flush()
+            except (OSError, ValueError, AttributeError):
+                pass   # no console (pythonw) or it was closed
+        with self._lock:
+            self._tail.extend(batch)
+            subs = list(self._subs)
+        for r in batch:
+            for fn in subs:
+                try:
+                    fn(r)
+                except Exception:
+                    pass
+
+    def _file(self, source: str):
+        f = self._files.get(source)
+        if f is None:
+            f = self._files[source] = open(self.log_dir / f"{source}.jsonl", "a", encoding="utf-8")
+        return f
+
+    def _rotate(self, source: str):
+        self._files.pop(source).close()
+        base = self.log_dir / f"{source}.jsonl"
+        for i in range(LOG_BACKUPS, 0, -1):
+            src = base if i == 1 else base.with_name(f"{base.name}.{i - 1}")
+            if src.exists():
+                os.replace(src, base.with_name(f"{base.name}.{i}"))
+
+LOGS = LogSink()
+
+# ── METRICS ───────────────────────────────────────────────────────────────────
+METRICS_FILE          = DATA_DIR / "metrics.json"
+METRICS_DUMP_INTERVAL = 60   # seconds between JSON dumps
+LATENCY_BUCKETS       = (0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+
+METRIC_DEFS = {   # name -> (Prometheus type, help)
+    "pirate_webdriver_script_seconds": ("histogram", "WebDriver script round trip, including the browser queue"),
+    "pirate_webdriver_errors_total":   ("counter",   "WebDriver scripts that raised"),
+    "pirate_api_requests_total":       ("counter",   "Game API requests by endpoint and transport"),
+    "pirate_api_errors_total":         ("counter",   "Failed game API requests by endpoint and error"),
+    "pirate_api_request_seconds":      ("histogram", "Game API request latency as seen by the page or the direct client"),
+    "pirate_cycle_seconds":            ("histogram", "Auto-manager cycle duration"),
+    "pirate_cycle_last_seconds":       ("gauge",     "Duration of the last auto-manager cycle"),
+    "pirate_cycle_errors_total":       ("counter",   "Auto-manager cycles that raised"),
+    "pirate_departures_last_cycle":    ("gauge",     "Vessels departed by the last cycle that departed"),
+    "pirate_departures_total":         ("counter",   "Vessels departed"),
+    "pirate_chat_poll_seconds":        ("histogram", "Chatbot poll duration"),
+    "pirate_chat_errors_total":        ("counter",   "Chatbot polls that raised"),
+    "pirate_chat_poll_interval_seconds": ("gauge",   "Current delay between chatbot polls"),
+    "pirate_chat_pages_total":         ("counter",   "Chat feed pages fetched"),
+}
+
+class Metrics:
+    """Counters, gauges and latency histograms keyed by name and labels.
+
+    Recording is one dict update under a lock. The Prometheus text and JSON
+    forms are only built when the exporter is scraped or the dump is due.
+    """
+
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets   = tuple(buckets)
+        self._lock     = threading.Lock()
+        self._series   = {}   # name -> {label tuple -> value | [counts…, sum, count]}
+        self._absorbed = {}   # source -> snapshot() sent by a worker process
+        self._server   = None
+        self._dumper   = None
+        self._path     = None
+        self._stop     = threading.Event()
+
+    # ── Recording ─────────────────────────────────────────────────────────────
+    def inc(self, name: str, value: float = 1, **labels):
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            s = self._series.setdefault(name, {})
+            s[key] = s.get(key, 0) + value
+
+    def set(self, name: str, value: float, **labels):
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            self._series.setdefault(name, {})[key] = value
+
+    def observe(self, name: str, seconds: float, **labels):
+        key = tuple(sorted(labels.items()))
+        i   = bisect.bisect_left(self.buckets, seconds)
+        with self._lock:
+            s = self._series.setdefault(name, {})
+            h = s.get(key)
+            if h is None:
+                h = s[key] = [0] * (len(self.buckets) + 1) + [0.0, 0]
+            h[i]  += 1
+            h[-2] += seconds
+            h[-1] += 1
+
+    @contextlib.contextmanager
+    def timer(self, name: str, **labels):
+        t0 = time.monotonic()
+        try:
+            yield
+        finally:
+            self.observe(name, time.monotonic() - t0, **labels)
+
+    def absorb(self, source: str, snapshot: dict):
+        """Include a worker process's snapshot() in everything exported here."""
+        with self._lock:
+            self._absorbed[source] = snapshot
+
+    # ── Export ────────────────────────────────────────────────────────────────
+    def snapshot(self) -> dict:
+        """This process's series as plain JSON (histogram counts are per bucket)."""
+        with self._lock:
+            series = {n: {k: list(v) if isinstance(v, list) else v for k, v in s.items()}
+                      for n, s in self._series.items()}
+        out = {}
+        for name, s in series.items():
+            out[name] = [{"labels": dict(k), "counts": v[:-2], "sum": v[-2], "count": v[-1]}
+                         if isinstance(v, list) else {"labels": dict(k), "value": v}
+                         for k, v in s.items()]
+        return {"ts": time.time(), "buckets": list(self.buckets), "metrics": out}
+
+    def export(self) -> dict:
+        """snapshot() merged with the absorbed worker snapshots."""
+        snap = self.snapshot()
+        with self._lock:
+            others = list(self._absorbed.values())
+        for other in others:
+            for name, series in other["metrics"].items():
+                snap["metrics"].setdefault(name, []).extend(series)
+        return snap
+
+    def prometheus(self) -> str:
+        snap  = self.export()
+        les   = [repr(float(b)) for b in snap["buckets"]] + ["+Inf"]
+        lines = []
+        for name in sorted(snap["metrics"]):
+            kind, text = METRIC_DEFS.get(name, ("untyped", ""))
+            lines += [f"# HELP {name} {text}", f"# TYPE {name} {kind}"]
+            for s in snap["metrics"][name]:
+                if "counts" not in s:
+                    lines.append(f"{name}{_prom_labels(s['labels'])} {s['value']}")
+                    continue
+                acc = 0
+                for le, c in zip(les, s["counts"]):
+                    acc += c
+                    lines.append(f"{name}_bucket{_prom_labels(s['labels'], le=le)} {acc}")
+                lines.append(f"{name}_sum{_prom_labels(s['labels'])} {s['sum']}")
+                lines.append(f"{name}_count{_prom_labels(s['labels'])} {s['count']}")
+        return "\n".join(lines) + "\n"
+
+    def dump(self, path: Path = None):
+        path = path or self._path or METRICS_FILE
+        try:
+            atomic_write(path, json.dumps(self.export()))
+        except OSError as e:
+            LOGS.emit("app", f"⚠ Could not write metrics: {e}")
+
+    def start(self, port: int = None, path: Path = METRICS_FILE,
+              interval: float = METRICS_DUMP_INTERVAL, host: str = "127.0.0.1"):
+        """Dump JSON to `path` every `interval` s and, with a port, serve /metrics."""
+        self._path = path
+        if self._dumper is None:
+            def _loop():
+                while not self._stop.wait(interval):
+                    self.dump()
+            self._dumper = threading.Thread(target=_loop, daemon=True, name="metrics-dump")
+            self._dumper.start()
+        if port and self._server is None:
+            registry = self
+
+            class Handler(http.server.BaseHTTPRequestHandler):
+                def do_GET(self):
+                    route = self.path.split("?")[0]
+                    if route == "/metrics":
+                        body  = registry.prometheus().encode()
+                        ctype = "text/plain; version=0.0.4; charset=utf-8"
+                    elif route == "/metrics.json":
+                        body  = json.dumps(registry.export()).encode()
+                        ctype = "application/json"
+                    else:
+                        self.send_error(404)
+                        return
+                    self.send_response(200)
+                    self.send_header("Content-Type", ctype)
+                    self.send_header("Content-Length", str(len(body)))
+                    self.end_headers()
+                    self.wfile.write(body)
+
+                def log_message(self, *args):
+                    pass
+            try:
+                self._server = http.server.ThreadingHTTPServer((host, port), Handler)
+            except OSError as e:
+                LOGS.emit("app", f"⚠ Metrics exporter not started on port {port}: {e}")
+                return
+            threading.Thread(target=self._server.serve_forever, daemon=True,
+                             name="metrics-http").start()
+            LOGS.emit("app", f"📈 Metrics on http://{host}:{port}/metrics")
+
+    def close(self):
+        self._stop.set()
+        if self._dumper:
+            self.dump()
+        if self._server:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+def _prom_labels(labels: dict, **extra) -> str:
+    items = {**labels, **extra}
+    if not items:
+        return ""
+    esc = lambda v: str(v).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+    return "{" + ",".join(f'{k}="{esc(v)}"' for k, v in items.items()) + "}"
+
+METRICS = Metrics()
+
 # ── VERSION & UPDATE ──────────────────────────────────────────────────────────
 CURRENT_VERSION = "0.0.3"
 GITHUB_RELEASES = "https://api.github.com/repos/PiratesTreasure/pirate-browser/releases/latest"
 RELEASES_PAGE   = "https://github.com/PiratesTreasure/pirate-browser/releases/latest"
 GAME_URL        = "https://shippingmanager.cc"
+API_URL         = GAME_URL + "/api/"
+
+# ── TRANSPORT TIMEOUTS (seconds) ──────────────────────────────────────────────
+API_TIMEOUT           = 15   # per game API request, enforced inside the page
+SCRIPT_TIMEOUT        = 30   # default WebDriver async-script timeout
+SCRIPT_TIMEOUT_MARGIN = 5    # headroom over the API timeout for the script itself
+COMMAND_BUDGET        = SCRIPT_TIMEOUT * 2   # expected max run time of a WebDriver command
+                                             # that doesn't set its own (page loads, clicks)
 
 def check_for_updates():
     try:
@@ -60,46 +414,6 @@ def version_tuple(v):
     except Exception:
         return (0,)
 
-def show_update_dialog(latest_version):
-    popup = ctk.CTkToplevel()
-    popup.title("Update Available")
-    popup.geometry("380x200")
-    popup.resizable(False, False)
-    popup.configure(fg_color="#0a0f1e")
-    popup.grab_set()
-    popup.lift()
-    ctk.CTkLabel(popup, text="🏴‍☠️  Update Available!",
-                 font=("Segoe UI", 14, "bold"),
-                 text_color="#0db8f4").pack(pady=(24, 6))
-    ctk.CTkLabel(popup,
-                 text=f"Version {latest_version} is available.\nYou are running {CURRENT_VERSION}.",
-                 font=("Segoe UI", 11), text_color="#64748b",
-                 justify="center").pack(pady=4)
-    btn_frame = ctk.CTkFrame(popup, fg_color="transparent")
-    btn_frame.pack(pady=16)
-    ctk.CTkButton(btn_frame, text="⬇  Download Update",
-                  font=("Segoe UI", 11, "bold"),
-                  fg_color="#0db8f4", hover_color="#0a9bd0",
-                  width=160, height=36,
-                  command=lambda: [webbrowser.open(RELEASES_PAGE), popup.destroy()]
-                  ).pack(side="left", padx=6)
-    ctk.CTkButton(btn_frame, text="Later",
-                  font=("Segoe UI", 11),
-                  fg_color="#1e2d4a", hover_color="#334155",
-                  text_color="#e2e8f0", width=80, height=36,
-                  command=popup.destroy).pack(side="left", padx=6)
-
-# ── COLOURS ───────────────────────────────────────────────────────────────────
-C = {
-    "bg":    "#0a0f1e", "panel":  "#0d1530", "card":   "#111827",
-    "border":"#1e2d4a", "accent": "#0db8f4", "green":  "#22c55e",
-    "red":   "#ef4444", "yellow": "#f59e0b", "text":   "#e2e8f0",
-    "dim":   "#64748b", "muted":  "#334155",
-}
-
-ctk.set_appearance_mode("dark")
-ctk.set_default_color_theme("blue")
-
 # ── DEFAULT SETTINGS ──────────────────────────────────────────────────────────
 DEFAULT_SETTINGS = {
     "fuel_mode":        "off",
@@ -112,65 +426,273 @@ DEFAULT_SETTINGS = {
     "check_interval":   60,
     "min_utilization":  50,
     "low_util_action":  "skip",
+    "depart_concurrency": 4,
+    "depart_rate":      5,
+    "api_direct":       False,
+    "log_buffer":       500,
 }
 
-# ── ACCOUNT MANAGER ───────────────────────────────────────────────────────────
-ACCOUNTS_FILE = DATA_DIR / "accounts.json"
+# ── SETTINGS STORE ────────────────────────────────────────────────────────────
+ACCOUNTS_FILE = DATA_DIR / "accounts.json"   # pre-SQLite layout, migrated once
+DB_FILE       = DATA_DIR / "pirate_browser.db"
 
+def atomic_write(path: Path, text: str):
+    """Write via a temp file and rename, so readers never see a half-written file."""
+    tmp = path.with_name(f".{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    try:
+        tmp.write_text(text, encoding="utf-8")
+        os.replace(tmp, path)
+    finally:
+        if tmp.exists():
+            tmp.unlink()
+
+class SettingsStore:
+    """Process-wide store for accounts, per-account settings and credential metadata.
+
+    Backed by one SQLite database (WAL mode). Settings are cached in memory
+    after the first read; saves run in a transaction, update the cache and
+    notify subscribers of that account. The old JSON files are imported once.
+    """
+
+    def __init__(self, path: Path = DB_FILE):
+        self._lock     = threading.RLock()
+        self._path     = path
+        self._db       = None           # opened lazily
+        self._accounts = None           # cached account list, in tab order
+        self._settings = {}             # account id -> merged settings
+        self._subs     = collections.defaultdict(list)   # account id -> [fn(settings)]
+
+    # ── database ──────────────────────────────────────────────────────────────
+    def _conn(self) -> sqlite3.Connection:
+        if self._db is None:
+            db = sqlite3.connect(self._path, timeout=10, isolation_level=None,
+                                 check_same_thread=False)
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute("PRAGMA synchronous=NORMAL")
+            db.executescript("""
+                CREATE TABLE IF NOT EXISTS accounts (
+                    id       TEXT PRIMARY KEY,
+                    name     TEXT NOT NULL,
+                    position INTEGER NOT NULL);
+                CREATE INDEX IF NOT EXISTS accounts_position ON accounts(position);
+                CREATE TABLE IF NOT EXISTS settings (
+                    account_id TEXT PRIMARY KEY,
+                    data       TEXT NOT NULL);
+                CREATE TABLE IF NOT EXISTS credentials (
+                    account_id TEXT PRIMARY KEY,
+                    backend    TEXT NOT NULL,
+                    email      TEXT,
+                    password   TEXT);
+                CREATE TABLE IF NOT EXISTS meta (
+                    key   TEXT PRIMARY KEY,
+                    value TEXT);
+            """)
+            self._db = db
+            self._migrate_json()
+        return self._db
+
+    @contextlib.contextmanager
+    def _tx(self):
+        """BEGIN IMMEDIATE … COMMIT, or ROLLBACK on error (caller holds _lock)."""
+        db = self._conn()
+        db.execute("BEGIN IMMEDIATE")
+        try:
+            yield db
+        except BaseException:
+            db.execute("ROLLBACK")
+            raise
+        db.execute("COMMIT")
+
+    def _migrate_json(self):
+        """One-time import of accounts.json, settings_<id>.json and .creds_<id>."""
+        db = self._db
+        if db.execute("SELECT 1 FROM meta WHERE key='json_migrated'").fetchone():
+            return
+        moved = []
+        db.execute("BEGIN IMMEDIATE")
+        try:
+            if ACCOUNTS_FILE.exists():
+                try:
+                    old = json.loads(ACCOUNTS_FILE.read_text(encoding="utf-8"))
+                except Exception:
+                    old = []
+                for pos, acc in enumerate(old):
+                    db.execute("INSERT OR IGNORE INTO accounts VALUES (?,?,?)",
+                               (acc["id"], acc["name"], pos))
+                moved.append(ACCOUNTS_FILE)
+            for sf in DATA_DIR.glob("settings_*.json"):
+                try:
+                    data = json.loads(sf.read_text(encoding="utf-8"))
+                except Exception:
+                    continue
+                aid = sf.stem[len("settings_"):]
+                db.execute("INSERT OR IGNORE INTO settings VALUES (?,?)", (aid, json.dumps(data)))
+                moved.append(sf)
+            for cf in DATA_DIR.glob(".creds_*"):
+                if cf.suffix == ".migrated":
+                    continue
+                try:
+                    data = json.loads(cf.read_text(encoding="utf-8"))
+                except Exception:
+                    continue
+                db.execute("INSERT OR IGNORE INTO credentials VALUES (?,?,?,?)",
+                           (cf.name[len(".creds_"):], data.get("backend", "file"),
+                            data.get("email"), data.get("password")))
+                moved.append(cf)
+            db.execute("INSERT INTO meta VALUES ('json_migrated', ?)", (str(time.time()),))
+            db.execute("COMMIT")
+        except Exception as e:
+            db.execute("ROLLBACK")
+            LOGS.emit("app", f"❌ Settings migration failed: {e}")
+            return
+        # Keep the old files as a backup, out of the way
+        for f in moved:
+            try:
+                os.replace(f, f.with_name(f.name + ".migrated"))
+            except OSError:
+                pass
+        if moved:
+            LOGS.emit("app", f"✅ Migrated {len(moved)} settings file(s) into {self._path.name}")
+
+    # ── accounts ──────────────────────────────────────────────────────────────
+    def accounts(self) -> list:
+        with self._lock:
+            if self._accounts is None:
+                rows = self._conn().execute(
+                    "SELECT id, name FROM accounts ORDER BY position").fetchall()
+                self._accounts = [{"id": i, "name": n} for i, n in rows]
+            return [dict(a) for a in self._accounts]
+
+    def set_accounts(self, accounts: list):
+        with self._lock, self._tx() as db:
+            db.execute("DELETE FROM accounts")
+            db.executemany("INSERT INTO accounts VALUES (?,?,?)",
+                           [(a["id"], a["name"], pos) for pos, a in enumerate(accounts)])
+            self._accounts = [dict(a) for a in accounts]
+
+    def add_account(self, name: str) -> dict:
+        with self._lock, self._tx() as db:
+            base = account_id = f"account_{int(time.time())}"
+            n = 1
+            while db.execute("SELECT 1 FROM accounts WHERE id=?", (account_id,)).fetchone():
+                n += 1
+                account_id = f"{base}_{n}"
+            pos = db.execute("SELECT COALESCE(MAX(position), -1) + 1 FROM accounts").fetchone()[0]
+            db.execute("INSERT INTO accounts VALUES (?,?,?)", (account_id, name, pos))
+            self._accounts = None
+            return {"id": account_id, "name": name}
+
+    def remove_account(self, account_id: str):
+        with self._lock:
+            with self._tx() as db:
+                for table, col in (("accounts", "id"), ("settings", "account_id"),
+                                   ("credentials", "account_id")):
+                    db.execute(f"DELETE FROM {table} WHERE {col}=?", (account_id,))
+            self._accounts = None
+            self._settings.pop(account_id, None)
+            self._subs.pop(account_id, None)
+
+    # ── settings ──────────────────────────────────────────────────────────────
+    def settings(self, account_id: str) -> dict:
+        with self._lock:
+            if account_id not in self._settings:
+                merged = DEFAULT_SETTINGS.copy()
+                row = self._conn().execute(
+                    "SELECT data FROM settings WHERE account_id=?", (account_id,)).fetchone()
+                if row:
+                    try:
+                        merged.update(json.loads(row[0]))
+                    except Exception:
+                        pass
+                self._settings[account_id] = merged
+            return self._settings[account_id].copy()
+
+    def set_settings(self, account_id: str, settings: dict, persist: bool = True):
+        """Save settings; persist=False only updates memory (another process saved them)."""
+        with self._lock:
+            merged = DEFAULT_SETTINGS.copy()
+            merged.update(settings)
+            if persist:
+                with self._tx() as db:
+                    db.execute("INSERT OR REPLACE INTO settings VALUES (?,?)",
+                               (account_id, json.dumps(merged)))
+            self._settings[account_id] = merged
+            subs = list(self._subs[account_id])
+        for fn in subs:
+            try:
+                fn(merged.copy())
+            except Exception as e:
+                LOGS.emit("app", f"⚠ Settings subscriber error: {e}")
+
+    def subscribe(self, account_id: str, fn):
+        """Call fn(settings) after every save for this account."""
+        with self._lock:
+            self._subs[account_id].append(fn)
+
+    def unsubscribe(self, account_id: str, fn):
+        with self._lock:
+            if fn in self._subs[account_id]:
+                self._subs[account_id].remove(fn)
+
+    # ── credentials ───────────────────────────────────────────────────────────
+    def credentials(self, account_id: str):
+        """(backend, email, password) as stored, or None."""
+        with self._lock:
+            return self._conn().execute(
+                "SELECT backend, email, password FROM credentials WHERE account_id=?",
+                (account_id,)).fetchone()
+
+    def set_credentials(self, account_id: str, backend: str, email=None, password=None):
+        with self._lock, self._tx() as db:
+            db.execute("INSERT OR REPLACE INTO credentials VALUES (?,?,?,?)",
+                       (account_id, backend, email, password))
+
+    def clear_credentials(self, account_id: str):
+        with self._lock, self._tx() as db:
+            db.execute("DELETE FROM credentials WHERE account_id=?", (account_id,))
+
+STORE = SettingsStore()
+
+# ── ACCOUNT MANAGER ───────────────────────────────────────────────────────────
 class AccountManager:
     """Manages list of accounts and their per-account settings/credentials."""
 
     @staticmethod
     def load_accounts() -> list:
-        if ACCOUNTS_FILE.exists():
-            try:
-                return json.loads(ACCOUNTS_FILE.read_text(encoding="utf-8"))
-            except Exception:
-                pass
-        return []
+        return STORE.accounts()
 
     @staticmethod
     def save_accounts(accounts: list):
-        ACCOUNTS_FILE.write_text(json.dumps(accounts, indent=2), encoding="utf-8")
+        STORE.set_accounts(accounts)
 
     @staticmethod
     def add_account(name: str) -> dict:
-        accounts = AccountManager.load_accounts()
-        account_id = f"account_{int(time.time())}"
-        account = {"id": account_id, "name": name}
-        accounts.append(account)
-        AccountManager.save_accounts(accounts)
-        return account
+        return STORE.add_account(name)
 
     @staticmethod
     def remove_account(account_id: str):
-        accounts = AccountManager.load_accounts()
-        accounts = [a for a in accounts if a["id"] != account_id]
-        AccountManager.save_accounts(accounts)
-        # Clean up settings and creds
-        sf = DATA_DIR / f"settings_{account_id}.json"
-        cf = DATA_DIR / f".creds_{account_id}"
-        for f in [sf, cf]:
-            if f.exists():
-                f.unlink()
+        AccountManager.clear_credentials(account_id)
+        STORE.remove_account(account_id)
+        DepartureLog.purge(account_id)
+        ff = DATA_DIR / f"fleet_{account_id}.json"
+        if ff.exists():
+            ff.unlink()
 
     @staticmethod
     def get_settings(account_id: str) -> dict:
-        sf = DATA_DIR / f"settings_{account_id}.json"
-        if sf.exists():
-            try:
-                saved = json.loads(sf.read_text(encoding="utf-8"))
-                merged = DEFAULT_SETTINGS.copy()
-                merged.update(saved)
-                return merged
-            except Exception:
-                pass
-        return DEFAULT_SETTINGS.copy()
+        return STORE.settings(account_id)
 
     @staticmethod
     def save_settings(account_id: str, settings: dict):
-        sf = DATA_DIR / f"settings_{account_id}.json"
-        sf.write_text(json.dumps(settings, indent=2), encoding="utf-8")
+        STORE.set_settings(account_id, settings)
+
+    @staticmethod
+    def subscribe(account_id: str, fn):
+        STORE.subscribe(account_id, fn)
+
+    @staticmethod
+    def unsubscribe(account_id: str, fn):
+        STORE.unsubscribe(account_id, fn)
 
     @staticmethod
     def save_credentials(account_id: str, email: str, password: str):
@@ -179,8 +701,7 @@ class AccountManager:
             try:
                 keyring.set_password(key, "email", email)
                 keyring.set_password(key, "password", password)
-                cf = DATA_DIR / f".creds_{account_id}"
-                cf.write_text(json.dumps({"backend": "keyring"}), encoding="utf-8")
+                STORE.set_credentials(account_id, "keyring")
                 return
             except Exception:
                 pass
@@ -189,25 +710,24 @@ class AccountManager:
         def obf(t):
             d = t.encode()
             return base64.b64encode(bytes([d[i] ^ xkey[i % len(xkey)] for i in range(len(d))])).decode()
-        cf = DATA_DIR / f".creds_{account_id}"
-        cf.write_text(json.dumps({"backend": "file", "email": obf(email), "password": obf(password)}), encoding="utf-8")
+        STORE.set_credentials(account_id, "file", obf(email), obf(password))
 
     @staticmethod
     def load_credentials(account_id: str):
-        cf = DATA_DIR / f".creds_{account_id}"
-        if not cf.exists():
+        row = STORE.credentials(account_id)
+        if not row:
             return None, None
         try:
-            data = json.loads(cf.read_text(encoding="utf-8"))
-            if data.get("backend") == "keyring" and KEYRING_AVAILABLE:
+            backend, email, password = row
+            if backend == "keyring" and KEYRING_AVAILABLE:
                 key = f"PirateBrowser_{account_id}"
                 return keyring.get_password(key, "email"), keyring.get_password(key, "password")
-            elif data.get("backend") == "file":
+            elif backend == "file":
                 xkey = b"PirateBrowserKey1234567890ABCDEF"
                 def deobf(t):
                     d = base64.b64decode(t.encode())
                     return bytes([d[i] ^ xkey[i % len(xkey)] for i in range(len(d))]).decode()
-                return deobf(data["email"]), deobf(data["password"])
+                return deobf(email), deobf(password)
         except Exception:
             pass
         return None, None
@@ -221,415 +741,1638 @@ class AccountManager:
                 keyring.delete_password(key, "password")
             except Exception:
                 pass
-        cf = DATA_DIR / f".creds_{account_id}"
-        if cf.exists():
-            cf.unlink()
-
-
-# ── LOGIN SCREEN ──────────────────────────────────────────────────────────────
-def show_login_dialog(parent, account_name: str, on_login):
-    """Shows a modal login dialog on top of the main window."""
-    popup = ctk.CTkToplevel(parent)
-    popup.title(f"Pirate Browser — {account_name}")
-    popup.geometry("380x460")
-    popup.resizable(False, False)
-    popup.configure(fg_color="#0a0f1e")
-    popup.grab_set()
-    popup.lift()
-    popup.focus_force()
-
-    submitted = [False]
-
-    ctk.CTkLabel(popup, text="🏴‍☠️",
-                 font=("Segoe UI", 48)).pack(pady=(28, 4))
-    ctk.CTkLabel(popup, text="PIRATE BROWSER",
-                 font=("Segoe UI", 16, "bold"),
-                 text_color="#0db8f4").pack()
-    ctk.CTkLabel(popup, text=account_name,
-                 font=("Segoe UI", 11),
-                 text_color="#334155").pack(pady=(2, 16))
-
-    form = ctk.CTkFrame(popup, fg_color="#0d1530", corner_radius=12)
-    form.pack(fill="x", padx=30)
-
-    ctk.CTkLabel(form, text="Email", font=("Segoe UI", 10),
-                 text_color="#64748b", anchor="w").pack(fill="x", padx=16, pady=(16, 2))
-    email_entry = ctk.CTkEntry(form, placeholder_text="your@email.com",
-                               font=("Segoe UI", 11), height=38,
-                               fg_color="#111827", text_color="#e2e8f0",
-                               border_color="#1e2d4a")
-    email_entry.pack(fill="x", padx=16, pady=(0, 10))
-
-    ctk.CTkLabel(form, text="Password", font=("Segoe UI", 10),
-                 text_color="#64748b", anchor="w").pack(fill="x", padx=16, pady=(0, 2))
-    pass_entry = ctk.CTkEntry(form, placeholder_text="••••••••",
-                              show="•", font=("Segoe UI", 11), height=38,
-                              fg_color="#111827", text_color="#e2e8f0",
-                              border_color="#1e2d4a")
-    pass_entry.pack(fill="x", padx=16, pady=(0, 10))
-
-    remember_var = tk.BooleanVar(value=True)
-    ctk.CTkCheckBox(form, text="Remember me", variable=remember_var,
-                    font=("Segoe UI", 10), text_color="#64748b",
-                    fg_color="#0db8f4", checkmark_color="white").pack(
-        anchor="w", padx=16, pady=(0, 16))
-
-    error_var = tk.StringVar(value="")
-    ctk.CTkLabel(popup, textvariable=error_var,
-                 font=("Segoe UI", 10), text_color="#ef4444").pack(pady=(6, 0))
-
-    def _submit():
-        email    = email_entry.get().strip()
-        password = pass_entry.get().strip()
-        if not email or not password:
-            error_var.set("Please enter your email and password")
-            return
-        if "@" not in email:
-            error_var.set("Please enter a valid email address")
-            return
-        submitted[0] = True
-        on_login(email, password, remember_var.get())
-        popup.destroy()
+        STORE.clear_credentials(account_id)
+
+
+# ── DRIVER SCHEDULER ──────────────────────────────────────────────────────────
+class DriverScheduler:
+    """Runs every WebDriver command for one browser on a single thread.
+
+    Commands are queued per tab handle. The worker keeps serving the tab it
+    is focused on (up to MAX_TAB_BATCH commands in a row) to avoid window
+    switches, then moves on round-robin so every account gets its turn.
+    Commands tagged with tab None don't care which tab is focused.
+    """
+    MAX_TAB_BATCH = 8
+
+    def __init__(self, get_driver, log_fn):
+        self._get_driver = get_driver
+        self.log         = log_fn
+        self._cv         = threading.Condition()
+        self._queues: dict[str, collections.deque] = {}
+        self._order      = collections.deque()   # round-robin order of tabs
+        self._current    = None    # tab whose commands are being batched
+        self._focused    = None    # tab the driver is switched to
+        self._batch      = 0
+        self._running    = False
+        self._waits      = collections.deque(maxlen=500)   # recent queue waits (s)
+        self._active     = None    # (started, budget) of the command being run
+        self.executed    = 0
+        self.switches    = 0
+
+    def start(self):
+        with self._cv:
+            if self._running:
+                return
+            self._running = True
+        threading.Thread(target=self._worker, daemon=True, name="driver-scheduler").start()
+
+    def stop(self):
+        with self._cv:
+            self._running = False
+            pending = [item for q in self._queues.values() for item in q]
+            self._queues.clear()
+            self._cv.notify_all()
+        for _, fut, _, _ in pending:
+            if fut.set_running_or_notify_cancel():
+                fut.set_exception(RuntimeError("browser closed"))
+
+    def submit(self, tab, fn, budget: float = None) -> concurrent.futures.Future:
+        """Queue fn(driver) to run with `tab` focused; returns a Future.
+
+        `budget` is how long the command may legitimately run (default
+        COMMAND_BUDGET); the browser pool only suspects a hang past it.
+        """
+        fut = concurrent.futures.Future()
+        with self._cv:
+            if not self._running:
+                fut.set_exception(RuntimeError("browser not running"))
+                return fut
+            if tab not in self._queues:
+                self._queues[tab] = collections.deque()
+                self._order.append(tab)
+            self._queues[tab].append((fn, fut, time.monotonic(), budget or COMMAND_BUDGET))
+            self._cv.notify()
+        return fut
+
+    def call(self, tab, fn, budget: float = None):
+        """Run fn(driver) for `tab` and wait for its result."""
+        return self.submit(tab, fn, budget).result()
+
+    def running(self):
+        """(seconds running, budget) of the current command, or None when idle."""
+        with self._cv:
+            if self._active is None:
+                return None
+            started, budget = self._active
+            return time.monotonic() - started, budget
+
+    def forget(self, tab):
+        """Drop a closed tab from the rotation."""
+        with self._cv:
+            if tab in self._queues and not self._queues[tab]:
+                del self._queues[tab]
+                self._order.remove(tab)
+            if self._focused == tab:
+                self._focused = None
+
+    def _next(self):
+        """Pick the next command; caller holds the condition lock."""
+        cur = self._queues.get(self._current)
+        if cur and self._batch < self.MAX_TAB_BATCH:
+            self._batch += 1
+            return self._current, cur.popleft()
+        for _ in range(len(self._order)):
+            tab = self._order[0]
+            self._order.rotate(-1)
+            if tab != self._current and self._queues.get(tab):
+                self._current, self._batch = tab, 1
+                return tab, self._queues[tab].popleft()
+        if cur:
+            self._batch = 1
+            return self._current, cur.popleft()
+        return None
+
+    def _worker(self):
+        while True:
+            with self._cv:
+                item = self._next() if self._running else None
+                while self._running and item is None:
+                    self._cv.wait()
+                    item = self._next()
+                if not self._running:
+                    return
+            tab, (fn, fut, queued, budget) = item
+            if not fut.set_running_or_notify_cancel():
+                continue
+            self._waits.append(time.monotonic() - queued)
+            with self._cv:
+                self._active = (time.monotonic(), budget)
+            try:
+                driver = self._get_driver()
+                if tab is not None and tab != self._focused:
+                    self._focused = None
+                    driver.switch_to.window(tab)
+                    self._focused = tab
+                    self.switches += 1
+                fut.set_result(fn(driver))
+            except BaseException as e:
+                fut.set_exception(e)
+            with self._cv:
+                self._active = None
+            self.executed += 1
+
+    def stats(self) -> dict:
+        """Queue depth per tab plus wait-time figures over recent commands."""
+        with self._cv:
+            per_tab = {tab: len(q) for tab, q in self._queues.items() if q}
+            waits   = sorted(self._waits)
+        def pct(p):
+            return round(waits[min(len(waits) - 1, int(len(waits) * p))] * 1000, 1) if waits else 0.0
+        return {
+            "queued":      sum(per_tab.values()),
+            "per_tab":     per_tab,
+            "executed":    self.executed,
+            "switches":    self.switches,
+            "wait_avg_ms": round(sum(waits) / len(waits) * 1000, 1) if waits else 0.0,
+            "wait_p95_ms": pct(0.95),
+            "wait_max_ms": round(waits[-1] * 1000, 1) if waits else 0.0,
+        }
+
+
+# ── DRIVER PROVISIONING ───────────────────────────────────────────────────────
+DRIVER_CACHE_FILE = DATA_DIR / "drivers.json"
+BROWSER_ORDER     = ("chrome", "edge", "firefox")   # launch preference
+STARTUP_HISTORY   = 20    # startup timing records kept in the cache file
+EDGE_BINARY       = r"C:\Program Files (x86)\Microsoft\Edge\Application\msedge.exe"
+
+def _program_paths(*parts) -> list:
+    roots = [os.environ.get(v) for v in ("PROGRAMFILES", "PROGRAMFILES(X86)", "LOCALAPPDATA")]
+    return [str(Path(r, *parts)) for r in roots if r]
+
+BROWSER_BINARIES = {
+    "chrome":  (_program_paths("Google", "Chrome", "Application", "chrome.exe"),
+                ("google-chrome", "google-chrome-stable", "chromium", "chromium-browser", "chrome")),
+    "edge":    ([EDGE_BINARY] + _program_paths("Microsoft", "Edge", "Application", "msedge.exe"),
+                ("microsoft-edge", "microsoft-edge-stable", "msedge")),
+    "firefox": (_program_paths("Mozilla Firefox", "firefox.exe"),
+                ("firefox",)),
+}
+
+def find_browser(name: str):
+    """Installed binary for a browser, or None (no process is started)."""
+    paths, commands = BROWSER_BINARIES[name]
+    for p in paths:
+        if Path(p).exists():
+            return p
+    for c in commands:
+        found = shutil.which(c)
+        if found:
+            return found
+    return None
+
+def browser_version(binary: str):
+    """Version string from the install folder, or `--version` off Windows."""
+    folder = Path(binary).parent
+    try:
+        # Chrome/Edge keep a folder named after the version next to the exe
+        vers = [d.name for d in folder.iterdir()
+                if d.is_dir() and re.fullmatch(r"\d+(\.\d+){2,3}", d.name)]
+        if vers:
+            return max(vers, key=version_tuple)
+        ini = folder / "application.ini"   # Firefox
+        if ini.exists():
+            m = re.search(r"^Version=(\S+)", ini.read_text(encoding="utf-8", errors="ignore"), re.M)
+            if m:
+                return m.group(1)
+    except OSError:
+        pass
+    if os.name != "nt":   # on Windows --version would open a window
+        try:
+            out = subprocess.run([binary, "--version"], capture_output=True,
+                                 text=True, timeout=5).stdout
+            m = re.search(r"(\d+(?:\.\d+)+)", out)
+            if m:
+                return m.group(1)
+        except (OSError, subprocess.SubprocessError):
+            pass
+    return None
+
+class DriverProvisioner:
+    """Finds browsers and their drivers, caching resolved drivers in DATA_DIR.
+
+    A cached driver is reused (offline) while its file exists and the
+    browser's major version is unchanged. Probing runs for all browsers at
+    once so a slow driver lookup for one doesn't delay the others.
+    """
+
+    def __init__(self, log_fn, path: Path = DRIVER_CACHE_FILE):
+        self.log   = log_fn
+        self.path  = path
+        self._lock = threading.Lock()
+        try:
+            self._cache = json.loads(path.read_text(encoding="utf-8"))
+        except Exception:
+            self._cache = {}
+        self._cache.setdefault("drivers", {})
+        self._cache.setdefault("startups", [])
+
+    def _save(self):
+        try:
+            atomic_write(self.path, json.dumps(self._cache, indent=2))
+        except OSError:
+            pass
+
+    def _download_driver(self, name: str):
+        if name == "chrome":
+            from webdriver_manager.chrome import ChromeDriverManager
+            return ChromeDriverManager().install()
+        if name == "firefox":
+            from webdriver_manager.firefox import GeckoDriverManager
+            return GeckoDriverManager().install()
+        local = Path(__file__).parent / "msedgedriver.exe"
+        return str(local) if local.exists() else (shutil.which("msedgedriver") or "msedgedriver")
+
+    def _resolve(self, name: str, version) -> dict:
+        """Driver for one browser: cached if still valid, else looked up and cached."""
+        with self._lock:
+            cached = self._cache["drivers"].get(name)
+        major  = (version or "").split(".")[0]
+        usable = cached and Path(cached["driver"]).exists()
+        if usable and (not major or cached.get("version", "").split(".")[0] == major):
+            return {"driver": cached["driver"], "cached": True}
+        try:
+            driver = self._download_driver(name)
+        except Exception as e:
+            if usable:   # offline: an older driver beats none
+                self.log(f"⚠ {name} driver lookup failed ({e}) — using cached driver")
+                return {"driver": cached["driver"], "cached": True}
+            raise
+        with self._lock:
+            self._cache["drivers"][name] = {"driver": driver, "version": version or "",
+                                            "resolved_at": time.time()}
+            self._save()
+        return {"driver": driver, "cached": False}
+
+    def _probe_one(self, name: str) -> dict:
+        t0 = time.monotonic()
+        binary = find_browser(name)
+        info = {"name": name, "binary": binary, "version": None, "driver": None,
+                "cached": False, "error": None}
+        if binary:
+            info["version"] = browser_version(binary)
+            try:
+                info.update(self._resolve(name, info["version"]))
+            except Exception as e:
+                info["error"] = str(e)
+        info["probe_s"] = round(time.monotonic() - t0, 3)
+        return info
 
-    ctk.CTkButton(popup, text="Login & Launch  🚀",
-                  font=("Segoe UI", 12, "bold"),
-                  fg_color="#0db8f4", hover_color="#0a9bd0",
-                  height=42, corner_radius=8,
-                  command=_submit).pack(fill="x", padx=30, pady=10)
+    def probe(self) -> list:
+        """All browsers probed concurrently, in BROWSER_ORDER."""
+        with concurrent.futures.ThreadPoolExecutor(len(BROWSER_ORDER)) as pool:
+            return list(pool.map(self._probe_one, BROWSER_ORDER))
 
-    popup.bind("<Return>", lambda e: _submit())
-    parent.wait_window(popup)
-    return submitted[0]
+    def invalidate(self, name: str):
+        """Forget a driver that failed to launch its browser."""
+        with self._lock:
+            if self._cache["drivers"].pop(name, None):
+                self._save()
+
+    def record_startup(self, entry: dict):
+        with self._lock:
+            self._cache["startups"] = (self._cache["startups"] + [entry])[-STARTUP_HISTORY:]
+            self._save()
 
+    def startups(self) -> list:
+        with self._lock:
+            return list(self._cache["startups"])
 
 # ── SHARED BROWSER (single window, one tab per account) ──────────────────────
 class SharedBrowser:
-    """One browser window shared across all accounts. Each account gets a tab."""
-    _instance = None
-    _lock     = threading.Lock()
+    """One browser window shared by several accounts. Each account gets a tab."""
 
-    @classmethod
-    def get(cls, log_fn=None):
-        with cls._lock:
-            if cls._instance is None:
-                cls._instance = cls(log_fn)
-            return cls._instance
-
-    def __init__(self, log_fn):
+    def __init__(self, log_fn, script_timeout: float = SCRIPT_TIMEOUT, headless: bool = False):
         self.driver   = None
-        self.log      = log_fn or print
-        self._lock    = threading.Lock()
+        self.log      = log_fn or (lambda m: LOGS.emit("browser", m))
         self.ready    = False
+        self.headless = headless
+        self.startup  = None    # phase timings of the last start()
+        self.script_timeout   = script_timeout
+        self._applied_timeout = None
+        # Every command for this driver goes through the scheduler
+        self.scheduler = DriverScheduler(lambda: self.driver, self.log)
 
     def start(self):
         if self.ready:
             return
-        launched = False
-        errors   = []
-
-        # ── Chrome ────────────────────────────────────────────────────────────
-        if not launched:
-            try:
-                from selenium import webdriver
-                from selenium.webdriver.chrome.service import Service as CS
-                from selenium.webdriver.chrome.options import Options as CO
-                from webdriver_manager.chrome import ChromeDriverManager
-                opts = CO()
-                opts.add_argument("--disable-blink-features=AutomationControlled")
-                opts.add_experimental_option("excludeSwitches", ["enable-automation"])
-                opts.add_experimental_option("useAutomationExtension", False)
-                self.log("⬇ Trying Chrome…")
-                self.driver = webdriver.Chrome(
-                    service=CS(ChromeDriverManager().install()), options=opts)
-                self.driver.set_window_position(380, 0)
-                self.driver.set_window_size(1100, 860)
-                self.ready   = True
-                launched     = True
-                self.log("✅ Chrome opened")
-            except Exception as e:
-                errors.append(f"Chrome: {e}")
-
-        # ── Edge ──────────────────────────────────────────────────────────────
-        if not launched:
+        t0     = time.monotonic()
+        prov   = DriverProvisioner(self.log)
+        probed = prov.probe()
+        phases = {"probe": round(time.monotonic() - t0, 3)}
+        for p in probed:
+            if p["binary"]:
+                src = "cached driver" if p["cached"] else "driver looked up"
+                self.log(f"🔎 {p['name']} {p['version'] or ''} found ({src}, {p['probe_s']}s)"
+                         + (f" — {p['error']}" if p["error"] else ""))
+        # Installed browsers first; undetected ones are still tried as before
+        order  = sorted(probed, key=lambda p: not p["binary"])
+        errors = []
+        for p in order:
+            name = p["name"]
+            if p["error"]:
+                errors.append(f"{name}: {p['error']}")
+                continue
+            self.log(f"⬇ Trying {name.title()}…")
+            t = time.monotonic()
             try:
-                from selenium import webdriver
-                from selenium.webdriver.edge.service import Service as ES
-                from selenium.webdriver.edge.options import Options as EO
-                EDGE_BINARY  = r"C:\Program Files (x86)\Microsoft\Edge\Application\msedge.exe"
-                local_driver = Path(__file__).parent / "msedgedriver.exe"
-                edge_driver  = str(local_driver) if local_driver.exists() else "msedgedriver"
-                opts = EO()
-                opts.add_argument("--disable-blink-features=AutomationControlled")
-                opts.add_argument("--no-sandbox")
-                opts.binary_location = EDGE_BINARY
-                self.log("⬇ Trying Edge…")
-                self.driver = webdriver.Edge(service=ES(edge_driver), options=opts)
-                self.driver.set_window_position(380, 0)
-                self.driver.set_window_size(1100, 860)
-                self.ready   = True
-                launched     = True
-                self.log("✅ Edge opened")
+                driver = p["driver"] or prov._resolve(name, None)["driver"]
+                self.driver = self._launch(name, p["binary"], driver)
             except Exception as e:
-                errors.append(f"Edge: {e}")
+                errors.append(f"{name}: {e}")
                 self.driver = None
-
-        # ── Firefox ───────────────────────────────────────────────────────────
-        if not launched:
-            try:
-                from selenium import webdriver
-                from selenium.webdriver.firefox.service import Service as FS
-                from selenium.webdriver.firefox.options import Options as FO
-                from webdriver_manager.firefox import GeckoDriverManager
-                opts = FO()
-                self.log("⬇ Trying Firefox…")
-                self.driver = webdriver.Firefox(
-                    service=FS(GeckoDriverManager().install()), options=opts)
-                self.driver.set_window_position(380, 0)
-                self.driver.set_window_size(1100, 860)
-                self.ready   = True
-                launched     = True
-                self.log("✅ Firefox opened")
-            except Exception as e:
-                errors.append(f"Firefox: {e}")
-
-        if not launched:
+                if p["cached"]:
+                    prov.invalidate(name)
+                continue
+            phases["launch"] = round(time.monotonic() - t, 3)
+            self.ready = True
+            self.log(f"✅ {name.title()} opened")
+            break
+        else:
             self.log("❌ No browser found. Please install Chrome, Edge or Firefox.")
             return
 
+        self.set_script_timeout(self.script_timeout)
         # Open initial tab
+        t = time.monotonic()
         self.driver.get(GAME_URL)
+        phases["first_page"] = round(time.monotonic() - t, 3)
+        phases["total"]      = round(time.monotonic() - t0, 3)
+        self.startup = {"ts": time.time(), "browser": name, "version": p["version"],
+                        "cached_driver": p["cached"], "failed": errors, "phases": phases}
+        prov.record_startup(self.startup)
+        self.log("⏱ Startup " + "  •  ".join(f"{k} {v:.2f}s" for k, v in phases.items())
+                 + ("  (cached driver)" if p["cached"] else "  (driver looked up)"))
+        self.scheduler.start()
+
+    def _launch(self, name: str, binary, driver_path: str):
+        """Start one browser with our options; raises if it doesn't come up."""
+        from selenium import webdriver
+        if name == "chrome":
+            from selenium.webdriver.chrome.service import Service as CS
+            from selenium.webdriver.chrome.options import Options as CO
+            opts = CO()
+            opts.add_argument("--disable-blink-features=AutomationControlled")
+            opts.add_experimental_option("excludeSwitches", ["enable-automation"])
+            opts.add_experimental_option("useAutomationExtension", False)
+            if binary:
+                opts.binary_location = binary
+            if self.headless:
+                opts.add_argument("--headless=new")
+            drv = webdriver.Chrome(service=CS(driver_path), options=opts)
+        elif name == "edge":
+            from selenium.webdriver.edge.service import Service as ES
+            from selenium.webdriver.edge.options import Options as EO
+            opts = EO()
+            opts.add_argument("--disable-blink-features=AutomationControlled")
+            opts.add_argument("--no-sandbox")
+            opts.binary_location = binary or EDGE_BINARY
+            if self.headless:
+                opts.add_argument("--headless=new")
+            drv = webdriver.Edge(service=ES(driver_path), options=opts)
+        else:
+            from selenium.webdriver.firefox.service import Service as FS
+            from selenium.webdriver.firefox.options import Options as FO
+            opts = FO()
+            if binary:
+                opts.binary_location = binary
+            if self.headless:
+                opts.add_argument("-headless")
+            drv = webdriver.Firefox(service=FS(driver_path), options=opts)
+        drv.set_window_position(380, 0)
+        drv.set_window_size(1100, 860)
+        return drv
+
+    def set_script_timeout(self, seconds: float):
+        """Apply the async-script timeout, skipping the round trip if unchanged."""
+        if self.driver and seconds != self._applied_timeout:
+            self.driver.set_script_timeout(seconds)
+            self._applied_timeout = seconds
+
+    def run(self, tab, fn, budget: float = None):
+        """Run fn(driver) through the scheduler with `tab` focused."""
+        return self.scheduler.call(tab, fn, budget)
+
+    def first_tab(self) -> str:
+        return self.run(None, lambda d: d.window_handles[0])
 
     def new_tab(self) -> str:
         """Opens a new browser tab and returns its handle."""
-        with self._lock:
-            self.driver.execute_script("window.open(arguments[0], '_blank');", GAME_URL)
-            time.sleep(0.5)
-            return self.driver.window_handles[-1]
+        before = set(self.run(None, lambda d: d.window_handles))
+        self.run(None, lambda d: d.execute_script("window.open(arguments[0], '_blank');", GAME_URL))
+        time.sleep(0.5)
+        handles = self.run(None, lambda d: d.window_handles)
+        opened  = [h for h in handles if h not in before]
+        return opened[-1] if opened else handles[-1]
+
+    def stats(self) -> dict:
+        return dict(self.scheduler.stats(), startup=self.startup)
 
     def close(self):
-        """Close just this account's tab."""
+        """Stop the scheduler and quit the whole browser."""
+        self.scheduler.stop()
         try:
-            if self.driver and self.tab_handle:
-                self._switch()
-                if len(self.driver.window_handles) > 1:
-                    self.driver.close()
-                # Don't quit the whole browser — SharedBrowser.close() does that
+            if self.driver:
+                self.driver.quit()
         except Exception:
             pass
-        SharedBrowser._instance = None
+        self.driver = None
+        self.ready  = False
+
+
+# ── BROWSER POOL ──────────────────────────────────────────────────────────────
+POOL_HEALTH_INTERVAL = 15                 # seconds between liveness checks
+POOL_HEALTH_TIMEOUT  = SCRIPT_TIMEOUT * 2 # an idle browser this slow to answer is dead…
+POOL_HANG_GRACE      = SCRIPT_TIMEOUT * 2 # …as is one running a command this far past its budget
+POOL_START_TIMEOUT   = 120                # accounts wait this long for a starting browser
+
+def default_pool_size() -> int:
+    """PIRATE_BROWSERS if set, else one browser per two CPUs (1–4)."""
+    env = os.environ.get("PIRATE_BROWSERS", "")
+    if env.isdigit() and int(env) > 0:
+        return int(env)
+    return max(1, min(4, (os.cpu_count() or 2) // 2))
+
+class _PoolMember:
+    def __init__(self, number: int, browser: SharedBrowser):
+        self.number     = number
+        self.browser    = browser
+        self.accounts   = set()
+        self.launched   = False
+        self.started    = threading.Event()
+        self.first_free = True            # the window's initial tab is unclaimed
+        self.tab_lock   = threading.Lock()
+        self.dead       = False
+
+class BrowserPool:
+    """Up to `size` browser instances with accounts spread across them.
+
+    Placement is least-loaded: a new browser is started while every running
+    one already has an account, then accounts go to the emptiest. A monitor
+    thread pings each browser; when one dies its accounts are re-placed and
+    told through their on_moved callback.
+    """
+
+    def __init__(self, log_fn, size: int = None, headless: bool = False):
+        self.log       = log_fn
+        self.size      = max(1, size or default_pool_size())
+        self.headless  = headless
+        self._lock     = threading.RLock()
+        self._members  = []
+        self._where    = {}      # account id -> member
+        self._moved    = {}      # account id -> on_moved(shared, tab)
+        self._next_no  = 1
+        self._monitor  = None
+        self._stop     = threading.Event()
+
+    def _place(self) -> _PoolMember:
+        """Pick (or create) the member for a new account (caller holds _lock)."""
+        live = [m for m in self._members if not m.dead]
+        if len(live) < self.size and all(m.accounts for m in live):
+            n = self._next_no
+            self._next_no += 1
+            m = _PoolMember(n, SharedBrowser(lambda msg, n=n: self.log(f"[#{n}] {msg}"),
+                                             headless=self.headless))
+            self._members.append(m)
+            return m
+        return min(live, key=lambda m: (len(m.accounts), m.number))
+
+    def _assign(self, account_id: str):
+        """Place an account, starting its browser if needed; returns (member, tab) or None."""
+        with self._lock:
+            m = self._place()
+            m.accounts.add(account_id)
+            self._where[account_id] = m
+            starter, m.launched = not m.launched, True
+        if starter:
+            try:
+                m.browser.start()
+            finally:
+                m.started.set()
+        else:
+            m.started.wait(POOL_START_TIMEOUT)
+        try:
+            if not m.browser.ready:
+                raise RuntimeError("browser did not start")
+            with m.tab_lock:
+                if m.first_free:
+                    m.first_free = False
+                    tab = m.browser.first_tab()
+                else:
+                    tab = m.browser.new_tab()
+        except Exception as e:
+            self.log(f"❌ Browser #{m.number}: {e}")
+            with self._lock:
+                m.accounts.discard(account_id)
+                self._where.pop(account_id, None)
+                if not m.accounts:
+                    m.dead = True
+                    if m in self._members:   # _replace may have dropped it already
+                        self._members.remove(m)
+            return None
+        return m, tab
+
+    def acquire(self, account_id: str, on_moved=None):
+        """(SharedBrowser, tab handle) for an account, or None if no browser starts."""
+        placed = self._assign(account_id)
+        if not placed:
+            return None
+        with self._lock:
+            self._moved[account_id] = on_moved
+            if self._monitor is None:
+                self._monitor = threading.Thread(target=self._watch, daemon=True)
+                self._monitor.start()
+        m, tab = placed
+        return m.browser, tab
+
+    def release(self, account_id: str):
+        """Forget an account; close its browser if that leaves it empty (keeping one)."""
+        with self._lock:
+            self._moved.pop(account_id, None)
+            m = self._where.pop(account_id, None)
+            if not m:
+                return
+            m.accounts.discard(account_id)
+            live = [x for x in self._members if not x.dead]
+            if m.accounts or len(live) <= 1:
+                return
+            m.dead = True
+            self._members.remove(m)
+        threading.Thread(target=m.browser.close, daemon=True).start()
+
+    def number(self, browser: SharedBrowser):
+        with self._lock:
+            return next((m.number for m in self._members if m.browser is browser), None)
+
+    @staticmethod
+    def _hung(scheduler: DriverScheduler):
+        """Why the browser's running command counts as hung, or None.
+
+        A busy browser is alive as long as its command is within its own
+        budget (a departure batch can take minutes); the probe only runs
+        when it is idle, so it never waits behind real work.
+        """
+        run = scheduler.running()
+        if run and run[0] > run[1] + POOL_HANG_GRACE:
+            return f"command running {run[0]:.0f}s, budget {run[1]:.0f}s"
+        return None
+
+    def _watch(self):
+        while not self._stop.wait(POOL_HEALTH_INTERVAL):
+            with self._lock:
+                members = [m for m in self._members if m.browser.ready and not m.dead]
+            for m in members:
+                scheduler = m.browser.scheduler
+                if scheduler.running():
+                    reason = self._hung(scheduler)
+                    if reason:
+                        self._replace(m, reason)
+                    continue
+                try:
+                    scheduler.submit(None, lambda d: d.window_handles,
+                                     budget=POOL_HEALTH_TIMEOUT).result(POOL_HEALTH_TIMEOUT)
+                except concurrent.futures.TimeoutError:
+                    # Queued behind a command that started first: judge that one instead
+                    reason = self._hung(scheduler) if scheduler.running() else "no answer"
+                    if reason:
+                        self._replace(m, reason)
+                except Exception as e:
+                    self._replace(m, str(e) or type(e).__name__)
+
+    def _replace(self, m: _PoolMember, reason):
+        """Drop a dead browser and move its accounts onto the others."""
+        with self._lock:
+            if m.dead:
+                return
+            m.dead = True
+            self._members.remove(m)
+            moving = sorted(m.accounts)
+            for aid in moving:
+                self._where.pop(aid, None)
+        self.log(f"❌ Browser #{m.number} stopped responding ({reason}) — "
+                 f"moving {len(moving)} account(s)")
+        threading.Thread(target=m.browser.close, daemon=True).start()
+        for aid in moving:
+            placed = self._assign(aid)
+            callback = self._moved.get(aid)
+            if placed and callback:
+                new, tab = placed
+                ORCH.submit(callback, new.browser, tab, lane="login")
+
+    def stats(self) -> list:
+        """Per-browser load: accounts placed plus its scheduler numbers."""
+        with self._lock:
+            members = [m for m in self._members if not m.dead]
+        out = []
+        for m in members:
+            st = m.browser.stats() if m.browser.ready else {}
+            out.append({"number": m.number, "accounts": len(m.accounts),
+                        "ready": m.browser.ready, **st})
+        return out
+
+    def close(self):
+        self._stop.set()
+        with self._lock:
+            members, self._members = self._members, []
+            self._where.clear()
+            self._moved.clear()
+        for m in members:
+            m.dead = True
+            m.browser.close()
+
+# ── PAGE SCRIPTS ──────────────────────────────────────────────────────────────
+# Shared JS helpers, prepended to the scripts that need them.
+JS_READ_BUNKER = """
+    function pbReadBunker() {
+        try {
+            var app = document.querySelector('#app');
+            if (!app || !app.__vue_app__) return null;
+            var pinia = app.__vue_app__._context.provides.pinia
+                     || app.__vue_app__.config.globalProperties.$pinia;
+            if (!pinia) return null;
+            var us = pinia._s.get('user');
+            if (!us || !us.user) return null;
+            var u = us.user; var st = us.userSettings || {};
+            return {
+                fuel:    (u.fuel    || 0) / 1000,
+                co2:     (u.co2     || 0) / 1000,
+                cash:     u.cash   || 0,
+                maxFuel: (st.max_fuel || 1000000) / 1000,
+                maxCO2:  (st.max_co2  || 1000000) / 1000
+            };
+        } catch(e) { return null; }
+    }
+"""
+
+# Non-blocking transport: fetch() with an abort timer. Never rejects — every
+# outcome is a {ok, status, data, error, message} result.
+JS_API = """
+    function pbApi(base, path, body, timeoutMs) {
+        var t0    = Date.now();
+        var ctl   = (typeof AbortController !== 'undefined') ? new AbortController() : null;
+        var timer = ctl ? setTimeout(function() { ctl.abort(); }, timeoutMs) : null;
+        return fetch(base + path, {
+            method: 'POST',
+            headers: {'Content-Type': 'application/json'},
+            credentials: 'include',
+            body: JSON.stringify(body || {}),
+            signal: ctl ? ctl.signal : undefined
+        }).then(function(r) {
+            return r.text().then(function(t) {
+                var data;
+                try { data = t ? JSON.parse(t) : null; }
+                catch(e) { return {ok:false, status:r.status, error:'parse', message:e.message}; }
+                if (!r.ok) return {ok:false, status:r.status, error:'http', message:r.statusText, data:data};
+                return {ok:true, status:r.status, data:data};
+            });
+        }).catch(function(e) {
+            if (e && e.name === 'AbortError')
+                return {ok:false, status:0, error:'timeout', message:'no answer after '+timeoutMs+'ms'};
+            return {ok:false, status:0, error:'network', message:String((e && e.message) || e)};
+        }).then(function(res) {
+            res.ms = Date.now() - t0;
+            return res;
+        }).finally(function() { if (timer) clearTimeout(timer); });
+    }
+"""
+
+# Runs the calls with at most `limit` in flight and starts spaced `gap` ms
+# apart; results come back in call order.
+JS_API_BATCH = """
+    var done = arguments[arguments.length - 1];
+    var calls = arguments[0], base = arguments[1], ms = arguments[2], withBunker = arguments[3];
+    var limit = arguments[4] || calls.length, gap = arguments[5] || 0;
+    var results = new Array(calls.length), next = 0, nextStart = Date.now();
+    function worker() {
+        if (next >= calls.length) return Promise.resolve();
+        var i = next++;
+        var at = Math.max(Date.now(), nextStart);
+        nextStart = at + gap;
+        return new Promise(function(r) { setTimeout(r, at - Date.now()); })
+            .then(function() { return pbApi(base, calls[i][0], calls[i][1], ms); })
+            .then(function(r) { results[i] = r; return worker(); });
+    }
+    var workers = [];
+    for (var w = 0; w < Math.min(limit, calls.length); w++) workers.push(worker());
+    Promise.all(workers).then(function() {
+        done({bunker: withBunker ? pbReadBunker() : null, results: results});
+    });
+"""
+
+
+# ── GAME DATA ─────────────────────────────────────────────────────────────────
+def api_error(result: dict) -> str:
+    """Short human-readable description of a failed API result."""
+    if not result:
+        return "no result"
+    err = result.get("error") or "failed"
+    if err == "http":
+        data = result.get("data")
+        detail = data.get("error") if isinstance(data, dict) else None
+        return f"HTTP {result.get('status')}" + (f" {detail}" if detail else "")
+    if err == "game":
+        return result.get("message") or "failed"
+    msg = result.get("message")
+    return f"{err}: {msg}" if msg else err
+
+def api_data(result: dict) -> dict:
+    """The `data` member of a successful response body, or {}."""
+    body = result.get("data") if result and result.get("ok") else None
+    return (body.get("data") if isinstance(body, dict) else None) or {}
+
+def price_slot(now: datetime.datetime = None) -> str:
+    """The 30-minute UTC price slot ('HH:00' / 'HH:30') containing `now`."""
+    now = now or clock.now(datetime.timezone.utc)
+    return f"{now.hour:02d}:{'00' if now.minute < 30 else '30'}"
+
+PRICE_SLOT_SECS   = 1800   # game prices change every 30 minutes (UTC)
+PRICE_SLOT_SETTLE = 5      # wait this long past a boundary before reading the new price
+FUEL_RATE_WINDOW  = 24 * 3600   # departures used to project fuel consumption
+FUEL_SAFETY_FLOOR = 0.25        # share of maxFuel kept in the tank while waiting for a cheaper slot
+
+def price_slot_index(ts: float) -> int:
+    """Monotonic index of the price slot containing unix time `ts`."""
+    return int(ts // PRICE_SLOT_SECS)
+
+def next_price_slot(ts: float) -> float:
+    """Unix time of the next price slot boundary after `ts`."""
+    return (price_slot_index(ts) + 1) * PRICE_SLOT_SECS
+
+def bunker_changed(a: dict, b: dict) -> bool:
+    if not a or not b:
+        return True
+    return any(a.get(k) != b.get(k) for k in ("fuel", "co2", "cash", "maxFuel", "maxCO2"))
+
+def pick_prices(body: dict):
+    """Current fuel/CO2 price from a bunker/get-prices response."""
+    d = (body or {}).get("data") or {}
+    table = d.get("prices")
+    if not table:
+        return None
+    slot = price_slot()
+    e = next((p for p in table if p.get("time") == slot), table[0])
+    return {
+        "fuelPrice": d.get("discounted_fuel", e.get("fuel_price")),
+        "co2Price":  d.get("discounted_co2",  e.get("co2_price")),
+    }
+
+def price_table(body: dict) -> list:
+    """The day's slot list ({time, fuel_price, co2_price}) from a get-prices response."""
+    return list(((body or {}).get("data") or {}).get("prices") or [])
+
+def utc_day(ts: float) -> str:
+    return datetime.datetime.fromtimestamp(ts, datetime.timezone.utc).strftime("%Y-%m-%d")
+
+def next_utc_day(ts: float) -> float:
+    return (int(ts // 86400) + 1) * 86400
+
+def slot_start(slot: dict, ts: float):
+    """Unix start time of a table slot ('HH:MM') on the UTC day containing `ts`."""
+    try:
+        hh, mm = (int(x) for x in str(slot.get("time", "")).split(":"))
+    except ValueError:
+        return None
+    return int(ts // 86400) * 86400 + hh * 3600 + mm * 60
+
+def _num(v):
+    return v if isinstance(v, (int, float)) else 0
+
+def tag_utilization(vessels: list) -> list:
+    """Annotate each vessel with `_utilization` (cargo as % of capacity)."""
+    for v in vessels:
+        cap   = _num(v.get("capacity") or v.get("cargo_capacity") or 0)
+        cargo = _num(v.get("route_cargo") or v.get("current_cargo") or 0)
+        if cap > 0:
+            v["_utilization"] = int(cargo / cap * 100 + 0.5)
+        else:
+            ri        = v.get("route_info") or v.get("active_route") or {}
+            demand    = _num(ri.get("demand") or ri.get("port_demand") or 0)
+            max_cargo = _num(ri.get("max_cargo") or cap or 0)
+            v["_utilization"] = int(demand / max_cargo * 100 + 0.5) if max_cargo > 0 else 100
+    return vessels
+
+def depart_payload(vessel_id, speed, guards) -> dict:
+    return {"user_vessel_id": vessel_id, "speed": speed, "guards": guards or 0, "history": 0}
+
+def depart_result(result: dict) -> dict:
+    """Decode a route/depart result into {success, income, fuelUsed, co2Used, harbor}."""
+    if not result.get("ok"):
+        return {"success": False, "error": api_error(result)}
+    di = api_data(result).get("depart_info")
+    if di:
+        return {"success": True, "income": di.get("depart_income") or 0,
+                "fuelUsed": (di.get("fuel_usage") or 0) / 1000,
+                "co2Used": (di.get("co2_emission") or 0) / 1000,
+                "harbor": di.get("harbor_fee")}
+    return {"success": False, "error": (result.get("data") or {}).get("error") or "unknown"}
+
+def moor_result(result: dict) -> str:
+    """Decode a vessel/moor result into 'ok' or an error string."""
+    if not result.get("ok"):
+        return f"error:{api_error(result)}"
+    d = result.get("data") or {}
+    return "ok" if d.get("success") else (d.get("error") or "failed")
+
+
+# ── FLEET CACHE ───────────────────────────────────────────────────────────────
+FLEET_ROUTE_TTL = 6 * 3600    # seconds before route data is re-fetched regardless
+FLEET_ROUTE_KEYS = ("route_id", "route_origin", "route_destination")
+FLEET_CARGO_KEYS = ("route_cargo", "current_cargo", "_utilization")   # change while in port
+FLEET_DEMAND_KEYS = ("demand", "port_demand")                          # inside route_info/active_route
+
+def _fleet_static(v: dict) -> dict:
+    """A vessel record without the utilisation inputs, which go stale in port."""
+    rec = {k: x for k, x in v.items() if k not in FLEET_CARGO_KEYS}
+    for k in ("route_info", "active_route"):
+        if isinstance(rec.get(k), dict):
+            rec[k] = {kk: x for kk, x in rec[k].items() if kk not in FLEET_DEMAND_KEYS}
+    return rec
+
+def _fleet_waiting(v: dict) -> bool:
+    return v.get("status") == "port" and not v.get("is_parked")
+
+
+class FleetCache:
+    """Per-account vessel cache keyed by vessel id.
+
+    Holds the static part of the full records (routes, capacities) from
+    the last include_routes fetch and overlays the cheap status-only
+    records on them each cycle. Cargo and demand are not cached: whenever
+    a vessel is (or is due) in port the full list is fetched again, so
+    departures are always judged on current utilisation. Full data is
+    also re-fetched when a vessel is new, its route changed, or
+    FLEET_ROUTE_TTL expired. Persisted to DATA_DIR for warm restarts.
+    """
+
+    def __init__(self, account_id: str, ttl: float = FLEET_ROUTE_TTL):
+        self.path       = DATA_DIR / f"fleet_{account_id}.json"
+        self.ttl        = ttl
+        self._lock      = threading.Lock()
+        self._vessels   = {}      # vessel id -> last full record
+        self._full_at   = 0.0
+        self.hits       = 0
+        self.misses     = 0
+        self.full_fetches  = 0
+        self.light_fetches = 0
+        self._load()
+
+    def _load(self):
+        if self.path.exists():
+            try:
+                data = json.loads(self.path.read_text(encoding="utf-8"))
+                self._vessels = {v["id"]: v for v in data.get("vessels", [])}
+                self._full_at = float(data.get("fetched_at", 0))
+            except Exception:
+                self._vessels, self._full_at = {}, 0.0
+
+    def _save(self):
+        try:
+            atomic_write(self.path, json.dumps({"fetched_at": self._full_at,
+                                                "vessels": list(self._vessels.values())}))
+        except OSError:
+            pass
+
+    def needs_full(self) -> bool:
+        """True when the cache is empty or expired, or a vessel is in port or due there."""
+        now = clock.time()
+        with self._lock:
+            if not self._vessels or now - self._full_at > self.ttl:
+                return True
+            for v in self._vessels.values():
+                if _fleet_waiting(v):
+                    return True
+                t = None if v.get("is_parked") else vessel_arrival(v)
+                if t is not None and t <= now:
+                    return True
+            return False
+
+    def store_full(self, vessels: list) -> list:
+        """Replace the cache with a full include_routes fetch."""
+        with self._lock:
+            self._vessels = {v["id"]: _fleet_static(v) for v in vessels if "id" in v}
+            self._full_at = clock.time()
+            self.full_fetches += 1
+            self._save()
+        return tag_utilization(vessels)
+
+    def merge(self, light: list):
+        """Overlay status-only records on the cache.
+
+        Returns the merged vessel list, or None when a full fetch is
+        needed: a vessel is unknown, its route changed, or it is waiting in
+        port and its cargo must be read fresh.
+        """
+        with self._lock:
+            self.light_fetches += 1
+            merged, missing = [], 0
+            for v in light:
+                cached = self._vessels.get(v.get("id"))
+                if cached is None or _fleet_waiting(v) or any(
+                        k in v and v[k] != cached.get(k) for k in FLEET_ROUTE_KEYS):
+                    missing += 1
+                    continue
+                cached.update(v)   # keep status current for needs_full()
+                merged.append(dict(cached))
+            self.hits   += len(merged)
+            self.misses += missing
+        return None if missing else tag_utilization(merged)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"vessels": len(self._vessels), "hits": self.hits, "misses": self.misses,
+                    "full_fetches": self.full_fetches, "light_fetches": self.light_fetches,
+                    "route_age_s": int(clock.time() - self._full_at) if self._full_at else None}
+
+
+# ── DEPARTURE TIMERS ──────────────────────────────────────────────────────────
+DEPART_RESYNC  = 15 * 60   # full fleet re-check even when no arrival is due
+ARRIVAL_GRACE  = 10        # wait this long past an expected arrival before fetching
+ARRIVAL_FIELDS = ("route_end_time", "arrival_time", "time_arrival")
+
+def vessel_arrival(v: dict):
+    """Expected arrival (unix seconds) of a vessel at sea, or None if unknown."""
+    for k in ARRIVAL_FIELDS:
+        t = v.get(k)
+        if isinstance(t, (int, float)) and t > 0:
+            return t / 1000 if t > 1e12 else float(t)
+    return None
+
+
+class DepartureTimers:
+    """Min-heap of expected arrival times for one account's vessels at sea.
+
+    Rebuilt from every vessel fetch; the departure side sleeps until the
+    earliest arrival instead of polling the fleet.
+    """
+
+    def __init__(self):
+        self._lock    = threading.Lock()
+        self._heap    = []     # (arrival ts, vessel id)
+        self.unknown  = 0      # vessels at sea with no arrival time
+
+    def rearm(self, vessels: list, now: float):
+        heap, unknown = [], 0
+        for v in vessels or []:
+            if v.get("status") == "port" or v.get("is_parked"):
+                continue
+            t = vessel_arrival(v)
+            if t is None:
+                unknown += 1
+            elif t > now:
+                heap.append((t, v.get("id")))
+        heapq.heapify(heap)
+        with self._lock:
+            self._heap, self.unknown = heap, unknown
+
+    def next_arrival(self):
+        with self._lock:
+            return self._heap[0][0] if self._heap else None
+
+    def __len__(self):
+        with self._lock:
+            return len(self._heap)
+
+
+# ── DEPARTURE LOG ─────────────────────────────────────────────────────────────
+class DepartureLog:
+    """Newest `capacity` departures in memory; older ones spill to SQLite.
+
+    Index 0 is the newest entry. Entries past the ring buffer are read back
+    from the departures table only when the log view scrolls that far.
+    """
+
+    def __init__(self, account_id: str, capacity: int = 500, path: Path = DB_FILE):
+        self.account_id = account_id
+        self._lock = threading.Lock()
+        self._ring = collections.deque()
+        self._cap  = max(1, int(capacity))
+        self._db   = sqlite3.connect(path, timeout=10, isolation_level=None,
+                                     check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute("""CREATE TABLE IF NOT EXISTS departures (
+                                seq        INTEGER PRIMARY KEY AUTOINCREMENT,
+                                account_id TEXT NOT NULL,
+                                data       TEXT NOT NULL)""")
+        self._db.execute("CREATE INDEX IF NOT EXISTS departures_account "
+                         "ON departures(account_id, seq)")
+        self._spilled = self._db.execute(
+            "SELECT COUNT(*) FROM departures WHERE account_id=?", (account_id,)).fetchone()[0]
+
+    def __len__(self):
+        with self._lock:
+            return len(self._ring) + self._spilled
+
+    def append(self, entry: dict):
+        with self._lock:
+            self._ring.append(entry)
+            self._spill()
+
+    def resize(self, capacity: int):
+        with self._lock:
+            self._cap = max(1, int(capacity))
+            self._spill()
+
+    def _spill(self):
+        """Move entries beyond capacity to disk (caller holds _lock)."""
+        over = len(self._ring) - self._cap
+        if over <= 0:
+            return
+        old = [self._ring.popleft() for _ in range(over)]
+        self._db.executemany("INSERT INTO departures (account_id, data) VALUES (?,?)",
+                             [(self.account_id, json.dumps(e)) for e in old])
+        self._spilled += over
+
+    def entries(self, start: int, count: int) -> list:
+        """Up to `count` entries from index `start`, newest first."""
+        with self._lock:
+            ring = len(self._ring)
+            out  = [self._ring[ring - 1 - i] for i in range(start, min(start + count, ring))]
+            need = count - len(out)
+            if need > 0 and self._spilled:
+                rows = self._db.execute(
+                    "SELECT data FROM departures WHERE account_id=? "
+                    "ORDER BY seq DESC LIMIT ? OFFSET ?",
+                    (self.account_id, need, max(0, start - ring))).fetchall()
+                out += [json.loads(r[0]) for r in rows]
+            return out
+
+    def clear(self):
+        with self._lock:
+            self._ring.clear()
+            self._db.execute("DELETE FROM departures WHERE account_id=?", (self.account_id,))
+            self._spilled = 0
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+    @staticmethod
+    def purge(account_id: str, path: Path = DB_FILE):
+        """Drop an account's spilled entries (used when the account is removed)."""
+        db = sqlite3.connect(path, timeout=10)
+        try:
+            with db:
+                db.execute("DELETE FROM departures WHERE account_id=?", (account_id,))
+        except sqlite3.OperationalError:
+            pass   # table not created yet
+        finally:
+            db.close()
+
+# ── DIRECT API CLIENT ─────────────────────────────────────────────────────────
+def api_result(status: int, reason: str, raw: bytes) -> dict:
+    """Structured result for a raw HTTP response, same shape as the page transport."""
+    try:
+        data = json.loads(raw) if raw else None
+    except ValueError as e:
+        return {"ok": False, "status": status, "error": "parse", "message": str(e)}
+    if status >= 400:
+        return {"ok": False, "status": status, "error": "http", "message": reason, "data": data}
+    return {"ok": True, "status": status, "data": data}
+
+
+class GameApiClient:
+    """Keep-alive HTTP client for the game API, authenticated with browser cookies.
+
+    Thread-safe: each request borrows a connection from a small pool, so
+    several worker threads can call the API at once without the browser.
+    """
+
+    def __init__(self, base_url: str = API_URL, cookies: dict = None,
+                 user_agent: str = None, pool_size: int = 4):
+        u = urllib.parse.urlsplit(base_url)
+        self._https      = u.scheme == "https"
+        self._host       = u.hostname
+        self._port       = u.port
+        self._prefix     = u.path.rstrip("/") + "/"
+        self._origin     = f"{u.scheme}://{u.netloc}"
+        self.user_agent  = user_agent or "Mozilla/5.0"
+        self.pool_size   = pool_size
+        self._cookies    = dict(cookies or {})
+        self._lock       = threading.Lock()
+        self._idle       = queue.LifoQueue()
+        self._executor   = None
+
+    # ── Session ───────────────────────────────────────────────────────────────
+    def set_cookies(self, cookies: dict):
+        with self._lock:
+            self._cookies = dict(cookies)
+
+    def _store_cookies(self, headers: list):
+        if not headers:
+            return
+        jar = http.cookies.SimpleCookie()
+        for h in headers:
+            try:
+                jar.load(h)
+            except http.cookies.CookieError:
+                pass
+        with self._lock:
+            for name, morsel in jar.items():
+                self._cookies[name] = morsel.value
+
+    def _headers(self) -> dict:
+        with self._lock:
+            cookies = dict(self._cookies)
+        headers = {
+            "Content-Type": "application/json",
+            "Accept":       "application/json",
+            "User-Agent":   self.user_agent,
+            "Origin":       self._origin,
+            "Referer":      self._origin + "/",
+            "Cookie":       "; ".join(f"{k}={v}" for k, v in cookies.items()),
+        }
+        if "XSRF-TOKEN" in cookies:
+            headers["X-XSRF-TOKEN"] = urllib.parse.unquote(cookies["XSRF-TOKEN"])
+        return headers
+
+    # ── Connections ───────────────────────────────────────────────────────────
+    def _checkout(self, timeout: float):
+        try:
+            conn = self._idle.get_nowait()
+            reused = True
+        except queue.Empty:
+            cls  = http.client.HTTPSConnection if self._https else http.client.HTTPConnection
+            conn = cls(self._host, self._port, timeout=timeout)
+            reused = False
+        conn.timeout = timeout
+        if conn.sock:
+            conn.sock.settimeout(timeout)
+        return conn, reused
+
+    def _checkin(self, conn):
+        if self._idle.qsize() < self.pool_size:
+            self._idle.put(conn)
+        else:
+            conn.close()
+
+    def post(self, path: str, payload: dict = None, timeout: float = API_TIMEOUT) -> dict:
+        """POST one endpoint; returns {ok, status, data, error, message, ms}."""
+        t0  = time.monotonic()
+        res = self._send(path, payload, timeout)
+        res["ms"] = int((time.monotonic() - t0) * 1000)
+        return res
+
+    def _send(self, path: str, payload: dict, timeout: float) -> dict:
+        body = json.dumps(payload or {}).encode()
+        while True:
+            conn, reused = self._checkout(timeout)
+            try:
+                conn.request("POST", self._prefix + path, body, self._headers())
+                resp = conn.getresponse()
+                raw  = resp.read()
+            except TimeoutError:
+                conn.close()
+                return {"ok": False, "status": 0, "error": "timeout",
+                        "message": f"no answer after {timeout}s"}
+            except (http.client.RemoteDisconnected, ConnectionResetError, BrokenPipeError) as e:
+                conn.close()
+                if reused:
+                    continue   # server dropped an idle keep-alive socket; retry on a fresh one
+                return {"ok": False, "status": 0, "error": "network", "message": str(e)}
+            except (http.client.HTTPException, OSError) as e:
+                conn.close()
+                return {"ok": False, "status": 0, "error": "network", "message": str(e)}
+            self._store_cookies(resp.headers.get_all("Set-Cookie"))
+            if resp.will_close:
+                conn.close()
+            else:
+                self._checkin(conn)
+            return api_result(resp.status, resp.reason, raw)
+
+    def batch(self, calls: list, timeout: float = API_TIMEOUT,
+              concurrency: int = None, interval: float = 0.0) -> list:
+        """POST several (path, payload) pairs concurrently; results in order.
+
+        At most `concurrency` requests are in flight, started at least
+        `interval` seconds apart.
+        """
+        if len(calls) == 1:
+            return [self.post(calls[0][0], calls[0][1], timeout)]
+        with self._lock:
+            if self._executor is None:
+                self._executor = concurrent.futures.ThreadPoolExecutor(
+                    max_workers=self.pool_size, thread_name_prefix="game-api")
+        gate    = threading.Semaphore(concurrency or len(calls))
+        pace    = threading.Lock()
+        next_at = [time.monotonic()]
+
+        def one(call):
+            with gate:
+                if interval:
+                    with pace:
+                        at = max(time.monotonic(), next_at[0])
+                        next_at[0] = at + interval
+                    time.sleep(max(0.0, at - time.monotonic()))
+                return self.post(call[0], call[1], timeout)
+        return list(self._executor.map(one, calls))
+
+    def close(self):
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                break
+        if self._executor:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+
+
+# ── TRACES ────────────────────────────────────────────────────────────────────
+TRACE_DIR = DATA_DIR / "traces"
+
+class TraceRecorder:
+    """Appends one account's game traffic to a gzip JSONL trace for replay.py.
+
+    Records are {"k": kind, "t": unix time, ...}: "header", "tick" (a
+    manager cycle starts, with its settings), "api" (one request and its
+    result) and "bunker" (a bunker read).
+    """
+
+    def __init__(self, path: Path, account_id: str):
+        self.path  = Path(path)
+        self._lock = threading.Lock()
+        self._fh   = gzip.open(self.path, "at", encoding="utf-8")
+        self.write("header", account=account_id, version=CURRENT_VERSION)
+
+    @classmethod
+    def for_account(cls, account_id: str) -> "TraceRecorder":
+        TRACE_DIR.mkdir(parents=True, exist_ok=True)
+        stamp = time.strftime("%Y%m%d-%H%M%S")
+        return cls(TRACE_DIR / f"{account_id}-{stamp}.jsonl.gz", account_id)
+
+    def write(self, kind: str, **fields):
+        line = json.dumps({"k": kind, "t": clock.time(), **fields}, separators=(",", ":"))
+        with self._lock:
+            if self._fh:
+                self._fh.write(line + "\n")
+
+    def flush(self):
+        """Sync-flush the gzip stream so a crash loses at most the current tick."""
+        with self._lock:
+            if self._fh:
+                self._fh.flush()
+
+    def close(self):
+        with self._lock:
+            if self._fh:
+                self._fh.close()
+                self._fh = None
+
+def read_trace(path: Path):
+    """Yield a trace's records; a trace cut short by a crash ends at its last whole line."""
+    with gzip.open(path, "rt", encoding="utf-8") as fh:
+        try:
+            for line in fh:
+                try:
+                    yield json.loads(line)
+                except ValueError:
+                    return
+        except (EOFError, OSError, zlib.error):
+            return
 
 
 # ── BROWSER CONTROLLER ────────────────────────────────────────────────────────
 class BrowserController:
-    """Controls one tab within the shared browser window."""
+    """Controls one account's tab in whichever pool browser it is placed on."""
 
-    def __init__(self, log_fn, account_id: str, shared: SharedBrowser, tab_handle: str = None):
-        self.shared      = shared
+    def __init__(self, log_fn, account_id: str, pool: "BrowserPool",
+                 api_timeout: float = API_TIMEOUT):
+        self.pool        = pool
+        self.shared: SharedBrowser = None   # set by start() / a pool move
         self.log         = log_fn
-        self._lock       = threading.Lock()
         self.ready       = False
         self.account_id  = account_id
-        self.tab_handle  = tab_handle   # set after tab is opened
+        self.tab_handle  = None
+        self._login      = None         # (email, password) to log in again after a move
+        self.api_timeout = api_timeout  # per-request timeout (seconds)
+        self.direct: GameApiClient = None   # set while API-direct mode is on
+        self.fleet       = FleetCache(account_id)
+        self.recorder    = (TraceRecorder.for_account(account_id)
+                            if os.environ.get("PIRATE_TRACE") == "1" else None)
 
     @property
     def driver(self):
-        return self.shared.driver
+        return self.shared.driver if self.shared else None
 
-    def _switch(self):
-        """Switch browser focus to this account's tab."""
-        if self.tab_handle and self.driver:
-            try:
-                self.driver.switch_to.window(self.tab_handle)
-            except Exception:
-                pass
+    def _run(self, fn, budget: float = None):
+        """Queue fn(driver) for this account's tab and wait for its result."""
+        shared = self.shared
+        if not shared:
+            raise RuntimeError("no browser assigned")
+        return shared.run(self.tab_handle, fn, budget)
 
     def start(self):
-        """Wait for shared browser to be ready, then set up this account's tab."""
-        for _ in range(60):
-            if self.shared.ready: break
-            time.sleep(1)
-        if not self.shared.ready:
+        """Get a tab from the browser pool (starting a browser if needed)."""
+        placed = self.pool.acquire(self.account_id, self._moved)
+        if not placed:
             self.log("❌ Browser never became ready")
             return
+        self.shared, self.tab_handle = placed
         self.ready = True
-        self.log("✅ Browser tab ready — please log in")
+        self.log(f"✅ Browser tab ready on browser #{self.pool.number(self.shared)} — please log in")
+
+    def _moved(self, shared: SharedBrowser, tab_handle: str):
+        """The pool re-placed us after our browser died: log in again there."""
+        self.shared, self.tab_handle = shared, tab_handle
+        self.log(f"♻ Moved to browser #{self.pool.number(shared)}")
+        if self._login and self.auto_login(*self._login):
+            self.log("✅ Logged in again after the move")
+            if self.direct:
+                session = self.export_session()
+                if session and session["cookies"]:
+                    self.direct.set_cookies(session["cookies"])
+        elif self._login:
+            self.log("⚠ Auto-login after the move failed — please log in manually")
 
     def run_js(self, js: str):
-        with self._lock:
-            if not self.driver or not self.ready:
-                return None
-            try:
-                self._switch()
-                return self.driver.execute_script(js)
-            except Exception as e:
-                self.log(f"⚠ JS error: {e}")
-                return None
+        if not self.driver or not self.ready:
+            return None
+        t0 = time.monotonic()
+        try:
+            return self._run(lambda d: d.execute_script(js))
+        except Exception as e:
+            METRICS.inc("pirate_webdriver_errors_total", account=self.account_id, kind="sync")
+            self.log(f"⚠ JS error: {e}")
+            return None
+        finally:
+            METRICS.observe("pirate_webdriver_script_seconds", time.monotonic() - t0,
+                            account=self.account_id, kind="sync")
+
+    def run_async_js(self, js: str, *args, script_timeout: float = None):
+        """Run an async page script; it must call arguments[arguments.length-1] with its result."""
+        if not self.driver or not self.ready:
+            return None
+        timeout = script_timeout or self.shared.script_timeout
+        def cmd(d):
+            self.shared.set_script_timeout(timeout)
+            return d.execute_async_script(js, *args)
+        t0 = time.monotonic()
+        try:
+            return self._run(cmd, budget=timeout + SCRIPT_TIMEOUT_MARGIN)
+        except Exception as e:
+            METRICS.inc("pirate_webdriver_errors_total", account=self.account_id, kind="async")
+            self.log(f"⚠ JS error: {e}")
+            return None
+        finally:
+            METRICS.observe("pirate_webdriver_script_seconds", time.monotonic() - t0,
+                            account=self.account_id, kind="async")
+
+    # ── API transport ─────────────────────────────────────────────────────────
+    def api_batch(self, calls: list, timeout: float = None, with_bunker: bool = False,
+                  concurrency: int = None, interval: float = 0.0) -> dict:
+        """POST several game endpoints concurrently in one round trip.
+
+        `calls` is a list of (path, payload) pairs, path relative to /api/.
+        At most `concurrency` requests run at once (default: all), started
+        at least `interval` seconds apart. Returns {"bunker": ..., "results":
+        [...]} with one structured result per call, in order. Goes through
+        the page unless API-direct mode is on.
+        """
+        timeout   = timeout or self.api_timeout
+        transport = "direct" if self.direct else "page"
+        if self.direct:
+            res = {"bunker":  self.fetch_bunker() if with_bunker else None,
+                   "results": self._direct_batch(calls, timeout, concurrency, interval)}
+        else:
+            res = self._page_batch(calls, timeout, with_bunker, concurrency, interval)
+            if with_bunker:
+                self.trace("bunker", value=res.get("bunker"))
+        for (path, payload), r in zip(calls, res["results"]):
+            self.trace("api", path=path, payload=payload or {}, result=r)
+            METRICS.inc("pirate_api_requests_total", account=self.account_id,
+                        endpoint=path, transport=transport)
+            if "ms" in r:
+                METRICS.observe("pirate_api_request_seconds", r["ms"] / 1000,
+                                account=self.account_id, endpoint=path)
+            if not r.get("ok"):
+                METRICS.inc("pirate_api_errors_total", account=self.account_id,
+                            endpoint=path, error=r.get("error") or "failed")
+                self.log(f"⚠ {path}: {api_error(r)}")
+        return res
+
+    def trace(self, kind: str, **fields):
+        """Add a record to this account's trace when recording is on (PIRATE_TRACE=1)."""
+        if self.recorder:
+            self.recorder.write(kind, **fields)
+
+    def _page_batch(self, calls: list, timeout: float, with_bunker: bool,
+                    concurrency: int, interval: float) -> dict:
+        limit = max(1, min(concurrency or len(calls), len(calls)))
+        waves = -(-len(calls) // limit)
+        res = self.run_async_js(
+            (JS_READ_BUNKER if with_bunker else "") + JS_API + JS_API_BATCH,
+            [[path, payload or {}] for path, payload in calls],
+            API_URL, int(timeout * 1000), with_bunker, limit, int(interval * 1000),
+            script_timeout=waves * timeout + len(calls) * interval + SCRIPT_TIMEOUT_MARGIN)
+        if not isinstance(res, dict) or not isinstance(res.get("results"), list):
+            fail = {"ok": False, "status": 0, "error": "driver", "message": "script did not complete"}
+            return {"bunker": None, "results": [dict(fail) for _ in calls]}
+        return res
+
+    def _direct_batch(self, calls: list, timeout: float, concurrency: int, interval: float) -> list:
+        client  = self.direct
+        results = client.batch(calls, timeout, concurrency, interval)
+        expired = [i for i, r in enumerate(results) if r.get("status") == 401]
+        if expired and self.refresh_session():
+            retried = client.batch([calls[i] for i in expired], timeout, concurrency, interval)
+            for i, r in zip(expired, retried):
+                results[i] = r
+        return results
+
+    # ── API-direct mode ───────────────────────────────────────────────────────
+    def export_session(self):
+        """Cookies and user agent of this tab, for the direct API client."""
+        if not self.driver or not self.ready:
+            return None
+        try:
+            return self._run(lambda d: {
+                "cookies":    {c["name"]: c["value"] for c in d.get_cookies()},
+                "user_agent": d.execute_script("return navigator.userAgent;"),
+            })
+        except Exception as e:
+            self.log(f"⚠ Cookie export failed: {e}")
+            return None
+
+    def use_direct_api(self, enabled: bool, base_url: str = API_URL) -> bool:
+        """Switch API-direct mode on or off; returns whether it is now on."""
+        if not enabled:
+            if self.direct:
+                self.direct.close()
+                self.direct = None
+                self.log("🔌 Direct API off — game calls go through the browser")
+            return False
+        if self.direct:
+            return True
+        session = self.export_session()
+        if not session or not session["cookies"]:
+            return False
+        self.direct = GameApiClient(base_url, session["cookies"], session["user_agent"])
+        self.log("🔌 Direct API on — game calls bypass the browser")
+        return True
 
+    def refresh_session(self) -> bool:
+        """Reload the tab so the game renews its session, then re-export the cookies."""
+        if not self.direct:
+            return False
+        self.log("🔑 Session rejected — refreshing it from the browser")
+        try:
+            self._run(lambda d: d.refresh())
+        except Exception as e:
+            self.log(f"⚠ Session refresh failed: {e}")
+            return False
+        time.sleep(3)
+        session = self.export_session()
+        if not session or not session["cookies"] or not self.direct:
+            return False
+        self.direct.set_cookies(session["cookies"])
+        return True
+
+    def api_call(self, path: str, payload: dict = None, timeout: float = None) -> dict:
+        """POST one game endpoint; returns {ok, status, data, error, message}."""
+        return self.api_batch([(path, payload)], timeout)["results"][0]
+
+    # ── Game API helpers ──────────────────────────────────────────────────────
     def fetch_bunker(self):
-        return self.run_js("""
-            try {
-                var app = document.querySelector('#app');
-                if (!app || !app.__vue_app__) return null;
-                var pinia = app.__vue_app__._context.provides.pinia
-                         || app.__vue_app__.config.globalProperties.$pinia;
-                if (!pinia) return null;
-                var us = pinia._s.get('user');
-                if (!us || !us.user) return null;
-                var u = us.user; var st = us.userSettings || {};
-                return {
-                    fuel:    (u.fuel    || 0) / 1000,
-                    co2:     (u.co2     || 0) / 1000,
-                    cash:     u.cash   || 0,
-                    maxFuel: (st.max_fuel || 1000000) / 1000,
-                    maxCO2:  (st.max_co2  || 1000000) / 1000
-                };
-            } catch(e) { return null; }
-        """)
+        bunker = self.run_js(JS_READ_BUNKER + "return pbReadBunker();")
+        self.trace("bunker", value=bunker)
+        return bunker
 
     def fetch_prices_sync(self):
-        return self.run_js("""
-            try {
-                var xhr = new XMLHttpRequest();
-                xhr.open('POST', 'https://shippingmanager.cc/api/bunker/get-prices', false);
-                xhr.setRequestHeader('Content-Type', 'application/json');
-                xhr.withCredentials = true;
-                xhr.send('{}');
-                var d = JSON.parse(xhr.responseText);
-                if (!d.data || !d.data.prices) return null;
-                var now = new Date(); var h = now.getUTCHours();
-                var slot = (h<10?'0':'')+h+':'+(now.getUTCMinutes()<30?'00':'30');
-                var e = d.data.prices.find(function(p){return p.time===slot;}) || d.data.prices[0];
-                return {
-                    fuelPrice: d.data.discounted_fuel !== undefined ? d.data.discounted_fuel : e.fuel_price,
-                    co2Price:  d.data.discounted_co2  !== undefined ? d.data.discounted_co2  : e.co2_price
-                };
-            } catch(e) { return null; }
-        """)
+        r = self.api_call("bunker/get-prices")
+        return pick_prices(r.get("data")) if r["ok"] else None
+
+    def _vessel_call(self):
+        """The vessel-list call to make: full routes only when the cache needs them."""
+        return ("vessel/get-all-user-vessels", {"include_routes": self.fleet.needs_full()})
+
+    def _vessels_from(self, call, result):
+        """Resolve a vessel-list result through the fleet cache (None on failure)."""
+        if not result["ok"]:
+            return None
+        raw = api_data(result).get("user_vessels") or []
+        if call[1]["include_routes"]:
+            return self.fleet.store_full(raw)
+        vessels = self.fleet.merge(raw)
+        if vessels is None:
+            r = self.api_call("vessel/get-all-user-vessels", {"include_routes": True})
+            if not r["ok"]:
+                return None
+            vessels = self.fleet.store_full(api_data(r).get("user_vessels") or [])
+            st = self.fleet.stats()
+            self.log(f"🗂 Fleet routes refreshed ({st['vessels']} vessels) — "
+                     f"cache {st['hits']} hits / {st['misses']} misses")
+        return vessels
 
     def fetch_vessels_sync(self):
-        return self.run_js("""
-            try {
-                var xhr = new XMLHttpRequest();
-                xhr.open('POST', 'https://shippingmanager.cc/api/vessel/get-all-user-vessels', false);
-                xhr.setRequestHeader('Content-Type', 'application/json');
-                xhr.withCredentials = true;
-                xhr.send(JSON.stringify({include_routes:true}));
-                var d = JSON.parse(xhr.responseText);
-                var vessels = (d.data && d.data.user_vessels) ? d.data.user_vessels : [];
-                vessels.forEach(function(v) {
-                    var cap = v.capacity || v.cargo_capacity || 0;
-                    var cargo = v.route_cargo || v.current_cargo || 0;
-                    if (cap > 0) {
-                        v._utilization = Math.round((cargo / cap) * 100);
-                    } else {
-                        var ri = v.route_info || v.active_route || {};
-                        var demand = ri.demand || ri.port_demand || 0;
-                        var maxCargo = ri.max_cargo || cap || 0;
-                        v._utilization = maxCargo > 0 ? Math.round((demand / maxCargo) * 100) : 100;
-                    }
-                });
-                return vessels;
-            } catch(e) { return []; }
-        """)
+        call = self._vessel_call()
+        return self._vessels_from(call, self.api_call(*call)) or []
+
+    def fetch_snapshot(self, include_prices: bool = True, include_vessels: bool = False):
+        """Bunker, prices and (optionally) vessels in one WebDriver round trip.
+
+        The API requests are fired concurrently inside the page and the
+        combined result comes back as {"bunker", "prices", "price_table",
+        "vessels"}; parts not asked for are None.
+        """
+        calls = []
+        if include_prices:
+            calls.append(("bunker/get-prices", {}))
+        if include_vessels:
+            calls.append(self._vessel_call())
+        res     = self.api_batch(calls, with_bunker=True)
+        results = iter(res["results"])
+        prices  = next(results) if include_prices else None
+        vessels = next(results) if include_vessels else None
+        prices_ok = bool(prices and prices["ok"])
+        return {
+            "bunker":      res.get("bunker"),
+            "prices":      pick_prices(prices.get("data")) if prices_ok else None,
+            "price_table": price_table(prices.get("data")) if prices_ok else None,
+            "vessels":     self._vessels_from(calls[-1], vessels) if vessels else None,
+        }
+
+    def _purchase(self, path: str, amount_tons):
+        r = self.api_call(path, {"amount": int(amount_tons * 1000)})
+        if not r["ok"]:
+            return f"error:{api_error(r)}"
+        d = r.get("data") or {}
+        return "ok" if d.get("user") else (d.get("error") or "failed")
 
     def purchase_fuel_sync(self, amount_tons):
-        amount_kg = int(amount_tons * 1000)
-        return self.run_js(f"""
-            try {{
-                var xhr = new XMLHttpRequest();
-                xhr.open('POST', 'https://shippingmanager.cc/api/bunker/purchase-fuel', false);
-                xhr.setRequestHeader('Content-Type', 'application/json');
-                xhr.withCredentials = true;
-                xhr.send(JSON.stringify({{amount:{amount_kg}}}));
-                var d = JSON.parse(xhr.responseText);
-                return d.user ? 'ok' : (d.error || 'failed');
-            }} catch(e) {{ return 'error:'+e.message; }}
-        """)
+        return self._purchase("bunker/purchase-fuel", amount_tons)
 
     def purchase_co2_sync(self, amount_tons):
-        amount_kg = int(amount_tons * 1000)
-        return self.run_js(f"""
-            try {{
-                var xhr = new XMLHttpRequest();
-                xhr.open('POST', 'https://shippingmanager.cc/api/bunker/purchase-co2', false);
-                xhr.setRequestHeader('Content-Type', 'application/json');
-                xhr.withCredentials = true;
-                xhr.send(JSON.stringify({{amount:{amount_kg}}}));
-                var d = JSON.parse(xhr.responseText);
-                return d.user ? 'ok' : (d.error || 'failed');
-            }} catch(e) {{ return 'error:'+e.message; }}
-        """)
+        return self._purchase("bunker/purchase-co2", amount_tons)
 
     def depart_vessel_sync(self, vessel_id, speed, guards):
-        return self.run_js(f"""
-            try {{
-                var xhr = new XMLHttpRequest();
-                xhr.open('POST', 'https://shippingmanager.cc/api/route/depart', false);
-                xhr.setRequestHeader('Content-Type', 'application/json');
-                xhr.withCredentials = true;
-                xhr.send(JSON.stringify({{user_vessel_id:{vessel_id},speed:{speed},guards:{guards or 0},history:0}}));
-                var d = JSON.parse(xhr.responseText);
-                if (d.data && d.data.depart_info) {{
-                    var di = d.data.depart_info;
-                    return {{success:true,income:di.depart_income,fuelUsed:di.fuel_usage/1000,co2Used:di.co2_emission/1000,harbor:di.harbor_fee}};
-                }}
-                return {{success:false, error: d.error || 'unknown'}};
-            }} catch(e) {{ return {{success:false, error:e.message}}; }}
-        """)
+        return depart_result(self.api_call("route/depart", depart_payload(vessel_id, speed, guards)))
 
     def moor_vessel_sync(self, vessel_id):
-        return self.run_js(f"""
-            try {{
-                var xhr = new XMLHttpRequest();
-                xhr.open('POST', 'https://shippingmanager.cc/api/vessel/moor', false);
-                xhr.setRequestHeader('Content-Type', 'application/json');
-                xhr.withCredentials = true;
-                xhr.send(JSON.stringify({{user_vessel_id:{vessel_id}}}));
-                var d = JSON.parse(xhr.responseText);
-                return d.success ? 'ok' : (d.error || 'failed');
-            }} catch(e) {{ return 'error:'+e.message; }}
-        """)
+        return moor_result(self.api_call("vessel/moor", {"user_vessel_id": vessel_id}))
+
+    def depart_batch(self, orders: list, concurrency: int = 4, rate: float = 5.0) -> list:
+        """Depart or moor a whole batch of vessels in one call.
+
+        `orders` is a list of ("depart" | "moor", vessel) pairs. At most
+        `concurrency` requests are in flight and at most `rate` start per
+        second. Returns one decoded result per order, in order.
+        """
+        if not orders:
+            return []
+        calls = [("route/depart", depart_payload(v["id"], v.get("route_speed", 20),
+                                                 v.get("route_guards", 0)))
+                 if action == "depart" else ("vessel/moor", {"user_vessel_id": v["id"]})
+                 for action, v in orders]
+        results = self.api_batch(calls, concurrency=concurrency,
+                                 interval=1 / rate if rate > 0 else 0)["results"]
+        return [depart_result(r) if action == "depart" else moor_result(r)
+                for (action, _), r in zip(orders, results)]
 
     def auto_login(self, email: str, password: str) -> bool:
+        self._login = (email, password)
+        # Each step is its own scheduled command and the waits happen outside
+        # them, so other accounts keep using the browser during the login.
         try:
             from selenium.webdriver.common.by import By
-            from selenium.webdriver.support.ui import WebDriverWait
-            from selenium.webdriver.support import expected_conditions as EC
             from selenium.webdriver.common.keys import Keys
-            self._switch()
-            self.driver.get("https://shippingmanager.cc/login")
+            self._run(lambda d: d.get("https://shippingmanager.cc/login"))
             time.sleep(2)
-            wait = WebDriverWait(self.driver, 10)
-            email_field = wait.until(EC.presence_of_element_located(
-                (By.CSS_SELECTOR, "input[type='email'], input[name='email']")))
-            email_field.clear(); email_field.send_keys(email)
+            for _ in range(20):
+                found = self._run(lambda d: d.find_elements(
+                    By.CSS_SELECTOR, "input[type='email'], input[name='email']"))
+                if found: break
+                time.sleep(0.5)
+            else:
+                raise TimeoutError("login form did not appear")
+            email_field = found[0]
+            self._run(lambda d: (email_field.clear(), email_field.send_keys(email)))
             time.sleep(0.5)
-            pass_field = self.driver.find_element(By.CSS_SELECTOR, "input[type='password']")
-            pass_field.clear(); pass_field.send_keys(password)
+            pass_field = self._run(lambda d: d.find_element(By.CSS_SELECTOR, "input[type='password']"))
+            self._run(lambda d: (pass_field.clear(), pass_field.send_keys(password)))
             time.sleep(0.5)
-            clicked = False
-            try:
-                btn = self.driver.find_element(By.CSS_SELECTOR, "button[type='submit']")
-                btn.click(); clicked = True
-            except Exception:
-                pass
-            if not clicked:
+
+            def submit(d):
                 try:
-                    for btn in self.driver.find_elements(By.TAG_NAME, "button"):
+                    d.find_element(By.CSS_SELECTOR, "button[type='submit']").click()
+                    return
+                except Exception:
+                    pass
+                try:
+                    for btn in d.find_elements(By.TAG_NAME, "button"):
                         if any(w in btn.text.lower() for w in ["login","sign in","log in"]):
-                            btn.click(); clicked = True; break
+                            btn.click(); return
                 except Exception:
                     pass
-            if not clicked:
                 pass_field.send_keys(Keys.RETURN)
+            self._run(submit)
             time.sleep(4)
-            return "login" not in self.driver.current_url
+            return "login" not in self._run(lambda d: d.current_url)
         except Exception as e:
             self.log(f"⚠ Auto-login error: {e}")
             return False
 
     def is_logged_in(self):
-        self._switch()
         result = self.run_js("""
             try {
                 var app = document.querySelector('#app');
@@ -643,16 +2386,174 @@ class BrowserController:
         """)
         return bool(result)
 
+    def user_id(self):
+        """Logged-in game user id, or None."""
+        return self.run_js("""
+            try {
+                var app = document.querySelector('#app');
+                var pinia = app.__vue_app__._context.provides.pinia
+                         || app.__vue_app__.config.globalProperties.$pinia;
+                var us = pinia._s.get('user');
+                return us && us.user ? us.user.id : null;
+            } catch(e) { return null; }
+        """)
+
     def close(self):
         """Close just this account's tab."""
+        self.use_direct_api(False)
+        def cmd(d):
+            if len(d.window_handles) > 1:
+                d.close()
+            # Don't quit the whole browser — SharedBrowser.close() does that
         try:
             if self.driver and self.tab_handle:
-                self._switch()
-                if len(self.driver.window_handles) > 1:
-                    self.driver.close()
-                # Don't quit the whole browser — SharedBrowser.close() does that
+                self._run(cmd)
+        except Exception:
+            pass
+        if self.shared:
+            self.shared.scheduler.forget(self.tab_handle)
+        self.pool.release(self.account_id)
+        self.shared = None
+        if self.recorder:
+            self.recorder.close()
+
+
+# ── ORCHESTRATOR ──────────────────────────────────────────────────────────────
+# One asyncio loop on a background thread schedules every account cycle,
+# chatbot poll and timer. Blocking WebDriver/HTTP calls run on a bounded
+# executor, and each lane caps how many of those one kind of job may hold.
+IO_THREADS = int(os.environ.get("PIRATE_IO_THREADS") or 16)   # calls are I/O-bound
+LANES = {                                  # lane -> blocking calls in flight
+    "cycle": max(2, IO_THREADS - 6),       # auto-manager ticks, run now, refresh
+    "login": 4,                            # browser start-up and logins
+    "chat":  2,                            # chatbot polls and replies
+}
+
+class Orchestrator:
+    """Owns the shared event loop; every public method is safe from any thread."""
+
+    def __init__(self, threads: int = IO_THREADS, lanes: dict = None):
+        self._threads = threads
+        self._limits  = dict(lanes or LANES)
+        self._lock    = threading.Lock()
+        self._loop    = None
+        self._pool    = None
+        self._lanes   = {}   # lane -> asyncio.Semaphore, created on the loop
+        self._tasks   = {}   # key -> asyncio.Task, touched only on the loop
+        self._busy    = collections.Counter()   # lane -> calls running
+        self._queued  = collections.Counter()   # lane -> calls waiting for a slot
+
+    def _ensure(self):
+        with self._lock:
+            if self._loop is None:
+                self._pool = concurrent.futures.ThreadPoolExecutor(
+                    self._threads, thread_name_prefix="pirate-io")
+                self._loop = asyncio.new_event_loop()
+                self._loop.set_default_executor(self._pool)
+                threading.Thread(target=self._loop.run_forever, daemon=True,
+                                 name="orchestrator").start()
+            return self._loop
+
+    def spawn(self, coro_fn, *args, key: str = None) -> concurrent.futures.Future:
+        """Run `coro_fn(*args)` as a task. A live task with the same key is reused."""
+        loop = self._ensure()
+        fut  = concurrent.futures.Future()
+
+        def _done(task):
+            if key and self._tasks.get(key) is task:
+                del self._tasks[key]
+            if task.cancelled():
+                fut.cancel()
+            elif task.exception() is not None:
+                fut.set_exception(task.exception())
+            else:
+                fut.set_result(task.result())
+
+        def _create():
+            task = self._tasks.get(key) if key else None
+            if task is None or task.done():
+                task = loop.create_task(self._guard(coro_fn(*args), key))
+                if key:
+                    self._tasks[key] = task
+            task.add_done_callback(_done)
+        loop.call_soon_threadsafe(_create)
+        return fut
+
+    def submit(self, fn, *args, lane: str = None, key: str = None) -> concurrent.futures.Future:
+        """Run blocking `fn(*args)` on the executor from any thread."""
+        return self.spawn(lambda: self.blocking(fn, *args, lane=lane), key=key)
+
+    def cancel(self, key: str):
+        """Cancel the task registered under `key`; its key is free at once."""
+        def _cancel():
+            task = self._tasks.pop(key, None)
+            if task:
+                task.cancel()
+        if self._loop:
+            self._loop.call_soon_threadsafe(_cancel)
+
+    def notify(self, event: "asyncio.Event"):
+        """Set an asyncio.Event owned by the loop from another thread."""
+        if self._loop:
+            self._loop.call_soon_threadsafe(event.set)
+
+    async def blocking(self, fn, *args, lane: str = None):
+        """Await blocking `fn(*args)` on the executor, holding a slot in `lane`."""
+        loop = asyncio.get_running_loop()
+        if lane is None:
+            return await loop.run_in_executor(None, lambda: fn(*args))
+        sem = self._lanes.get(lane)
+        if sem is None:
+            sem = self._lanes[lane] = asyncio.Semaphore(self._limits.get(lane, self._threads))
+        self._queued[lane] += 1
+        try:
+            await sem.acquire()
+        finally:
+            self._queued[lane] -= 1
+        self._busy[lane] += 1
+        try:
+            return await loop.run_in_executor(None, lambda: fn(*args))
+        finally:
+            self._busy[lane] -= 1
+            sem.release()
+
+    async def _guard(self, coro, key):
+        try:
+            return await coro
+        except Exception as e:
+            LOGS.emit("app", f"❌ Task {key or getattr(coro, '__qualname__', '?')} "
+                             f"failed: {type(e).__name__}: {e}")
+            raise
+
+    def stats(self) -> dict:
+        return {
+            "threads": self._threads,
+            "tasks":   len(self._tasks),
+            "lanes":   {lane: {"limit": limit, "busy": self._busy[lane],
+                               "queued": self._queued[lane]}
+                        for lane, limit in self._limits.items()},
+        }
+
+    def close(self, timeout: float = 5.0):
+        """Cancel every task, then stop the loop and the executor."""
+        with self._lock:
+            loop, pool, self._loop = self._loop, self._pool, None
+        if loop is None:
+            return
+
+        async def _drain():
+            tasks = [t for t in asyncio.all_tasks() if t is not asyncio.current_task()]
+            for t in tasks:
+                t.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+        try:
+            asyncio.run_coroutine_threadsafe(_drain(), loop).result(timeout)
         except Exception:
             pass
+        loop.call_soon_threadsafe(loop.stop)
+        pool.shutdown(wait=False, cancel_futures=True)
+
+ORCH = Orchestrator()
 
 
 # ── AUTO MANAGER ──────────────────────────────────────────────────────────────
@@ -665,698 +2566,329 @@ class AutoManager:
         self.on_prices    = on_prices
         self.on_depart    = on_depart
         self._running     = False
+        self._prices      = None   # last prices read…
+        self._price_slot  = None   # …and the price slot they belong to
+        self._last_bunker = None   # bunker at the last purchase decision
+        self.timers       = DepartureTimers()
+        self._price_table = None   # {"day", "slots"} — full-day table, kept per UTC day
+        self._fuel_plan   = None   # slot start time an intelligent fuel buy is waiting for
+        self._fuel_used   = collections.deque()   # (ts, tons) per departure
+        self._started     = clock.time()
+        self._resync_soon = True   # fleet changed or a departure failed
+        self._settings    = AccountManager.get_settings(account_id)
+        self._wake        = asyncio.Event()   # set on settings change
+        self.task         = None              # Future of the scheduling task
 
     def get_settings(self):
-        return AccountManager.get_settings(self.account_id)
+        return self._settings
+
+    def _on_settings(self, settings: dict):
+        self._settings = settings
+        ORCH.notify(self._wake)
 
     def start(self):
         self._running = True
-        threading.Thread(target=self._loop, daemon=True).start()
+        AccountManager.subscribe(self.account_id, self._on_settings)
+        self.task = ORCH.spawn(self._run, key=f"auto:{self.account_id}")
 
     def stop(self):
         self._running = False
+        AccountManager.unsubscribe(self.account_id, self._on_settings)
+        ORCH.cancel(f"auto:{self.account_id}")
 
     def run_now(self):
-        threading.Thread(target=self._cycle, daemon=True).start()
+        ORCH.submit(self._cycle, lane="cycle", key=f"run:{self.account_id}")
 
-    def _loop(self):
+    def refresh(self):
+        """Re-read bunker and prices for the dashboard, without acting on them."""
+        def _do():
+            snap = self.browser.fetch_snapshot() or {}
+            if snap.get("bunker"): self.on_bunker(snap["bunker"])
+            if snap.get("prices"): self.on_prices(snap["prices"])
+        ORCH.submit(_do, lane="cycle", key=f"refresh:{self.account_id}")
+
+    async def _run(self):
         for _ in range(60):
-            if not self._running: return
             if self.browser.ready: break
-            time.sleep(1)
+            await clock.asleep(1)
         self.log("⏳ Waiting for login…")
         for _ in range(180):
-            if not self._running: return
-            if self.browser.is_logged_in(): break
-            time.sleep(2)
+            if await ORCH.blocking(self.browser.is_logged_in, lane="login"): break
+            await clock.asleep(2)
         else:
             self.log("❌ Timed out waiting for login"); return
         self.log("✅ Logged in — auto-manager active")
+        api_direct = None
+        # Fuel/CO2 wake just after each price slot boundary; departures keep
+        # their own check_interval cadence.
+        next_buy = next_depart = 0.0
         while self._running:
-            self._cycle()
-            s = self.get_settings()
-            for _ in range(int(s.get("check_interval", 60)) * 2):
-                if not self._running: return
-                time.sleep(0.5)
+            s   = self.get_settings()
+            want = bool(s.get("api_direct"))
+            if want != api_direct:
+                # The only place direct mode is switched; if turning it on
+                # failed (no session yet) it is retried at the next wake.
+                on = await ORCH.blocking(self.browser.use_direct_api, want, lane="cycle")
+                api_direct = want if on == want else None
+            now = clock.time()
+            buy_due    = now >= next_buy
+            depart_due = s["auto_depart"] and now >= next_depart
+            if buy_due or depart_due:
+                await ORCH.blocking(self._tick, s, buy_due, depart_due, lane="cycle")
+                now = clock.time()
+                if buy_due:
+                    next_buy = self._next_buy_at(s, now)
+                if depart_due:
+                    next_depart = self._next_depart_at(s, now)
+            wake = min(next_buy, next_depart if s["auto_depart"] else next_buy)
+            # Sleep until due; a settings save wakes us early, stop() cancels
+            try:
+                await clock.wait_for(self._wake.wait(), max(0.0, wake - clock.time()))
+            except TimeoutError:
+                pass
+            self._wake.clear()
+
+    def _next_buy_at(self, s, now: float) -> float:
+        """When the purchase side should next read prices.
+
+        Basic modes need every slot. Intelligent fuel (on its own) only
+        needs its planned slot and the next day's table.
+        """
+        if not self._current_prices():
+            # Retry on the departure cadence if this slot's price couldn't be read
+            return now + int(s.get("check_interval", 60))
+        if "basic" in (s["fuel_mode"], s["co2_mode"]):
+            return next_price_slot(now) + PRICE_SLOT_SETTLE
+        wake = next_utc_day(now) + PRICE_SLOT_SETTLE
+        if s["fuel_mode"] == "intelligent" and self._fuel_plan:
+            wake = min(wake, self._fuel_plan + PRICE_SLOT_SETTLE)
+        return wake
+
+    def _next_depart_at(self, s, now: float) -> float:
+        """Earliest expected arrival, else a periodic resync to catch drift.
+
+        Right after departures (new arrival times unknown), after failures,
+        or when arrival times are missing, fall back to check_interval.
+        """
+        interval = int(s.get("check_interval", 60))
+        fallback = now + (interval if self._resync_soon or self.timers.unknown
+                          else max(interval, DEPART_RESYNC))
+        arrival  = self.timers.next_arrival()
+        return min(fallback, arrival + ARRIVAL_GRACE) if arrival else fallback
 
     def _cycle(self):
+        """Full check right now: fresh prices, purchases and departures."""
+        s = self.get_settings()
+        self._tick(s, fetch_prices=True, depart=s["auto_depart"])
+
+    def _current_prices(self):
+        """Prices read during the current slot, or None once the slot has moved on."""
+        if self._price_slot == price_slot_index(clock.time()):
+            return self._prices
+        return None
+
+    def _table_prices(self, now: float):
+        """Current slot's list price from the cached day table (no discounts)."""
+        t = self._price_table
+        if not t or t["day"] != utc_day(now):
+            return None
+        start = price_slot_index(now) * PRICE_SLOT_SECS
+        e = next((p for p in t["slots"] if slot_start(p, now) == start), None)
+        return {"fuelPrice": e.get("fuel_price"), "co2Price": e.get("co2_price")} if e else None
+
+    def _fuel_rate(self, now: float):
+        """Projected fuel burn in tons/hour from recent departures, or None."""
+        while self._fuel_used and self._fuel_used[0][0] < now - FUEL_RATE_WINDOW:
+            self._fuel_used.popleft()
+        used = sum(t for _, t in self._fuel_used)
+        if used <= 0:
+            return None
+        span = min(FUEL_RATE_WINDOW, max(now - self._started, 3600))
+        return used / (span / 3600)
+
+    def _plan_fuel(self, s, fp, fuel: float, max_fuel: float):
+        """Intelligent mode: decide against the rest of today's price table.
+
+        Returns (buy now?, tons cap or None for a full tank). If a cheaper
+        slot (within the threshold) starts before projected consumption
+        empties the tank, wait for it. If it starts later, buy just enough
+        now to bridge the gap and fill up at that slot. Either way the tank
+        is first topped up to FUEL_SAFETY_FLOOR of max_fuel (if the current
+        price is within the threshold); with no recent departures the burn
+        rate is unknown and that floor is all that is bought before the
+        cheaper slot.
+        """
+        now  = clock.time()
+        rate = self._fuel_rate(now)
+        t    = self._price_table
+        best = None
+        if t and t["day"] == utc_day(now):
+            for slot in t["slots"]:
+                start, price = slot_start(slot, now), slot.get("fuel_price")
+                if start is None or price is None or start <= now or price > s["fuel_threshold"]:
+                    continue
+                if best is None or (price, start) < (best[1], best[0]):
+                    best = (start, price)
+        if not best or best[1] >= fp:
+            self._fuel_plan = None
+            return fp <= s["fuel_threshold"], None
+        if self._fuel_plan != best[0]:
+            when = datetime.datetime.fromtimestamp(best[0], datetime.timezone.utc)
+            self.log(f"⛽ Fuel ${fp}/t — planning to fill at ${best[1]}/t at {when:%H:%M} UTC")
+        self._fuel_plan = best[0]
+        floor  = FUEL_SAFETY_FLOOR * max_fuel
+        needed = max((rate or 0) * (best[0] - now) / 3600, floor) - fuel
+        if needed <= 0:
+            return False, None
+        return fp <= s["fuel_threshold"], needed
+
+    def _tick(self, s, fetch_prices: bool, depart: bool):
+        t0, departed = time.monotonic(), None
+        self.browser.trace("tick", fetch_prices=fetch_prices, depart=depart, settings=s)
         try:
-            s      = self.get_settings()
-            bunker = self.browser.fetch_bunker()
-            prices = self.browser.fetch_prices_sync()
+            snap   = self.browser.fetch_snapshot(include_prices=fetch_prices,
+                                                 include_vessels=depart) or {}
+            bunker = snap.get("bunker")
             if bunker: self.on_bunker(bunker)
-            if prices: self.on_prices(prices)
-            if not bunker or not prices:
+            if snap.get("prices"):
+                self._prices     = snap["prices"]
+                self._price_slot = price_slot_index(clock.time())
+                self.on_prices(self._prices)
+            if snap.get("price_table"):
+                self._price_table = {"day": utc_day(clock.time()), "slots": snap["price_table"]}
+            prices = self._current_prices()
+            if not prices and s["fuel_mode"] == "intelligent":
+                prices = self._table_prices(clock.time())
+            if not bunker:
                 self.log("⚠ Couldn't read game data"); return
 
-            fp = prices.get("fuelPrice"); cp = prices.get("co2Price")
-            cash = bunker.get("cash", 0); fuel = bunker.get("fuel", 0)
-            co2  = bunker.get("co2",  0); mf   = bunker.get("maxFuel", 0)
-            mc   = bunker.get("maxCO2", 0)
-
-            if s["fuel_mode"] != "off" and fp is not None:
-                ft = s["fuel_threshold"]; space = mf - fuel
-                afford = max(0, cash - s["fuel_min_cash"]) / fp if fp > 0 else 0
-                if fp <= ft and space >= 1:
-                    amt = min(int(space), int(afford))
-                    if amt > 0:
-                        self.log(f"⛽ Buying {amt:,}t fuel @ ${fp}/t")
-                        r = self.browser.purchase_fuel_sync(amt)
-                        if r == "ok":
-                            self.log(f"✅ Fuel bought: {amt:,}t")
-                            b2 = self.browser.fetch_bunker()
-                            if b2: self.on_bunker(b2); cash = b2["cash"]
-                        else: self.log(f"❌ Fuel failed: {r}")
-                else: self.log(f"⛽ Fuel ${fp}/t threshold ${ft} — skip")
-
-            if s["co2_mode"] != "off" and cp is not None:
-                ct = s["co2_threshold"]; space = mc - co2
-                afford = max(0, cash - s["co2_min_cash"]) / cp if cp > 0 else 0
-                if cp <= ct and space >= 1:
-                    amt = min(int(space), int(afford))
-                    if amt > 0:
-                        self.log(f"🌿 Buying {amt:,}t CO2 @ ${cp}/t")
-                        r = self.browser.purchase_co2_sync(amt)
-                        if r == "ok":
-                            self.log(f"✅ CO2 bought: {amt:,}t")
-                            b2 = self.browser.fetch_bunker()
-                            if b2: self.on_bunker(b2); cash = b2["cash"]
-                        else: self.log(f"❌ CO2 failed: {r}")
-                else: self.log(f"🌿 CO2 ${cp}/t threshold ${ct} — skip")
-
-            if s["auto_depart"]:
-                vessels     = self.browser.fetch_vessels_sync()
-                min_util    = int(s.get("min_utilization", 50))
-                util_action = s.get("low_util_action", "skip")
-                ready = [v for v in (vessels or [])
-                         if v.get("status") == "port"
-                         and not v.get("is_parked")
-                         and v.get("route_destination")]
-                self.log(f"🚢 {len(ready)} vessel(s) in port")
-                for v in ready:
-                    name = v.get("name", "?"); util = v.get("_utilization", 100)
-                    if util < min_util:
-                        if util_action == "moor":
-                            self.log(f"⚓ {name} util {util}% < {min_util}% — mooring")
-                            self.browser.moor_vessel_sync(v["id"])
-                        else:
-                            self.log(f"⏭ {name} util {util}% < {min_util}% — skipping")
-                        time.sleep(0.5); continue
-                    r = self.browser.depart_vessel_sync(
-                        v["id"], v.get("route_speed", 20), v.get("route_guards", 0))
-                    if isinstance(r, dict) and r.get("success"):
-                        entry = {"timestamp": int(time.time()*1000), "vessel": name,
-                                 "income": r.get("income",0), "fuelUsed": r.get("fuelUsed",0),
-                                 "co2Used": r.get("co2Used",0), "util": util}
-                        self.on_depart(entry)
-                        self.log(f"✅ Departed {name} ({util}% util) +${entry['income']:,}")
-                    else:
-                        err = r.get("error","?") if isinstance(r,dict) else r
-                        self.log(f"❌ Depart failed {name}: {err}")
-                    time.sleep(0.5)
+            # Between slots the price can't change, so only re-decide when
+            # the bunker has moved since the last decision.
+            if not prices:
+                if fetch_prices: self.log("⚠ Couldn't read prices")
+            elif fetch_prices or bunker_changed(bunker, self._last_bunker):
+                bunker = self._buy(s, bunker, prices)
+
+            if depart:
+                departed = self._depart(s, snap.get("vessels"))
+            if departed and prices:
+                b2 = self.browser.fetch_bunker()
+                if b2:
+                    self.on_bunker(b2)
+                    self._buy(s, b2, prices)
         except Exception as e:
+            METRICS.inc("pirate_cycle_errors_total", account=self.account_id)
             self.log(f"❌ Cycle error: {e}")
-
-
-# ── HELPERS ───────────────────────────────────────────────────────────────────
-def fmt_cash(n):
-    try:
-        v = int(n)
-        if v >= 1_000_000: return f"${v/1_000_000:.1f}M"
-        if v >= 1_000:     return f"${v/1_000:.0f}K"
-        return f"${v}"
-    except: return "—"
-
-def fmt_ts(ts_ms):
-    try: return datetime.datetime.fromtimestamp(ts_ms/1000).strftime("%H:%M:%S")
-    except: return "—"
-
-
-# ── ACCOUNT TAB ───────────────────────────────────────────────────────────────
-class AccountTab(ctk.CTkFrame):
-    """A full dashboard panel for one account."""
-
-    def __init__(self, parent, account: dict, browser: BrowserController,
-                 manager: AutoManager, **kw):
-        super().__init__(parent, fg_color=C["bg"], corner_radius=0, **kw)
-        self.account    = account
-        self.browser    = browser
-        self.manager    = manager
-        self.account_id = account["id"]
-        self._session_income  = 0
-        self._session_departs = 0
-        self._status_var = tk.StringVar(value="Starting…")
-        self._build()
-
-    def _build(self):
-        # Sub-tab bar
-        tab_bar = ctk.CTkFrame(self, fg_color=C["panel"], height=32, corner_radius=0)
-        tab_bar.pack(fill="x")
-        tab_bar.pack_propagate(False)
-        self._pages    = {}
-        self._tab_btns = {}
-        for tid, label in [("status","📊 Status"),("logs","📋 Logs"),("settings","⚙ Settings")]:
-            b = ctk.CTkButton(tab_bar, text=label, font=("Segoe UI", 10),
-                              width=90, height=28, corner_radius=0,
-                              fg_color="transparent", hover_color=C["border"],
-                              text_color=C["dim"],
-                              command=lambda t=tid: self._show(t))
-            b.pack(side="left", padx=1)
-            self._tab_btns[tid] = b
-
-        self._content = ctk.CTkFrame(self, fg_color=C["bg"], corner_radius=0)
-        self._content.pack(fill="both", expand=True)
-
-        self._build_status()
-        self._build_logs()
-        self._build_settings()
-        self._show("status")
-
-        ctk.CTkLabel(self, textvariable=self._status_var,
-                     font=("Consolas", 9), text_color=C["dim"],
-                     anchor="w").pack(fill="x", padx=8, pady=2)
-
-    def _show(self, tab_id):
-        for tid, page in self._pages.items():
-            if tid == tab_id:
-                page.pack(fill="both", expand=True)
-                self._tab_btns[tid].configure(text_color=C["accent"], fg_color=C["border"])
+        finally:
+            took = time.monotonic() - t0
+            METRICS.observe("pirate_cycle_seconds", took, account=self.account_id)
+            METRICS.set("pirate_cycle_last_seconds", took, account=self.account_id)
+            if self.browser.recorder:
+                self.browser.recorder.flush()
+            if departed is not None:
+                METRICS.set("pirate_departures_last_cycle", departed, account=self.account_id)
+                METRICS.inc("pirate_departures_total", departed, account=self.account_id)
+
+    def _buy(self, s, bunker: dict, prices: dict) -> dict:
+        """Fuel/CO2 purchase decisions; returns the latest bunker."""
+        fp = prices.get("fuelPrice"); cp = prices.get("co2Price")
+        cash = bunker.get("cash", 0); fuel = bunker.get("fuel", 0)
+        co2  = bunker.get("co2",  0); mf   = bunker.get("maxFuel", 0)
+        mc   = bunker.get("maxCO2", 0)
+
+        if s["fuel_mode"] != "off" and fp is not None:
+            ft = s["fuel_threshold"]; space = mf - fuel
+            afford = max(0, cash - s["fuel_min_cash"]) / fp if fp > 0 else 0
+            if s["fuel_mode"] == "intelligent":
+                buy, cap = self._plan_fuel(s, fp, fuel, mf)
             else:
-                page.pack_forget()
-                self._tab_btns[tid].configure(text_color=C["dim"], fg_color="transparent")
-
-    def _sec(self, parent, title):
-        f = ctk.CTkFrame(parent, fg_color="transparent")
-        f.pack(fill="x", padx=10, pady=(10, 2))
-        ctk.CTkLabel(f, text=title.upper(), font=("Segoe UI", 8, "bold"),
-                     text_color=C["muted"]).pack(side="left")
-        ctk.CTkFrame(f, height=1, fg_color=C["border"]).pack(
-            side="left", fill="x", expand=True, padx=(6, 0))
-
-    def _build_status(self):
-        page = ctk.CTkScrollableFrame(self._content, fg_color=C["bg"],
-                                       scrollbar_button_color=C["border"])
-        self._pages["status"] = page
-
-        def stat(label, var):
-            f = ctk.CTkFrame(page, fg_color=C["card"], corner_radius=8)
-            f.pack(fill="x", padx=10, pady=2)
-            ctk.CTkLabel(f, text=label, font=("Segoe UI", 10),
-                         text_color=C["dim"]).pack(side="left", padx=10, pady=8)
-            lbl = ctk.CTkLabel(f, textvariable=var, font=("Consolas", 11, "bold"),
-                               text_color=C["accent"])
-            lbl.pack(side="right", padx=10)
-            return lbl
-
-        self._sec(page, "Bunker")
-        self._v_fuel = tk.StringVar(value="—")
-        self._v_co2  = tk.StringVar(value="—")
-        self._v_cash = tk.StringVar(value="—")
-        stat("⛽  Fuel",  self._v_fuel)
-        stat("🌿  CO2",   self._v_co2)
-        stat("💰  Cash",  self._v_cash)
-
-        self._sec(page, "Market Prices")
-        self._v_fp = tk.StringVar(value="—")
-        self._v_cp = tk.StringVar(value="—")
-        self._lbl_fp = stat("⛽  Fuel Price", self._v_fp)
-        self._lbl_cp = stat("🌿  CO2 Price",  self._v_cp)
-
-        self._sec(page, "Session")
-        self._v_session = tk.StringVar(value="No departures yet")
-        ctk.CTkLabel(page, textvariable=self._v_session,
-                     font=("Segoe UI", 10), text_color=C["dim"],
-                     anchor="w", wraplength=340).pack(fill="x", padx=12, pady=4)
-
-        self._sec(page, "Actions")
-        ctk.CTkButton(page, text="▶  Run Check Now",
-                      font=("Segoe UI", 11, "bold"),
-                      fg_color=C["accent"], hover_color="#0a9bd0",
-                      height=38, corner_radius=8,
-                      command=self.manager.run_now).pack(fill="x", padx=10, pady=3)
-        ctk.CTkButton(page, text="🔄  Refresh Status",
-                      font=("Segoe UI", 10),
-                      fg_color=C["border"], hover_color=C["card"],
-                      text_color=C["text"], height=32, corner_radius=8,
-                      command=self._refresh).pack(fill="x", padx=10, pady=3)
-
-    def _refresh(self):
-        def _do():
-            b = self.browser.fetch_bunker()
-            p = self.browser.fetch_prices_sync()
-            if b: self.on_bunker(b)
-            if p: self.on_prices(p)
-        threading.Thread(target=_do, daemon=True).start()
-
-    def _build_logs(self):
-        page = ctk.CTkFrame(self._content, fg_color=C["bg"], corner_radius=0)
-        self._pages["logs"] = page
-        hdr = ctk.CTkFrame(page, fg_color="transparent")
-        hdr.pack(fill="x", padx=10, pady=6)
-        ctk.CTkLabel(hdr, text="DEPARTURE LOG", font=("Segoe UI", 8, "bold"),
-                     text_color=C["muted"]).pack(side="left")
-        ctk.CTkButton(hdr, text="Clear", font=("Segoe UI", 9), width=48, height=22,
-                      fg_color=C["red"], hover_color="#b91c1c", text_color="white",
-                      corner_radius=4, command=self._clear_logs).pack(side="right")
-        self._log_scroll = ctk.CTkScrollableFrame(
-            page, fg_color=C["bg"], scrollbar_button_color=C["border"])
-        self._log_scroll.pack(fill="both", expand=True, padx=6)
-
-    def _add_log(self, entry):
-        row = ctk.CTkFrame(self._log_scroll, fg_color=C["card"], corner_radius=6)
-        row.pack(fill="x", pady=2)
-        top = ctk.CTkFrame(row, fg_color="transparent")
-        top.pack(fill="x", padx=8, pady=(5, 0))
-        ctk.CTkLabel(top, text=f"{fmt_ts(entry.get('timestamp',0))}  {entry.get('vessel','?')}",
-                     font=("Segoe UI", 10), text_color=C["text"]).pack(side="left")
-        ctk.CTkLabel(top, text=f"+${entry.get('income',0):,}",
-                     font=("Consolas", 10, "bold"), text_color=C["green"]).pack(side="right")
-        bot = ctk.CTkFrame(row, fg_color="transparent")
-        bot.pack(fill="x", padx=8, pady=(0, 5))
-        util_str = f"  util {entry.get('util','')}%" if entry.get('util') else ""
-        ctk.CTkLabel(bot, text=f"⛽ {entry.get('fuelUsed',0):.0f}t  🌿 {entry.get('co2Used',0):.0f}t{util_str}",
-                     font=("Segoe UI", 9), text_color=C["muted"]).pack(side="left")
-
-    def _clear_logs(self):
-        for w in self._log_scroll.winfo_children(): w.destroy()
-        self._session_income = 0; self._session_departs = 0
-        self._v_session.set("No departures yet")
-
-    def _build_settings(self):
-        page = ctk.CTkScrollableFrame(self._content, fg_color=C["bg"],
-                                       scrollbar_button_color=C["border"])
-        self._pages["settings"] = page
-        s = AccountManager.get_settings(self.account_id)
-
-        def field(lbl, var, width=90):
-            f = ctk.CTkFrame(page, fg_color=C["card"], corner_radius=8)
-            f.pack(fill="x", padx=10, pady=2)
-            ctk.CTkLabel(f, text=lbl, font=("Segoe UI", 10),
-                         text_color=C["text"]).pack(side="left", padx=10, pady=7)
-            ctk.CTkEntry(f, textvariable=var, width=width, font=("Consolas", 10),
-                         fg_color=C["border"], text_color=C["text"],
-                         border_color=C["border"]).pack(side="right", padx=10, pady=5)
-
-        def toggle(lbl, var):
-            f = ctk.CTkFrame(page, fg_color=C["card"], corner_radius=8)
-            f.pack(fill="x", padx=10, pady=2)
-            ctk.CTkLabel(f, text=lbl, font=("Segoe UI", 10),
-                         text_color=C["text"]).pack(side="left", padx=10, pady=7)
-            ctk.CTkSwitch(f, variable=var, text="", width=40,
-                          fg_color=C["border"], progress_color=C["green"],
-                          button_color=C["text"]).pack(side="right", padx=10)
-
-        def dropdown(lbl, var, values):
-            f = ctk.CTkFrame(page, fg_color=C["card"], corner_radius=8)
-            f.pack(fill="x", padx=10, pady=2)
-            ctk.CTkLabel(f, text=lbl, font=("Segoe UI", 10),
-                         text_color=C["text"]).pack(side="left", padx=10, pady=7)
-            ctk.CTkOptionMenu(f, variable=var, values=values, font=("Segoe UI", 10),
-                              width=110, fg_color=C["border"], button_color=C["accent"],
-                              text_color=C["text"]).pack(side="right", padx=10, pady=5)
-
-        self._sec(page, "⛽ Fuel")
-        self._sv_fm = tk.StringVar(value=s["fuel_mode"])
-        self._sv_ft = tk.StringVar(value=str(s["fuel_threshold"]))
-        self._sv_fc = tk.StringVar(value=str(s["fuel_min_cash"]))
-        dropdown("Mode",                  self._sv_fm, ["off","basic","intelligent"])
-        field   ("Price Threshold ($/t)", self._sv_ft)
-        field   ("Min Cash Reserve ($)",  self._sv_fc, 110)
-
-        self._sec(page, "🌿 CO2")
-        self._sv_cm = tk.StringVar(value=s["co2_mode"])
-        self._sv_ct = tk.StringVar(value=str(s["co2_threshold"]))
-        self._sv_cc = tk.StringVar(value=str(s["co2_min_cash"]))
-        dropdown("Mode",                  self._sv_cm, ["off","basic"])
-        field   ("Price Threshold ($/t)", self._sv_ct)
-        field   ("Min Cash Reserve ($)",  self._sv_cc, 110)
-
-        self._sec(page, "🚢 Auto-Depart")
-        self._sv_ad  = tk.BooleanVar(value=s["auto_depart"])
-        self._sv_ci  = tk.StringVar(value=str(s["check_interval"]))
-        self._sv_mu  = tk.StringVar(value=str(s.get("min_utilization", 50)))
-        self._sv_lua = tk.StringVar(value=s.get("low_util_action", "skip"))
-        toggle  ("Enable Auto-Depart",    self._sv_ad)
-        field   ("Check Interval (secs)", self._sv_ci)
-        field   ("Min Utilization (%)",   self._sv_mu, 70)
-        dropdown("Low Util Action",       self._sv_lua, ["skip","moor"])
-
-        self._sec(page, "🔐 Account")
-        ctk.CTkButton(page, text="🗑  Forget Saved Login",
-                      font=("Segoe UI", 10),
-                      fg_color=C["red"], hover_color="#b91c1c",
-                      text_color="white", height=34, corner_radius=8,
-                      command=self._forget_login).pack(fill="x", padx=10, pady=4)
-
-        ctk.CTkButton(page, text="💾  Save Settings",
-                      font=("Segoe UI", 11, "bold"),
-                      fg_color=C["green"], hover_color="#16a34a",
-                      height=38, corner_radius=8,
-                      command=self._save).pack(fill="x", padx=10, pady=14)
-
-    def _save(self):
-        try:
-            s = AccountManager.get_settings(self.account_id)
-            s.update({
-                "fuel_mode":       self._sv_fm.get(),
-                "fuel_threshold":  int(self._sv_ft.get()),
-                "fuel_min_cash":   int(self._sv_fc.get()),
-                "co2_mode":        self._sv_cm.get(),
-                "co2_threshold":   int(self._sv_ct.get()),
-                "co2_min_cash":    int(self._sv_cc.get()),
-                "auto_depart":     self._sv_ad.get(),
-                "check_interval":  int(self._sv_ci.get()),
-                "min_utilization": int(self._sv_mu.get()),
-                "low_util_action": self._sv_lua.get(),
-            })
-            AccountManager.save_settings(self.account_id, s)
-            self.set_status("✅ Settings saved")
-        except ValueError as e:
-            self.set_status(f"❌ Bad value: {e}")
-
-    def _forget_login(self):
-        AccountManager.clear_credentials(self.account_id)
-        self.set_status("✅ Login cleared — will ask next launch")
-
-    # ── Callbacks ─────────────────────────────────────────────────────────────
-    def on_bunker(self, d):
-        def _u():
-            self._v_fuel.set(f"{d.get('fuel',0):,.0f} / {d.get('maxFuel',0):,.0f} t")
-            self._v_co2.set( f"{d.get('co2', 0):,.0f} / {d.get('maxCO2', 0):,.0f} t")
-            self._v_cash.set(fmt_cash(d.get("cash", 0)))
-        self.after(0, _u)
-
-    def on_prices(self, d):
-        def _u():
-            s = AccountManager.get_settings(self.account_id)
-            fp = d.get("fuelPrice"); cp = d.get("co2Price")
-            if fp is not None:
-                self._v_fp.set(f"${fp}/t")
-                self._lbl_fp.configure(
-                    text_color=C["green"] if fp <= s["fuel_threshold"] else C["red"])
-            if cp is not None:
-                self._v_cp.set(f"${cp}/t")
-                self._lbl_cp.configure(
-                    text_color=C["green"] if cp <= s["co2_threshold"] else C["red"])
-        self.after(0, _u)
-
-    def on_depart(self, entry):
-        self._session_departs += 1
-        self._session_income  += entry.get("income", 0)
-        def _u():
-            self._v_session.set(
-                f"{self._session_departs} departure(s)  •  +${self._session_income:,}")
-            self._add_log(entry)
-        self.after(0, _u)
-
-    def set_status(self, msg):
-        self.after(0, lambda: self._status_var.set(msg))
-
-    def log(self, msg):
-        self.set_status(msg)
-        print(f"[{self.account['name']}] {msg}")
-
-
-# ── MAIN DASHBOARD ────────────────────────────────────────────────────────────
-class PirateBrowserDashboard:
-    def __init__(self):
-        self.root = ctk.CTk()
-        self.root.title("Pirate Browser")
-        self.root.geometry("380x900+0+0")
-        self.root.resizable(False, True)
-        self.root.configure(fg_color=C["bg"])
-        self.root.protocol("WM_DELETE_WINDOW", self._on_close)
-        self._account_tabs: dict[str, AccountTab] = {}
-        self._browsers:     dict[str, BrowserController] = {}
-        self._managers:     dict[str, AutoManager] = {}
-        self._shared_browser: SharedBrowser = None
-        self._build()
-
-    def _build(self):
-        # Header
-        hdr = ctk.CTkFrame(self.root, fg_color=C["panel"], height=54, corner_radius=0)
-        hdr.pack(fill="x"); hdr.pack_propagate(False)
-        ctk.CTkLabel(hdr, text="🏴‍☠️  PIRATE BROWSER",
-                     font=("Segoe UI", 13, "bold"),
-                     text_color=C["accent"]).place(relx=0.4, rely=0.5, anchor="center")
-        ctk.CTkButton(hdr, text="+ Account", font=("Segoe UI", 9),
-                      width=80, height=26, corner_radius=6,
-                      fg_color=C["border"], hover_color=C["card"],
-                      text_color=C["text"],
-                      command=self._add_account_dialog).place(relx=0.82, rely=0.5, anchor="center")
-
-        # Top-level nav (Accounts | Chatbot)
-        nav = ctk.CTkFrame(self.root, fg_color=C["panel"], height=32, corner_radius=0)
-        nav.pack(fill="x")
-        nav.pack_propagate(False)
-        self._nav_accounts_btn = ctk.CTkButton(
-            nav, text="⚓ Accounts", font=("Segoe UI", 10),
-            width=100, height=28, corner_radius=0,
-            fg_color=C["border"], hover_color=C["border"], text_color=C["accent"],
-            command=self._show_accounts)
-        self._nav_accounts_btn.pack(side="left", padx=1)
-        self._nav_bot_btn = ctk.CTkButton(
-            nav, text="🤖 Chatbot", font=("Segoe UI", 10),
-            width=100, height=28, corner_radius=0,
-            fg_color="transparent", hover_color=C["border"], text_color=C["dim"],
-            command=self._show_chatbot)
-        self._nav_bot_btn.pack(side="left", padx=1)
-
-        # Account tab bar
-        self._acct_bar = ctk.CTkFrame(self.root, fg_color=C["panel"],
-                                       height=32, corner_radius=0)
-        self._acct_bar.pack(fill="x")
-
-        # Content area
-        self._content = ctk.CTkFrame(self.root, fg_color=C["bg"], corner_radius=0)
-        self._content.pack(fill="both", expand=True)
-
-        # Chatbot panel (hidden initially)
-        self._chatbot_panel = ctk.CTkFrame(self.root, fg_color=C["bg"], corner_radius=0)
-        self._chatbot_tab_widget: ChatBotTab = None
-
-        # No accounts placeholder
-        self._placeholder = ctk.CTkLabel(
-            self._content,
-            text="No accounts yet.\nClick '+ Account' to add one.",
-            font=("Segoe UI", 12), text_color=C["dim"], justify="center")
-        self._placeholder.place(relx=0.5, rely=0.5, anchor="center")
-
-        self._active_account_id = None
-
-    def _add_account_dialog(self):
-        popup = ctk.CTkToplevel(self.root)
-        popup.title("Add Account")
-        popup.geometry("320x180")
-        popup.resizable(False, False)
-        popup.configure(fg_color="#0a0f1e")
-        popup.grab_set()
-
-        ctk.CTkLabel(popup, text="Account Name",
-                     font=("Segoe UI", 11), text_color=C["dim"]).pack(pady=(20, 4))
-        name_var = tk.StringVar()
-        entry = ctk.CTkEntry(popup, textvariable=name_var,
-                             placeholder_text="e.g. Main Account",
-                             font=("Segoe UI", 11), height=36,
-                             fg_color=C["card"], text_color=C["text"],
-                             border_color=C["border"])
-        entry.pack(fill="x", padx=20)
-        entry.focus()
-
-        def _confirm():
-            name = name_var.get().strip()
-            if not name:
-                return
-            popup.destroy()
-            account = AccountManager.add_account(name)
-            self._launch_account(account)
-
-        ctk.CTkButton(popup, text="Add & Login",
-                      font=("Segoe UI", 11, "bold"),
-                      fg_color=C["accent"], hover_color="#0a9bd0",
-                      height=36, corner_radius=8,
-                      command=_confirm).pack(fill="x", padx=20, pady=12)
-        popup.bind("<Return>", lambda e: _confirm())
-
-    def _launch_account(self, account: dict):
-        aid   = account["id"]
-        email, password = AccountManager.load_credentials(aid)
-
-        # Show login dialog if no saved creds
-        if not email or not password:
-            creds = [None, None]
-            def on_login(em, pw, remember):
-                creds[0] = em; creds[1] = pw
-                if remember:
-                    AccountManager.save_credentials(aid, em, pw)
-            submitted = show_login_dialog(self.root, account["name"], on_login)
-            if not submitted or not creds[0]:
-                AccountManager.remove_account(aid)
-                return
-            email, password = creds[0], creds[1]
-
-        # Get or create shared browser, open a new tab for this account
-        if self._shared_browser is None:
-            self._shared_browser = SharedBrowser(lambda m: print(f"[Browser] {m}"))
-            threading.Thread(target=self._shared_browser.start, daemon=True).start()
-            # Wait for browser to be ready before opening first tab
-            for _ in range(60):
-                if self._shared_browser.ready: break
-                time.sleep(1)
-            tab_handle = self._shared_browser.driver.window_handles[0]
-        else:
-            tab_handle = self._shared_browser.new_tab()
-
-        browser = BrowserController(
-            lambda m, a=account: self._log(a, m), aid,
-            self._shared_browser, tab_handle)
-        manager = AutoManager(
-            browser     = browser,
-            account_id  = aid,
-            log_fn      = lambda m, a=account: self._log(a, m),
-            on_bunker   = lambda d, a=aid: self._on_bunker(a, d),
-            on_prices   = lambda d, a=aid: self._on_prices(a, d),
-            on_depart   = lambda d, a=aid: self._on_depart(a, d),
-        )
-
-        self._browsers[aid] = browser
-        self._managers[aid] = manager
-
-        # Add account button to tab bar
-        btn = ctk.CTkButton(
-            self._acct_bar, text=account["name"],
-            font=("Segoe UI", 10), height=28, corner_radius=0,
-            fg_color="transparent", hover_color=C["border"],
-            text_color=C["dim"],
-            command=lambda a=aid: self._switch_account(a))
-        btn.pack(side="left", padx=1)
-
-        # Remove button (right-click)
-        def _remove(event, a=aid, b=btn):
-            if ctk.CTkInputDialog(text=f"Remove account '{account['name']}'?",
-                                  title="Confirm").get_input() is not None:
-                self._remove_account(a, b)
-        btn.bind("<Button-3>", _remove)
-
-        # Build account tab content
-        tab = AccountTab(self._content, account, browser, manager)
-        self._account_tabs[aid] = tab
-
-        self._placeholder.place_forget()
-        self._switch_account(aid)
-
-        # Start browser + manager
-        def _start():
-            browser.start()
-            if browser.ready and email and password:
-                self._log(account, "🔐 Attempting auto-login…")
-                if browser.auto_login(email, password):
-                    self._log(account, "✅ Auto-login successful")
-                else:
-                    self._log(account, "⚠ Auto-login failed — please log in manually")
-            manager.start()
-
-        threading.Thread(target=_start, daemon=True).start()
-
-    def _switch_account(self, account_id: str):
-        self._active_account_id = account_id
-        for aid, tab in self._account_tabs.items():
-            if aid == account_id:
-                tab.pack(fill="both", expand=True)
+                (buy, cap), self._fuel_plan = (fp <= ft, None), None
+            if buy and space >= 1:
+                amt = min(int(space), int(afford), int(cap + 1) if cap is not None else int(space))
+                if amt > 0:
+                    self.log(f"⛽ Buying {amt:,}t fuel @ ${fp}/t")
+                    r = self.browser.purchase_fuel_sync(amt)
+                    if r == "ok":
+                        self.log(f"✅ Fuel bought: {amt:,}t")
+                        b2 = self.browser.fetch_bunker()
+                        if b2: self.on_bunker(b2); cash = b2["cash"]; bunker = b2
+                    else: self.log(f"❌ Fuel failed: {r}")
+            elif not self._fuel_plan: self.log(f"⛽ Fuel ${fp}/t threshold ${ft} — skip")
+
+        if s["co2_mode"] != "off" and cp is not None:
+            ct = s["co2_threshold"]; space = mc - co2
+            afford = max(0, cash - s["co2_min_cash"]) / cp if cp > 0 else 0
+            if cp <= ct and space >= 1:
+                amt = min(int(space), int(afford))
+                if amt > 0:
+                    self.log(f"🌿 Buying {amt:,}t CO2 @ ${cp}/t")
+                    r = self.browser.purchase_co2_sync(amt)
+                    if r == "ok":
+                        self.log(f"✅ CO2 bought: {amt:,}t")
+                        b2 = self.browser.fetch_bunker()
+                        if b2: self.on_bunker(b2); cash = b2["cash"]; bunker = b2
+                    else: self.log(f"❌ CO2 failed: {r}")
+            else: self.log(f"🌿 CO2 ${cp}/t threshold ${ct} — skip")
+
+        self._last_bunker = bunker
+        return bunker
+
+    def _depart(self, s, vessels) -> int:
+        """Depart (or moor) every ready vessel; returns how many departed."""
+        min_util    = int(s.get("min_utilization", 50))
+        util_action = s.get("low_util_action", "skip")
+        ready = [v for v in (vessels or [])
+                 if v.get("status") == "port"
+                 and not v.get("is_parked")
+                 and v.get("route_destination")]
+        self.log(f"🚢 {len(ready)} vessel(s) in port")
+        orders = []
+        for v in ready:
+            name = v.get("name", "?"); util = v.get("_utilization", 100)
+            if util >= min_util:
+                orders.append(("depart", v))
+            elif util_action == "moor":
+                self.log(f"⚓ {name} util {util}% < {min_util}% — mooring")
+                orders.append(("moor", v))
             else:
-                tab.pack_forget()
-        # Update tab button colours
-        for widget in self._acct_bar.winfo_children():
-            name = widget.cget("text")
-            accounts = AccountManager.load_accounts()
-            match = next((a for a in accounts if a["name"] == name and a["id"] == account_id), None)
-            widget.configure(
-                text_color=C["accent"] if match else C["dim"],
-                fg_color=C["border"] if match else "transparent")
-
-    def _remove_account(self, account_id: str, btn):
-        if account_id in self._managers:
-            self._managers[account_id].stop()
-        if account_id in self._browsers:
-            self._browsers[account_id].close()
-        if account_id in self._account_tabs:
-            self._account_tabs[account_id].destroy()
-            del self._account_tabs[account_id]
-        AccountManager.remove_account(account_id)
-        btn.destroy()
-        del self._browsers[account_id]
-        del self._managers[account_id]
-        if not self._account_tabs:
-            self._placeholder.place(relx=0.5, rely=0.5, anchor="center")
-
-    def _show_accounts(self):
-        self._chatbot_panel.pack_forget()
-        self._acct_bar.pack(fill="x")
-        self._content.pack(fill="both", expand=True)
-        self._nav_accounts_btn.configure(fg_color=C["border"], text_color=C["accent"])
-        self._nav_bot_btn.configure(fg_color="transparent", text_color=C["dim"])
-
-    def _show_chatbot(self):
-        self._acct_bar.pack_forget()
-        self._content.pack_forget()
-        self._chatbot_panel.pack(fill="both", expand=True)
-        self._nav_bot_btn.configure(fg_color=C["border"], text_color=C["accent"])
-        self._nav_accounts_btn.configure(fg_color="transparent", text_color=C["dim"])
-        if self._chatbot_tab_widget is None and self._browsers:
-            first_aid = next(iter(self._browsers))
-            self._chatbot_tab_widget = ChatBotTab(
-                self._chatbot_panel, self._browsers[first_aid], first_aid)
-            self._chatbot_tab_widget.pack(fill="both", expand=True)
-        elif self._chatbot_tab_widget is None:
-            ctk.CTkLabel(self._chatbot_panel,
-                         text="Add an account first to use the chatbot",
-                         font=("Segoe UI", 12), text_color=C["dim"]).place(
-                relx=0.5, rely=0.5, anchor="center")
-
-    def _log(self, account: dict, msg: str):
-        print(f"[{account['name']}] {msg}")
-        aid = account["id"]
-        if aid in self._account_tabs:
-            self._account_tabs[aid].log(msg)
-
-    def _on_bunker(self, account_id: str, data: dict):
-        if account_id in self._account_tabs:
-            self._account_tabs[account_id].on_bunker(data)
-
-    def _on_prices(self, account_id: str, data: dict):
-        if account_id in self._account_tabs:
-            self._account_tabs[account_id].on_prices(data)
-
-    def _on_depart(self, account_id: str, entry: dict):
-        if account_id in self._account_tabs:
-            self._account_tabs[account_id].on_depart(entry)
-
-    def _on_close(self):
-        for manager in self._managers.values():
-            manager.stop()
-        if self._shared_browser:
-            self._shared_browser.close()
-        self.root.destroy()
-
-    def run(self):
-        threading.Thread(target=self._check_updates, daemon=True).start()
-        # Auto-launch saved accounts
-        accounts = AccountManager.load_accounts()
-        if accounts:
-            for account in accounts:
-                self.root.after(100, lambda a=account: self._launch_account(a))
-        self.root.mainloop()
-
-    def _check_updates(self):
-        time.sleep(3)
-        latest, url = check_for_updates()
-        if latest and version_tuple(latest) > version_tuple(CURRENT_VERSION):
-            self.root.after(0, lambda: show_update_dialog(latest))
+                self.log(f"⏭ {name} util {util}% < {min_util}% — skipping")
+        self.timers.rearm(vessels, clock.time())
+        results = self.browser.depart_batch(
+            orders, concurrency=int(s.get("depart_concurrency", 4)),
+            rate=float(s.get("depart_rate", 5)))
+        departed = failed = 0
+        for (action, v), r in zip(orders, results):
+            name = v.get("name", "?"); util = v.get("_utilization", 100)
+            if action == "moor":
+                if r != "ok": self.log(f"❌ Moor failed {name}: {r}"); failed += 1
+            elif r.get("success"):
+                entry = {"timestamp": int(clock.time()*1000), "vessel": name,
+                         "income": r.get("income",0), "fuelUsed": r.get("fuelUsed",0),
+                         "co2Used": r.get("co2Used",0), "util": util}
+                self.on_depart(entry)
+                self._fuel_used.append((clock.time(), entry["fuelUsed"]))
+                departed += 1
+                self.log(f"✅ Departed {name} ({util}% util) +${entry['income']:,}")
+            else:
+                self.log(f"❌ Depart failed {name}: {r.get('error','?')}")
+                failed += 1
+        # Departed vessels' arrival times are only known after the next fetch
+        self._resync_soon = bool(departed or failed)
+        return departed
 
 
 # ── CHATBOT ───────────────────────────────────────────────────────────────────
 CUSTOM_COMMANDS_FILE = DATA_DIR / "custom_commands.json"
 PORT_RANKINGS_CACHE  = DATA_DIR / "port_rankings_cache.json"
+CHAT_POLL_INTERVAL   = 30     # seconds between chat polls while people are talking…
+CHAT_POLL_FAST       = 5      # …right after a command or a new member…
+CHAT_POLL_IDLE       = 120    # …and at most this when nothing is happening
+CHAT_POLL_BACKOFF    = 1.5    # each quiet (or failed) poll stretches the interval by this
+CHAT_PAGE_SIZE       = 50     # chat feed entries per request
+CHAT_MAX_PAGES       = 5      # pages fetched in one poll when catching up
+CHAT_DEDUPE_WINDOW   = 600    # seconds of chat entries remembered for dedupe…
+CHAT_DEDUPE_MAX      = 1000   # …and at most this many
+COMMANDS_RECHECK     = 2      # seconds between custom_commands.json mtime checks
 
 WELCOME_MESSAGE = (
     "⚓ Ahoy, {company}! Welcome aboard The Salty Sea Dogs! 🏴‍☠️\n"
@@ -1374,6 +2906,7 @@ def load_custom_commands() -> dict:
 
 def save_custom_commands(commands: dict):
     CUSTOM_COMMANDS_FILE.write_text(json.dumps(commands, indent=2), encoding="utf-8")
+    COMMANDS.invalidate()
 
 def load_port_rankings() -> list:
     if PORT_RANKINGS_CACHE.exists():
@@ -1386,121 +2919,289 @@ def load_port_rankings() -> list:
 
 def save_port_rankings(rankings: list):
     PORT_RANKINGS_CACHE.write_text(
-        json.dumps({"timestamp": int(time.time()), "rankings": rankings}, indent=2),
+        json.dumps({"timestamp": int(clock.time()), "rankings": rankings}, indent=2),
         encoding="utf-8")
 
 
+def parse_command(text: str):
+    """'!Ports 10' -> ('!ports', ['10']); quoted arguments stay together."""
+    try:
+        words = shlex.split(text)
+    except ValueError:   # unbalanced quote, e.g. an apostrophe
+        words = text.split()
+    return (words[0].lower(), words[1:]) if words else ("", [])
+
+
+class ChatCommand:
+    """A chat command: a handler called as handler(bot, args), or a fixed response."""
+
+    def __init__(self, name: str, handler=None, response: str = None, help: str = "",
+                 usage: str = "", aliases=()):
+        self.name     = name
+        self.handler  = handler
+        self.response = response
+        self.help     = help
+        self.usage    = usage
+        self.aliases  = tuple(aliases)
+
+    def title(self) -> str:
+        """'!ports [count] (also !port)' — as listed by !help."""
+        text = f"{self.name} {self.usage}".strip()
+        return text + (f" (also {', '.join(self.aliases)})" if self.aliases else "")
+
+
+class CommandRegistry:
+    """Built-in and custom chatbot commands, compiled into one lookup table.
+
+    custom_commands.json is read when the table is first needed and again
+    only after its mtime changes or invalidate() is called. Custom entries
+    are either a response string or {"response": ..., "aliases": [...]};
+    built-ins win on a name clash. The !help text is rendered with the table.
+    """
+
+    def __init__(self, path: Path = CUSTOM_COMMANDS_FILE):
+        self.path      = path
+        self._lock     = threading.Lock()
+        self._builtins = []
+        self._table    = None    # name or alias -> ChatCommand
+        self._help     = ""
+        self._mtime    = None
+        self._checked  = 0.0
+
+    def add(self, name: str, handler, help: str, usage: str = "", aliases=()):
+        with self._lock:
+            self._builtins.append(ChatCommand(name, handler, help=help, usage=usage,
+                                              aliases=aliases))
+            self._table = None
+
+    def invalidate(self):
+        with self._lock:
+            self._table = None
+
+    def lookup(self, name: str):
+        return self._current().get(name)
+
+    def help_text(self) -> str:
+        self._current()
+        return self._help
+
+    def _current(self) -> dict:
+        now = time.monotonic()
+        with self._lock:
+            if self._table is not None and now - self._checked < COMMANDS_RECHECK:
+                return self._table
+            self._checked = now
+            try:
+                mtime = self.path.stat().st_mtime_ns
+            except OSError:
+                mtime = None
+            if self._table is None or mtime != self._mtime:
+                self._mtime = mtime
+                self._compile(load_custom_commands())
+            return self._table
+
+    def _compile(self, custom: dict):
+        table = {}
+        for c in self._builtins:
+            for key in (c.name, *c.aliases):
+                table.setdefault(key, c)
+        customs = []
+        for name, value in custom.items():
+            if isinstance(value, dict):
+                response, aliases = value.get("response", ""), value.get("aliases") or ()
+            else:
+                response, aliases = str(value), ()
+            c = ChatCommand(name.lower(), response=response,
+                            aliases=[a.lower() for a in aliases if a.lower() not in table])
+            if c.name in table:
+                continue
+            customs.append(c)
+            for key in (c.name, *c.aliases):
+                table.setdefault(key, c)
+        text = "⚓ Ahoy! Here be the available commands:\n"
+        text += "".join(f"{c.title()} — {c.help}\n" for c in self._builtins)
+        if customs:
+            text += "\n📜 Custom commands:\n"
+            text += "".join(f"{c.title()}\n" for c in customs)
+        self._table, self._help = table, text
+
+COMMANDS = CommandRegistry()
+
+
+class RecentKeys:
+    """Keys seen in the last `window` seconds, never more than `capacity`.
+
+    Entries older than the window are also older than the poll cursor, so
+    they are filtered by timestamp and need not be remembered.
+    """
+
+    def __init__(self, window: float = CHAT_DEDUPE_WINDOW, capacity: int = CHAT_DEDUPE_MAX):
+        self.window   = window
+        self.capacity = capacity
+        self._order   = collections.deque()   # (ts, key), oldest first
+        self._keys    = set()
+
+    def add(self, key, ts: float) -> bool:
+        """Remember `key`; False if it was already seen."""
+        if key in self._keys:
+            return False
+        self._keys.add(key)
+        self._order.append((ts, key))
+        while self._order and (len(self._order) > self.capacity
+                               or self._order[0][0] < ts - self.window):
+            self._keys.discard(self._order.popleft()[1])
+        return True
+
+    def __len__(self):
+        return len(self._order)
+
+
 class AllianceChatBot:
-    """Polls alliance chat, responds to commands, sends welcome messages."""
+    """Polls alliance chat, responds to commands, sends welcome messages.
+
+    Polls come faster after commands and joins and back off while the chat
+    is quiet. Each poll pages back until it reaches entries already seen.
+    """
 
     def __init__(self, browser: BrowserController, alliance_id: int,
-                 bot_user_id: int, log_fn, on_chat_message):
+                 bot_user_id: int, log_fn, on_chat_message,
+                 welcome_message: str = WELCOME_MESSAGE):
         self.browser         = browser
         self.alliance_id     = alliance_id
         self.bot_user_id     = bot_user_id
+        self.welcome_message = welcome_message
         self.log             = log_fn
         self.on_chat_message = on_chat_message   # callback to update UI
         self._running        = False
-        self._last_ts        = int(time.time())  # only handle messages after start
-        self._seen_ids       = set()
+        self._last_ts        = int(clock.time())  # cursor: newest entry handled (starts now)
+        self._seen           = RecentKeys()        # entries at or near the cursor
+        self.interval        = CHAT_POLL_INTERVAL
 
     def start(self):
         self._running = True
-        threading.Thread(target=self._loop, daemon=True).start()
+        ORCH.spawn(self._run, key=f"chat:{self.alliance_id}")
         self.log("🤖 Chatbot started")
 
     def stop(self):
         self._running = False
+        ORCH.cancel(f"chat:{self.alliance_id}")
         self.log("🤖 Chatbot stopped")
 
-    def _loop(self):
+    async def _run(self):
         # Wait for browser
         for _ in range(60):
-            if not self._running: return
             if self.browser.ready: break
-            time.sleep(1)
+            await clock.asleep(1)
 
+        alliance = str(self.alliance_id)
         while self._running:
+            t0 = time.monotonic()
             try:
-                self._poll()
+                activity = await ORCH.blocking(self._poll, lane="chat")
             except Exception as e:
+                METRICS.inc("pirate_chat_errors_total", alliance=alliance)
                 self.log(f"⚠ Bot error: {e}")
-            for _ in range(30):
-                if not self._running: return
-                time.sleep(1)
-
-    def _poll(self):
-        feed = self.browser.run_js(f"""
-            try {{
-                var xhr = new XMLHttpRequest();
-                xhr.open('POST', 'https://shippingmanager.cc/api/alliance/get-chat-feed', false);
-                xhr.setRequestHeader('Content-Type', 'application/json');
-                xhr.withCredentials = true;
-                xhr.send(JSON.stringify({{alliance_id: {self.alliance_id}, offset: 0, limit: 50}}));
-                var d = JSON.parse(xhr.responseText);
-                return d.data ? d.data.chat_feed : [];
-            }} catch(e) {{ return []; }}
-        """)
-        if not feed:
-            return
-
-        for entry in reversed(feed):
+                activity = "idle"
+            METRICS.observe("pirate_chat_poll_seconds", time.monotonic() - t0, alliance=alliance)
+            self.interval = self._next_interval(activity)
+            METRICS.set("pirate_chat_poll_interval_seconds", self.interval, alliance=alliance)
+            await clock.asleep(self.interval)
+
+    def _next_interval(self, activity: str) -> float:
+        """Fast after a command or join, easing back to the normal interval
+        while people talk, stretching towards CHAT_POLL_IDLE when quiet."""
+        if activity == "hot":
+            return CHAT_POLL_FAST
+        if activity == "active":
+            return min(self.interval * CHAT_POLL_BACKOFF, CHAT_POLL_INTERVAL)
+        return min(self.interval * CHAT_POLL_BACKOFF, CHAT_POLL_IDLE)
+
+    def _fetch_new(self) -> list:
+        """Feed entries from the cursor on, oldest first.
+
+        The feed is newest first; pages are fetched until one reaches back
+        past the cursor (or runs out), so a burst bigger than a page is
+        not skipped.
+        """
+        entries = []
+        for page in range(CHAT_MAX_PAGES):
+            r = self.browser.api_call("alliance/get-chat-feed",
+                                      {"alliance_id": self.alliance_id,
+                                       "offset": page * CHAT_PAGE_SIZE, "limit": CHAT_PAGE_SIZE})
+            if not r["ok"]:
+                if not page:
+                    raise RuntimeError(f"chat feed: {r.get('error') or r.get('status')}")
+                break
+            METRICS.inc("pirate_chat_pages_total", alliance=str(self.alliance_id))
+            feed = api_data(r).get("chat_feed") or []
+            entries.extend(feed)
+            if (len(feed) < CHAT_PAGE_SIZE
+                    or min(e.get("time_created", 0) for e in feed) < self._last_ts):
+                break
+        else:
+            self.log(f"⚠ Over {CHAT_MAX_PAGES * CHAT_PAGE_SIZE} new chat entries — older ones skipped")
+        # Pages shift as entries arrive, so an entry can appear twice; RecentKeys drops repeats
+        return [e for e in reversed(entries) if e.get("time_created", 0) >= self._last_ts]
+
+    def _poll(self) -> str:
+        """Handle new chat entries; returns "hot" (command or join), "active" or "idle"."""
+        activity = "idle"
+        for entry in self._fetch_new():
             ts       = entry.get("time_created", 0)
             uid      = entry.get("user_id")
             msg_type = entry.get("type")
-            key      = f"{uid}_{ts}"
+            key      = (uid, ts, msg_type, entry.get("feed_type"), entry.get("message"),
+                        str(entry.get("replacements") or ""))
 
-            if ts <= self._last_ts or key in self._seen_ids:
+            if not self._seen.add(key, ts):
                 continue
-            self._seen_ids.add(key)
+            self._last_ts = max(self._last_ts, ts)
+            if activity == "idle" and uid != self.bot_user_id:
+                activity = "active"
 
             # Member joined
             if msg_type == "feed" and entry.get("feed_type") == "member_joined":
                 company = entry.get("replacements", {}).get("company_name", "Captain")
                 self.log(f"👋 New member: {company}")
                 self.on_chat_message({"type": "join", "company": company, "ts": ts})
-                welcome = WELCOME_MESSAGE.format(company=company)
+                welcome = self.welcome_message.format(company=company)
                 self.send(welcome)
+                activity = "hot"
 
             # Chat command
             elif msg_type == "chat" and uid != self.bot_user_id:
                 text = (entry.get("message") or "").strip()
                 self.on_chat_message({"type": "chat", "uid": uid, "text": text, "ts": ts})
-                if text.startswith("!"):
-                    self._handle_command(text)
-
-        self._last_ts = max((e.get("time_created", 0) for e in feed), default=self._last_ts)
-
-    def _handle_command(self, text: str):
-        cmd   = text.split()[0].lower()
-        parts = text.split()[1:]
-
-        if cmd == "!help":
-            custom = load_custom_commands()
-            built_in = "⚓ Ahoy! Here be the available commands:\n"
-            built_in += "!ports — Top port rankings\n"
-            built_in += "!stats — Alliance stats\n"
-            if custom:
-                built_in += "\n📜 Custom commands:\n"
-                for k in custom:
-                    built_in += f"{k}\n"
-            self.send(built_in)
-            self.log(f"🤖 Responded to !help")
-
-        elif cmd == "!ports":
-            self._cmd_ports()
-
-        elif cmd == "!stats":
-            self._cmd_stats()
+                if text.startswith("!") and self._handle_command(text):
+                    activity = "hot"
+        return activity
+
+    def _handle_command(self, text: str) -> bool:
+        """Run a !command; False if it isn't one the bot knows."""
+        name, args = parse_command(text)
+        cmd = COMMANDS.lookup(name)
+        if cmd is None:
+            return False
+        if cmd.handler:
+            cmd.handler(self, args)
+        else:
+            self.send(cmd.response)
+        self.log(f"🤖 Responded to {cmd.name}" + (f" {' '.join(args)}" if args else ""))
+        return True
 
+    def _cmd_help(self, args: list = ()):
+        if not args:
+            self.send(COMMANDS.help_text())
+            return
+        name = args[0].lower()
+        cmd  = COMMANDS.lookup(name if name.startswith("!") else "!" + name)
+        if cmd is None:
+            self.send(f"⚓ No such command, Cap'n: {args[0]}")
         else:
-            # Check custom commands
-            custom = load_custom_commands()
-            if cmd in custom:
-                self.send(custom[cmd])
-                self.log(f"🤖 Responded to custom command {cmd}")
+            self.send(f"⚓ {cmd.title()}" + (f" — {cmd.help}" if cmd.help else ""))
 
-    def _cmd_ports(self):
+    def _cmd_ports(self, args: list = ()):
+        count    = max(1, min(50, int(args[0]))) if args and args[0].isdigit() else 20
         rankings = load_port_rankings()
         if not rankings:
             self.send("⚓ No port data yet, Cap'n! Run the alliance tracker first.")
@@ -1520,29 +3221,19 @@ class AllianceChatBot:
                 name  = r["port_code"].replace("_", " ").title()
                 lines.append(f"{medal} #{r['rank']} {name}")
 
-        # Top 20 overall
-        top20 = ranked[:20]
-        if top20:
-            lines.append(f"\n⚓ Top 20 ports ({len(ranked)} total):")
-            for r in top20:
+        # Top N overall
+        top = ranked[:count]
+        if top:
+            lines.append(f"\n⚓ Top {len(top)} ports ({len(ranked)} total):")
+            for r in top:
                 name = r["port_code"].replace("_", " ").title()
                 lines.append(f"#{r['rank']} {name}")
 
         self.send("\n".join(lines))
-        self.log("🤖 Responded to !ports")
-
-    def _cmd_stats(self):
-        stats = self.browser.run_js(f"""
-            try {{
-                var xhr = new XMLHttpRequest();
-                xhr.open('POST', 'https://shippingmanager.cc/api/alliance/get-alliance', false);
-                xhr.setRequestHeader('Content-Type', 'application/json');
-                xhr.withCredentials = true;
-                xhr.send(JSON.stringify({{alliance_id: {self.alliance_id}}}));
-                var d = JSON.parse(xhr.responseText);
-                return d.data ? d.data.alliance : null;
-            }} catch(e) {{ return null; }}
-        """)
+
+    def _cmd_stats(self, args: list = ()):
+        r = self.browser.api_call("alliance/get-alliance", {"alliance_id": self.alliance_id})
+        stats = api_data(r).get("alliance")
         if not stats:
             self.send("⚓ Couldn't fetch stats, Cap'n! Try again later.")
             return
@@ -1561,330 +3252,491 @@ class AllianceChatBot:
             f"🤝 Co-ops (24h): {coop:,}"
         )
         self.send(msg)
-        self.log("🤖 Responded to !stats")
 
     def send(self, text: str):
         # Split long messages into chunks of 500 chars
         chunks = [text[i:i+500] for i in range(0, len(text), 500)]
         for chunk in chunks:
-            escaped = chunk.replace("\\", "\\\\").replace("'", "\\'").replace("\n", "\\n")
-            self.browser.run_js(f"""
-                try {{
-                    var xhr = new XMLHttpRequest();
-                    xhr.open('POST', 'https://shippingmanager.cc/api/alliance/post-chat', false);
-                    xhr.setRequestHeader('Content-Type', 'application/json');
-                    xhr.withCredentials = true;
-                    xhr.send(JSON.stringify({{alliance_id: {self.alliance_id}, text: '{escaped}'}}));
-                }} catch(e) {{}}
-            """)
-            time.sleep(0.5)
+            self.browser.api_call("alliance/post-chat",
+                                  {"alliance_id": self.alliance_id, "text": chunk})
+            clock.sleep(0.5)
+
+
+COMMANDS.add("!help",  AllianceChatBot._cmd_help,  "This list, or one command's details",
+             usage="[command]", aliases=("!commands",))
+COMMANDS.add("!ports", AllianceChatBot._cmd_ports, "Top port rankings",
+             usage="[count]", aliases=("!port", "!rankings"))
+COMMANDS.add("!stats", AllianceChatBot._cmd_stats, "Alliance stats", aliases=("!alliance",))
+
+
+# ── WORKER PROCESSES ──────────────────────────────────────────────────────────
+WORKER_HEARTBEAT = 5      # seconds between worker heartbeats
+WORKER_STALE     = 60     # a worker silent this long is killed and restarted…
+WORKER_START_GRACE = 300  # …or, before its first heartbeat, this long (driver download, login)
+WORKER_BACKOFF   = (2, 60)   # restart delay: first, maximum (doubles per crash)
+WORKER_STABLE    = 300    # a worker up this long resets its crash backoff
+
+class _QueueLogSink:
+    """LogSink stand-in inside a worker: records go to the parent, which writes them."""
+
+    def __init__(self, events):
+        self._events = events
+
+    def emit(self, source: str, msg: str, level: str = None):
+        self._events.put(("log", source, {"msg": msg, "level": level}))
+
+    def name(self, source, display): pass
+    def subscribe(self, fn): pass
+    def unsubscribe(self, fn): pass
+    def close(self, timeout: float = 2.0): pass
+
+def worker_main(account: dict, email, password, events, commands, headless: bool = False):
+    """Entry point of an account's worker process (must stay importable for spawn)."""
+    global LOGS
+    LOGS = _QueueLogSink(events)
+    aid  = account["id"]
+    post = lambda kind, payload: events.put((kind, aid, payload))
+    log  = lambda m: LOGS.emit(aid, m)
+
+    def _crash(args):
+        log(f"❌ {args.thread.name if args.thread else 'thread'} crashed: "
+            f"{args.exc_type.__name__}: {args.exc_value}")
+    threading.excepthook = _crash
+
+    pool    = BrowserPool(log, size=1, headless=headless)
+    browser = BrowserController(log, aid, pool)
+    manager = AutoManager(browser, aid, log,
+                          on_bunker = lambda d: post("bunker", d),
+                          on_prices = lambda d: post("prices", d),
+                          on_depart = lambda d: post("depart", d))
+    browser.start()
+    if browser.ready and email and password:
+        log("🔐 Attempting auto-login…")
+        if browser.auto_login(email, password):
+            log("✅ Auto-login successful")
+        else:
+            log("⚠ Auto-login failed — please log in manually")
+    manager.start()
+    post("heartbeat", os.getpid())
+    code = 0
+    while True:
+        try:
+            cmd, payload = commands.get(timeout=WORKER_HEARTBEAT)
+        except queue.Empty:
+            cmd = payload = None
+        if cmd == "stop":
+            break
+        elif cmd == "run_now":
+            manager.run_now()
+        elif cmd == "refresh":
+            manager.refresh()
+        elif cmd == "settings":
+            STORE.set_settings(aid, payload, persist=False)
+        if manager.task.done():
+            log("❌ Auto-manager stopped unexpectedly — restarting the worker")
+            code = 1
+            break
+        post("heartbeat", os.getpid())
+        post("metrics", METRICS.snapshot())
+    manager.stop()
+    browser.close()
+    pool.close()
+    ORCH.close()
+    sys.exit(code)
+
+class _Worker:
+    def __init__(self, account: dict, email, password):
+        self.account  = account
+        self.creds    = (email, password)
+        self.proc     = None
+        self.commands = None
+        self.started  = 0.0
+        self.last_seen = 0.0
+        self.ready    = False    # first heartbeat received since the last spawn
+        self.restarts = 0
+        self.backoff  = WORKER_BACKOFF[0]
+        self.restart_at = None
+        self.stopping = False
+        self.on_settings = None
+
+class WorkerSupervisor:
+    """Runs each account in its own process and relays their events.
+
+    on_event(kind, account_id, payload) is called on a relay thread with
+    kind in bunker / prices / depart. Log records are re-emitted into this
+    process's LOGS. Workers that exit or stop sending heartbeats are
+    restarted with exponential backoff.
+    """
+
+    def __init__(self, on_event, headless: bool = False):
+        self.on_event = on_event
+        self.headless = headless
+        self._ctx     = multiprocessing.get_context("spawn")
+        self._events  = self._ctx.Queue()
+        self._workers = {}
+        self._lock    = threading.Lock()
+        self._stop    = threading.Event()
+        threading.Thread(target=self._relay, daemon=True).start()
+        threading.Thread(target=self._watch, daemon=True).start()
 
+    def start(self, account: dict, email=None, password=None):
+        aid = account["id"]
+        with self._lock:
+            w = self._workers.get(aid)
+            if w and w.proc and (w.proc.is_alive() or w.restart_at):
+                return   # already running (or about to be restarted by _watch)
+            w = w or _Worker(account, email, password)
+            self._workers[aid] = w
+            self._spawn(w)
+            old, w.on_settings = w.on_settings, (
+                lambda settings: self.send(aid, "settings", settings))
+        # Settings saved here must reach the worker's own in-memory store
+        if old:
+            AccountManager.unsubscribe(aid, old)
+        AccountManager.subscribe(aid, w.on_settings)
+
+    def _spawn(self, w: _Worker):
+        """Start (or restart) a worker's process (caller holds _lock)."""
+        w.commands = self._ctx.Queue()
+        w.proc = self._ctx.Process(
+            target=worker_main, name=f"worker-{w.account['name']}", daemon=True,
+            args=(w.account, *w.creds, self._events, w.commands, self.headless))
+        w.proc.start()
+        w.started = w.last_seen = time.time()
+        w.ready   = False
+        w.restart_at = None
+        LOGS.emit(w.account["id"], f"⚙ Worker process {w.proc.pid} started")
+
+    def send(self, account_id: str, cmd: str, payload=None):
+        with self._lock:
+            w = self._workers.get(account_id)
+        if w and w.commands and w.proc and w.proc.is_alive():
+            w.commands.put((cmd, payload))
 
-# ── CHATBOT TAB ───────────────────────────────────────────────────────────────
-class ChatBotTab(ctk.CTkFrame):
-    """Dashboard tab for managing the alliance chatbot."""
+    def stop(self, account_id: str):
+        with self._lock:
+            w = self._workers.pop(account_id, None)
+        if not w:
+            return
+        w.stopping = True
+        AccountManager.unsubscribe(account_id, w.on_settings)
+        if w.proc and w.proc.is_alive():
+            w.commands.put(("stop", None))
+            threading.Thread(target=self._reap, args=(w,), daemon=True).start()
 
-    def __init__(self, parent, browser: BrowserController, account_id: str, **kw):
-        super().__init__(parent, fg_color=C["bg"], corner_radius=0, **kw)
-        self.browser     = browser
-        self.account_id  = account_id
-        self.bot: AllianceChatBot = None
-        self._status_var  = tk.StringVar(value="Bot offline")
-        self._alliance_id = None
-        self._bot_user_id = None
-        self._build()
-
-    def _build(self):
-        # Sub-tabs
-        tab_bar = ctk.CTkFrame(self, fg_color=C["panel"], height=32, corner_radius=0)
-        tab_bar.pack(fill="x")
-        tab_bar.pack_propagate(False)
-        self._pages    = {}
-        self._tab_btns = {}
-        for tid, label in [("control","🤖 Bot"), ("commands","📜 Commands"), ("log","💬 Chat Log")]:
-            b = ctk.CTkButton(tab_bar, text=label, font=("Segoe UI", 10),
-                              width=100, height=28, corner_radius=0,
-                              fg_color="transparent", hover_color=C["border"],
-                              text_color=C["dim"],
-                              command=lambda t=tid: self._show(t))
-            b.pack(side="left", padx=1)
-            self._tab_btns[tid] = b
-
-        self._content = ctk.CTkFrame(self, fg_color=C["bg"], corner_radius=0)
-        self._content.pack(fill="both", expand=True)
-
-        self._build_control()
-        self._build_commands()
-        self._build_log()
-        self._show("control")
-
-        ctk.CTkLabel(self, textvariable=self._status_var,
-                     font=("Consolas", 9), text_color=C["dim"],
-                     anchor="w").pack(fill="x", padx=8, pady=2)
-
-    def _show(self, tab_id):
-        for tid, page in self._pages.items():
-            if tid == tab_id:
-                page.pack(fill="both", expand=True)
-                self._tab_btns[tid].configure(text_color=C["accent"], fg_color=C["border"])
-            else:
-                page.pack_forget()
-                self._tab_btns[tid].configure(text_color=C["dim"], fg_color="transparent")
-
-    def _build_control(self):
-        page = ctk.CTkScrollableFrame(self._content, fg_color=C["bg"],
-                                       scrollbar_button_color=C["border"])
-        self._pages["control"] = page
-
-        # Status card
-        status_card = ctk.CTkFrame(page, fg_color=C["card"], corner_radius=10)
-        status_card.pack(fill="x", padx=10, pady=10)
-        ctk.CTkLabel(status_card, text="🤖  Alliance Chatbot",
-                     font=("Segoe UI", 13, "bold"),
-                     text_color=C["accent"]).pack(pady=(12, 2))
-        self._status_lbl = ctk.CTkLabel(status_card, textvariable=self._status_var,
-                                         font=("Segoe UI", 10), text_color=C["dim"])
-        self._status_lbl.pack(pady=(0, 12))
-
-        # Alliance ID input
-        f = ctk.CTkFrame(page, fg_color=C["card"], corner_radius=8)
-        f.pack(fill="x", padx=10, pady=2)
-        ctk.CTkLabel(f, text="Alliance ID", font=("Segoe UI", 10),
-                     text_color=C["text"]).pack(side="left", padx=10, pady=7)
-        self._sv_aid = tk.StringVar(value="6338")
-        ctk.CTkEntry(f, textvariable=self._sv_aid, width=90,
-                     font=("Consolas", 10), fg_color=C["border"],
-                     text_color=C["text"], border_color=C["border"]).pack(
-            side="right", padx=10, pady=5)
-
-        # Separator
-        ctk.CTkFrame(page, fg_color=C["border"], height=1).pack(
-            fill="x", padx=10, pady=8)
-
-        # Welcome message editor
-        ctk.CTkLabel(page, text="WELCOME MESSAGE",
-                     font=("Segoe UI", 8, "bold"),
-                     text_color=C["muted"], anchor="w").pack(fill="x", padx=12)
-        ctk.CTkLabel(page, text="Use {company} for the new member's name",
-                     font=("Segoe UI", 9), text_color=C["dim"],
-                     anchor="w").pack(fill="x", padx=12, pady=(2, 4))
-        self._welcome_text = ctk.CTkTextbox(page, height=80, font=("Segoe UI", 10),
-                                             fg_color=C["card"], text_color=C["text"],
-                                             border_color=C["border"], border_width=1)
-        self._welcome_text.pack(fill="x", padx=10, pady=(0, 8))
-        self._welcome_text.insert("1.0", WELCOME_MESSAGE)
-
-        # Buttons
-        self._start_btn = ctk.CTkButton(
-            page, text="▶  Start Bot",
-            font=("Segoe UI", 11, "bold"),
-            fg_color=C["green"], hover_color="#16a34a",
-            height=38, corner_radius=8,
-            command=self._start_bot)
-        self._start_btn.pack(fill="x", padx=10, pady=3)
-
-        self._stop_btn = ctk.CTkButton(
-            page, text="⏹  Stop Bot",
-            font=("Segoe UI", 11, "bold"),
-            fg_color=C["red"], hover_color="#b91c1c",
-            height=38, corner_radius=8,
-            state="disabled",
-            command=self._stop_bot)
-        self._stop_btn.pack(fill="x", padx=10, pady=3)
-
-        ctk.CTkButton(page, text="📢  Send !ports Now",
-                      font=("Segoe UI", 10),
-                      fg_color=C["border"], hover_color=C["card"],
-                      text_color=C["text"], height=32, corner_radius=8,
-                      command=self._send_ports_now).pack(fill="x", padx=10, pady=3)
-
-    def _build_commands(self):
-        page = ctk.CTkFrame(self._content, fg_color=C["bg"], corner_radius=0)
-        self._pages["commands"] = page
-
-        ctk.CTkLabel(page, text="Custom Commands",
-                     font=("Segoe UI", 12, "bold"),
-                     text_color=C["accent"]).pack(pady=(12, 2))
-        ctk.CTkLabel(page, text="Members type !command in chat to trigger a response",
-                     font=("Segoe UI", 9), text_color=C["dim"]).pack(pady=(0, 8))
-
-        # Add new command
-        add_frame = ctk.CTkFrame(page, fg_color=C["card"], corner_radius=8)
-        add_frame.pack(fill="x", padx=10, pady=4)
-        ctk.CTkLabel(add_frame, text="Command (with !)",
-                     font=("Segoe UI", 9), text_color=C["dim"],
-                     anchor="w").pack(fill="x", padx=10, pady=(8, 2))
-        self._sv_cmd = tk.StringVar()
-        ctk.CTkEntry(add_frame, textvariable=self._sv_cmd,
-                     placeholder_text="!example",
-                     font=("Segoe UI", 10), height=32,
-                     fg_color=C["border"], text_color=C["text"],
-                     border_color=C["border"]).pack(fill="x", padx=10, pady=(0, 4))
-        ctk.CTkLabel(add_frame, text="Response text",
-                     font=("Segoe UI", 9), text_color=C["dim"],
-                     anchor="w").pack(fill="x", padx=10, pady=(4, 2))
-        self._cmd_response = ctk.CTkTextbox(
-            add_frame, height=60, font=("Segoe UI", 10),
-            fg_color=C["border"], text_color=C["text"],
-            border_color=C["border"], border_width=1)
-        self._cmd_response.pack(fill="x", padx=10, pady=(0, 4))
-        ctk.CTkButton(add_frame, text="➕  Add Command",
-                      font=("Segoe UI", 10, "bold"),
-                      fg_color=C["accent"], hover_color="#0a9bd0",
-                      height=32, corner_radius=6,
-                      command=self._add_command).pack(fill="x", padx=10, pady=(0, 10))
-
-        # Existing commands list
-        ctk.CTkLabel(page, text="SAVED COMMANDS",
-                     font=("Segoe UI", 8, "bold"),
-                     text_color=C["muted"], anchor="w").pack(fill="x", padx=12, pady=(8, 2))
-        self._cmd_list = ctk.CTkScrollableFrame(
-            page, fg_color=C["bg"], scrollbar_button_color=C["border"])
-        self._cmd_list.pack(fill="both", expand=True, padx=6, pady=4)
-        self._refresh_cmd_list()
-
-    def _build_log(self):
-        page = ctk.CTkFrame(self._content, fg_color=C["bg"], corner_radius=0)
-        self._pages["log"] = page
-        hdr = ctk.CTkFrame(page, fg_color="transparent")
-        hdr.pack(fill="x", padx=10, pady=6)
-        ctk.CTkLabel(hdr, text="CHAT LOG", font=("Segoe UI", 8, "bold"),
-                     text_color=C["muted"]).pack(side="left")
-        ctk.CTkButton(hdr, text="Clear", font=("Segoe UI", 9), width=48, height=22,
-                      fg_color=C["red"], hover_color="#b91c1c", text_color="white",
-                      corner_radius=4,
-                      command=self._clear_log).pack(side="right")
-        self._log_scroll = ctk.CTkScrollableFrame(
-            page, fg_color=C["bg"], scrollbar_button_color=C["border"])
-        self._log_scroll.pack(fill="both", expand=True, padx=6)
-
-    def _clear_log(self):
-        for w in self._log_scroll.winfo_children():
-            w.destroy()
-
-    def _add_log_entry(self, entry: dict):
-        def _do():
-            ts   = datetime.datetime.fromtimestamp(
-                entry.get("ts", time.time())).strftime("%H:%M:%S")
-            row  = ctk.CTkFrame(self._log_scroll, fg_color=C["card"], corner_radius=6)
-            row.pack(fill="x", pady=2)
-            if entry["type"] == "join":
-                text = f"👋 {entry['company']} joined"
-                col  = C["green"]
-            else:
-                text = entry.get("text", "")
-                col  = C["text"]
-            ctk.CTkLabel(row, text=f"[{ts}] {text}",
-                         font=("Segoe UI", 9), text_color=col,
-                         anchor="w", wraplength=320).pack(
-                fill="x", padx=8, pady=4)
-        self.after(0, _do)
-
-    def _refresh_cmd_list(self):
-        for w in self._cmd_list.winfo_children():
-            w.destroy()
-        commands = load_custom_commands()
-        if not commands:
-            ctk.CTkLabel(self._cmd_list, text="No custom commands yet",
-                         font=("Segoe UI", 10), text_color=C["dim"]).pack(pady=10)
+    @staticmethod
+    def _reap(w: _Worker, timeout: float = 10):
+        w.proc.join(timeout)
+        if w.proc.is_alive():
+            w.proc.terminate()
+
+    def _relay(self):
+        while not self._stop.is_set():
+            try:
+                kind, aid, payload = self._events.get(timeout=1)
+            except queue.Empty:
+                continue
+            except (EOFError, OSError):
+                return
+            with self._lock:
+                w = self._workers.get(aid)
+                if w:
+                    w.last_seen = time.time()
+                    if kind == "heartbeat":
+                        w.ready = True
+            if kind == "log":
+                LOGS.emit(aid, payload["msg"], payload["level"])
+            elif kind == "metrics":
+                METRICS.absorb(aid, payload)
+            elif kind != "heartbeat":
+                try:
+                    self.on_event(kind, aid, payload)
+                except Exception as e:
+                    LOGS.emit("app", f"⚠ Worker event {kind} for {aid}: {e}")
+
+    def _watch(self):
+        while not self._stop.wait(1):
+            now = time.time()
+            with self._lock:
+                for aid, w in self._workers.items():
+                    if w.stopping or not w.proc:
+                        continue
+                    if w.restart_at:
+                        if now >= w.restart_at:
+                            w.restarts += 1
+                            self._spawn(w)
+                        continue
+                    alive = w.proc.is_alive()
+                    stale = WORKER_STALE if w.ready else WORKER_START_GRACE
+                    if alive and now - w.last_seen < stale:
+                        if now - w.started > WORKER_STABLE:
+                            w.backoff = WORKER_BACKOFF[0]
+                        continue
+                    if alive:
+                        LOGS.emit(aid, f"❌ Worker {w.proc.pid} unresponsive for "
+                                       f"{now - w.last_seen:.0f}s — killing it")
+                        w.proc.terminate()
+                    else:
+                        LOGS.emit(aid, f"❌ Worker {w.proc.pid} exited (code {w.proc.exitcode})"
+                                       f" — restarting in {w.backoff}s")
+                    w.restart_at = now + w.backoff
+                    w.backoff = min(w.backoff * 2, WORKER_BACKOFF[1])
+
+    def stats(self) -> list:
+        with self._lock:
+            return [{"account": aid, "pid": w.proc.pid if w.proc else None,
+                     "alive": bool(w.proc and w.proc.is_alive()),
+                     "restarts": w.restarts, "last_seen": w.last_seen}
+                    for aid, w in self._workers.items()]
+
+    def close(self):
+        with self._lock:
+            ids = list(self._workers)
+        for aid in ids:
+            self.stop(aid)
+        self._stop.set()
+
+class WorkerHandle:
+    """Stands in for an account's BrowserController + AutoManager in the dashboard."""
+
+    def __init__(self, supervisor: WorkerSupervisor, account_id: str):
+        self.supervisor = supervisor
+        self.account_id = account_id
+
+    def run_now(self):
+        self.supervisor.send(self.account_id, "run_now")
+
+    def refresh(self):
+        self.supervisor.send(self.account_id, "refresh")
+
+    def stop(self):
+        self.supervisor.stop(self.account_id)
+
+    close = stop
+
+
+# ── HEADLESS DAEMON ───────────────────────────────────────────────────────────
+STATUS_INTERVAL = 5   # seconds between status file writes
+
+class HeadlessDaemon:
+    """Runs saved accounts' auto-managers (and optionally the chatbot) without Tk.
+
+    State is written as JSON to `status_file` every STATUS_INTERVAL seconds.
+    `only` restricts the daemon to some account names/ids so several daemons
+    can split the accounts on one host.
+    """
+
+    def __init__(self, status_file: Path, only=None, chatbot: str = None,
+                 alliance_id: int = None, headless_browser: bool = True,
+                 browsers: int = None, workers: bool = False):
+        self.status_file = Path(status_file)
+        self.only        = set(only or ())
+        self.chatbot_acc = chatbot
+        self.alliance_id = alliance_id
+        self.pool        = BrowserPool(lambda m: LOGS.emit("browser", m),
+                                      size=browsers, headless=headless_browser)
+        self.accounts    = {}      # account id -> state dict for the status file
+        self.managers    = {}
+        self.controllers = {}
+        self.bot         = None
+        self.workers     = (WorkerSupervisor(self._on_worker_event, headless_browser)
+                            if workers else None)
+        self.started     = time.time()
+        self._stop       = threading.Event()
+        self._lock       = threading.Lock()
+
+    def _update(self, aid: str, **fields):
+        with self._lock:
+            self.accounts[aid].update(fields)
+
+    def _on_depart(self, aid: str, entry: dict):
+        with self._lock:
+            st = self.accounts[aid]
+            st["departs"] += 1
+            st["income"]  += entry.get("income", 0)
+
+    def _on_worker_event(self, kind: str, aid: str, payload):
+        if kind == "depart":
+            self._on_depart(aid, payload)
+        elif kind in ("bunker", "prices"):
+            self._update(aid, **{kind: payload})
+
+    def _on_log(self, rec):
+        if rec["source"] in self.accounts:
+            self._update(rec["source"], last_log=rec["msg"], last_log_ts=rec["ts"])
+
+    def _selected(self) -> list:
+        accounts = AccountManager.load_accounts()
+        if self.only:
+            accounts = [a for a in accounts if a["id"] in self.only or a["name"] in self.only]
+        return accounts
+
+    def _launch(self, account: dict):
+        aid = account["id"]
+        log = lambda m: LOGS.emit(aid, m)
+        email, password = AccountManager.load_credentials(aid)
+        if not email or not password:
+            log("⚠ No saved login — skipped (log in once from the desktop app)")
+            self._update(aid, state="no login")
             return
-        for cmd, response in commands.items():
-            row = ctk.CTkFrame(self._cmd_list, fg_color=C["card"], corner_radius=6)
-            row.pack(fill="x", pady=2)
-            ctk.CTkLabel(row, text=cmd, font=("Consolas", 10, "bold"),
-                         text_color=C["accent"]).pack(side="left", padx=10, pady=6)
-            preview = response[:40] + "…" if len(response) > 40 else response
-            ctk.CTkLabel(row, text=preview, font=("Segoe UI", 9),
-                         text_color=C["dim"]).pack(side="left", padx=4)
-            ctk.CTkButton(row, text="✕", width=28, height=24,
-                          font=("Segoe UI", 9),
-                          fg_color=C["red"], hover_color="#b91c1c",
-                          text_color="white", corner_radius=4,
-                          command=lambda c=cmd: self._delete_command(c)
-                          ).pack(side="right", padx=6, pady=4)
-
-    def _add_command(self):
-        cmd      = self._sv_cmd.get().strip()
-        response = self._cmd_response.get("1.0", "end").strip()
-        if not cmd or not response:
-            self._status_var.set("⚠ Enter both command and response")
+        if self.workers:
+            self.workers.start(account, email, password)
+            with self._lock:
+                self.managers[aid] = WorkerHandle(self.workers, aid)
+            self._update(aid, state="worker")
             return
-        if not cmd.startswith("!"):
-            cmd = "!" + cmd
-        commands = load_custom_commands()
-        commands[cmd.lower()] = response
-        save_custom_commands(commands)
-        self._sv_cmd.set("")
-        self._cmd_response.delete("1.0", "end")
-        self._refresh_cmd_list()
-        self._status_var.set(f"✅ Command {cmd} saved")
-
-    def _delete_command(self, cmd: str):
-        commands = load_custom_commands()
-        commands.pop(cmd, None)
-        save_custom_commands(commands)
-        self._refresh_cmd_list()
-        self._status_var.set(f"🗑 Command {cmd} removed")
-
-    def _start_bot(self):
-        try:
-            alliance_id = int(self._sv_aid.get().strip())
-        except ValueError:
-            self._status_var.set("⚠ Invalid Alliance ID")
+        browser = BrowserController(log, aid, self.pool)
+        manager = AutoManager(
+            browser    = browser,
+            account_id = aid,
+            log_fn     = log,
+            on_bunker  = lambda d: self._update(aid, bunker=d),
+            on_prices  = lambda d: self._update(aid, prices=d),
+            on_depart  = lambda d: self._on_depart(aid, d),
+        )
+        browser.start()
+        if not browser.ready:
+            self._update(aid, state="no browser")
             return
+        with self._lock:
+            self.controllers[aid] = browser
+            self.managers[aid]    = manager
+        log("🔐 Attempting auto-login…")
+        if browser.auto_login(email, password):
+            log("✅ Auto-login successful")
+            self._update(aid, state="running")
+        else:
+            log("⚠ Auto-login failed — retrying login check in the manager")
+            self._update(aid, state="login failed")
+        manager.start()
+
+    def _start_chatbot(self):
+        browser = next((self.controllers[a["id"]] for a in self._selected()
+                        if self.chatbot_acc in (a["id"], a["name"])
+                        and a["id"] in self.controllers), None)
+        if not browser:
+            LOGS.emit("chatbot", f"⚠ Chatbot account '{self.chatbot_acc}' is not running")
+            return
+        self.bot = AllianceChatBot(
+            browser         = browser,
+            alliance_id     = self.alliance_id,
+            bot_user_id     = browser.user_id(),
+            log_fn          = lambda m: LOGS.emit("chatbot", m),
+            on_chat_message = lambda e: None,
+        )
+        self.bot.start()
 
-        # Get bot user ID from browser
-        def _do():
-            uid = self.browser.run_js("""
-                try {
-                    var app = document.querySelector('#app');
-                    var pinia = app.__vue_app__._context.provides.pinia
-                             || app.__vue_app__.config.globalProperties.$pinia;
-                    var us = pinia._s.get('user');
-                    return us && us.user ? us.user.id : null;
-                } catch(e) { return null; }
-            """)
-            self._bot_user_id = uid
-            self._alliance_id = alliance_id
-            self.bot = AllianceChatBot(
-                browser      = self.browser,
-                alliance_id  = alliance_id,
-                bot_user_id  = uid,
-                log_fn       = lambda m: self.after(0, lambda: self._status_var.set(m)),
-                on_chat_message = self._add_log_entry,
-            )
-            # Override welcome message with current text box value
-            global WELCOME_MESSAGE
-            WELCOME_MESSAGE = self._welcome_text.get("1.0", "end").strip()
-            self.bot.start()
-            self.after(0, lambda: [
-                self._start_btn.configure(state="disabled"),
-                self._stop_btn.configure(state="normal"),
-                self._status_var.set(f"✅ Bot running — watching alliance {alliance_id}"),
-                self._status_lbl.configure(text_color=C["green"]),
-            ])
-        threading.Thread(target=_do, daemon=True).start()
-
-    def _stop_bot(self):
+    def write_status(self, state: str = "running"):
+        with self._lock:
+            accounts = {aid: dict(st) for aid, st in self.accounts.items()}
+        status = {
+            "pid":      os.getpid(),
+            "state":    state,
+            "started":  self.started,
+            "updated":  time.time(),
+            "browsers": self.pool.stats(),
+            "workers":  self.workers.stats() if self.workers else None,
+            "tasks":    ORCH.stats(),
+            "chatbot":  bool(self.bot and self.bot._running),
+            "accounts": accounts,
+        }
+        try:
+            atomic_write(self.status_file, json.dumps(status, indent=2))
+        except OSError as e:
+            LOGS.emit("app", f"⚠ Could not write status file: {e}")
+
+    def stop(self):
+        self._stop.set()
+
+    def run(self) -> int:
+        accounts = self._selected()
+        if not accounts:
+            LOGS.emit("app", "❌ No accounts to run — add one from the desktop app first")
+            return 1
+        for a in accounts:
+            self.accounts[a["id"]] = {"name": a["name"], "state": "starting",
+                                      "bunker": None, "prices": None,
+                                      "departs": 0, "income": 0,
+                                      "last_log": None, "last_log_ts": None}
+            LOGS.name(a["id"], a["name"])
+        LOGS.subscribe(self._on_log)
+        self.write_status("starting")
+        # Accounts launch in parallel (up to the login lane's limit); the pool
+        # starts browsers as they are needed
+        concurrent.futures.wait([ORCH.submit(self._launch, a, lane="login")
+                                 for a in accounts])
+        if not self.managers:
+            self.write_status("failed")
+            return 1
+        if self.chatbot_acc and self.alliance_id:
+            self._start_chatbot()
+        LOGS.emit("app", f"✅ Headless daemon running {len(self.managers)} account(s)"
+                         f" — status in {self.status_file}")
+        while not self._stop.wait(STATUS_INTERVAL):
+            self.write_status()
+        LOGS.emit("app", "⏹ Shutting down")
         if self.bot:
             self.bot.stop()
-            self.bot = None
-        self._start_btn.configure(state="normal")
-        self._stop_btn.configure(state="disabled")
-        self._status_var.set("Bot offline")
-        self._status_lbl.configure(text_color=C["dim"])
-
-    def _send_ports_now(self):
-        if not self.bot:
-            self._status_var.set("⚠ Start the bot first")
-            return
-        threading.Thread(target=self.bot._cmd_ports, daemon=True).start()
+        for m in self.managers.values():
+            m.stop()
+        self.pool.close()
+        if self.workers:
+            self.workers.close()
+        ORCH.close()
+        self.write_status("stopped")
+        return 0
 
 
 # ── ENTRY POINT ───────────────────────────────────────────────────────────────
-def main():
-    dash = PirateBrowserDashboard()
-    dash.run()
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Pirate Browser")
+    ap.add_argument("--headless", action="store_true",
+                    help="run the saved accounts without the GUI")
+    ap.add_argument("--status-file", type=Path, default=DATA_DIR / "daemon_status.json",
+                    help="where --headless writes its JSON status")
+    ap.add_argument("--account", action="append", default=[],
+                    help="only run this account (name or id); repeatable")
+    ap.add_argument("--chatbot", metavar="ACCOUNT",
+                    help="also run the alliance chatbot from this account")
+    ap.add_argument("--alliance-id", type=int, help="alliance for --chatbot")
+    ap.add_argument("--show-browser", action="store_true",
+                    help="keep the browser window visible in --headless mode")
+    ap.add_argument("--workers", action="store_true",
+                    default=os.environ.get("PIRATE_WORKERS") == "1",
+                    help="run each account in its own process (restarted if it crashes)")
+    ap.add_argument("--browsers", type=int,
+                    help="browser instances to spread accounts over "
+                         "(default: PIRATE_BROWSERS or one per two CPUs)")
+    ap.add_argument("--metrics-port", type=int,
+                    default=int(os.environ.get("PIRATE_METRICS_PORT") or 0),
+                    help="serve Prometheus metrics on 127.0.0.1:PORT (default: off)")
+    ap.add_argument("--trace", action="store_true",
+                    default=os.environ.get("PIRATE_TRACE") == "1",
+                    help="record each account's game traffic to traces/ for replay.py")
+    ap.add_argument("--metrics-file", type=Path, default=METRICS_FILE,
+                    help="where metrics are dumped as JSON every minute")
+    args = ap.parse_args(argv)
+    METRICS.start(args.metrics_port, args.metrics_file)
+    if args.trace:
+        os.environ["PIRATE_TRACE"] = "1"   # read by each BrowserController, also in workers
+
+    if not args.headless:
+        import pirate_gui   # Tk/customtkinter only load here
+        pirate_gui.main(workers=args.workers)
+        METRICS.close()
+        return 0
+
+    daemon = HeadlessDaemon(args.status_file, args.account, args.chatbot,
+                            args.alliance_id, headless_browser=not args.show_browser,
+                            browsers=args.browsers, workers=args.workers)
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        signal.signal(sig, lambda *_: daemon.stop())
+    code = daemon.run()
+    METRICS.close()
+    LOGS.close()
+    return code
 
 if __name__ == "__main__":
-    main()
+    # pirate_gui imports this module by name; make that resolve to this copy
+    sys.modules.setdefault("pirate_browser", sys.modules[__name__])
+    sys.exit(main())
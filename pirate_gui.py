@@ -0,0 +1,1271 @@
+"""
+Pirate Browser — desktop dashboard (CustomTkinter).
+
+Imported only when the GUI is started, so headless runs never load Tk.
+"""
+
+import threading
+import time
+import datetime
+import collections
+import operator
+import re
+import webbrowser
+import tkinter as tk
+import customtkinter as ctk
+
+from pirate_browser import (
+    CURRENT_VERSION, RELEASES_PAGE, WELCOME_MESSAGE, LOGS, ORCH,
+    AccountManager, BrowserPool, BrowserController, AutoManager, DepartureLog,
+    WorkerSupervisor, WorkerHandle,
+    AllianceChatBot, check_for_updates, version_tuple,
+    load_custom_commands, save_custom_commands,
+)
+
+# ── UPDATE DIALOG ─────────────────────────────────────────────────────────────
+def show_update_dialog(latest_version):
+    popup = ctk.CTkToplevel()
+    popup.title("Update Available")
+    popup.geometry("380x200")
+    popup.resizable(False, False)
+    popup.configure(fg_color="#0a0f1e")
+    popup.grab_set()
+    popup.lift()
+    ctk.CTkLabel(popup, text="🏴‍☠️  Update Available!",
+                 font=("Segoe UI", 14, "bold"),
+                 text_color="#0db8f4").pack(pady=(24, 6))
+    ctk.CTkLabel(popup,
+                 text=f"Version {latest_version} is available.\nYou are running {CURRENT_VERSION}.",
+                 font=("Segoe UI", 11), text_color="#64748b",
+                 justify="center").pack(pady=4)
+    btn_frame = ctk.CTkFrame(popup, fg_color="transparent")
+    btn_frame.pack(pady=16)
+    ctk.CTkButton(btn_frame, text="⬇  Download Update",
+                  font=("Segoe UI", 11, "bold"),
+                  fg_color="#0db8f4", hover_color="#0a9bd0",
+                  width=160, height=36,
+                  command=lambda: [webbrowser.open(RELEASES_PAGE), popup.destroy()]
+                  ).pack(side="left", padx=6)
+    ctk.CTkButton(btn_frame, text="Later",
+                  font=("Segoe UI", 11),
+                  fg_color="#1e2d4a", hover_color="#334155",
+                  text_color="#e2e8f0", width=80, height=36,
+                  command=popup.destroy).pack(side="left", padx=6)
+
+# ── COLOURS ───────────────────────────────────────────────────────────────────
+C = {
+    "bg":    "#0a0f1e", "panel":  "#0d1530", "card":   "#111827",
+    "border":"#1e2d4a", "accent": "#0db8f4", "green":  "#22c55e",
+    "red":   "#ef4444", "yellow": "#f59e0b", "text":   "#e2e8f0",
+    "dim":   "#64748b", "muted":  "#334155",
+}
+
+ctk.set_appearance_mode("dark")
+ctk.set_default_color_theme("blue")
+
+# ── LOGIN SCREEN ──────────────────────────────────────────────────────────────
+def show_login_dialog(parent, account_name: str, on_login):
+    """Shows a modal login dialog on top of the main window."""
+    popup = ctk.CTkToplevel(parent)
+    popup.title(f"Pirate Browser — {account_name}")
+    popup.geometry("380x460")
+    popup.resizable(False, False)
+    popup.configure(fg_color="#0a0f1e")
+    popup.grab_set()
+    popup.lift()
+    popup.focus_force()
+
+    submitted = [False]
+
+    ctk.CTkLabel(popup, text="🏴‍☠️",
+                 font=("Segoe UI", 48)).pack(pady=(28, 4))
+    ctk.CTkLabel(popup, text="PIRATE BROWSER",
+                 font=("Segoe UI", 16, "bold"),
+                 text_color="#0db8f4").pack()
+    ctk.CTkLabel(popup, text=account_name,
+                 font=("Segoe UI", 11),
+                 text_color="#334155").pack(pady=(2, 16))
+
+    form = ctk.CTkFrame(popup, fg_color="#0d1530", corner_radius=12)
+    form.pack(fill="x", padx=30)
+
+    ctk.CTkLabel(form, text="Email", font=("Segoe UI", 10),
+                 text_color="#64748b", anchor="w").pack(fill="x", padx=16, pady=(16, 2))
+    email_entry = ctk.CTkEntry(form, placeholder_text="your@email.com",
+                               font=("Segoe UI", 11), height=38,
+                               fg_color="#111827", text_color="#e2e8f0",
+                               border_color="#1e2d4a")
+    email_entry.pack(fill="x", padx=16, pady=(0, 10))
+
+    ctk.CTkLabel(form, text="Password", font=("Segoe UI", 10),
+                 text_color="#64748b", anchor="w").pack(fill="x", padx=16, pady=(0, 2))
+    pass_entry = ctk.CTkEntry(form, placeholder_text="••••••••",
+                              show="•", font=("Segoe UI", 11), height=38,
+                              fg_color="#111827", text_color="#e2e8f0",
+                              border_color="#1e2d4a")
+    pass_entry.pack(fill="x", padx=16, pady=(0, 10))
+
+    remember_var = tk.BooleanVar(value=True)
+    ctk.CTkCheckBox(form, text="Remember me", variable=remember_var,
+                    font=("Segoe UI", 10), text_color="#64748b",
+                    fg_color="#0db8f4", checkmark_color="white").pack(
+        anchor="w", padx=16, pady=(0, 16))
+
+    error_var = tk.StringVar(value="")
+    ctk.CTkLabel(popup, textvariable=error_var,
+                 font=("Segoe UI", 10), text_color="#ef4444").pack(pady=(6, 0))
+
+    def _submit():
+        email    = email_entry.get().strip()
+        password = pass_entry.get().strip()
+        if not email or not password:
+            error_var.set("Please enter your email and password")
+            return
+        if "@" not in email:
+            error_var.set("Please enter a valid email address")
+            return
+        submitted[0] = True
+        on_login(email, password, remember_var.get())
+        popup.destroy()
+
+    ctk.CTkButton(popup, text="Login & Launch  🚀",
+                  font=("Segoe UI", 12, "bold"),
+                  fg_color="#0db8f4", hover_color="#0a9bd0",
+                  height=42, corner_radius=8,
+                  command=_submit).pack(fill="x", padx=30, pady=10)
+
+    popup.bind("<Return>", lambda e: _submit())
+    parent.wait_window(popup)
+    return submitted[0]
+
+
+# ── HELPERS ───────────────────────────────────────────────────────────────────
+def fmt_cash(n):
+    try:
+        v = int(n)
+        if v >= 1_000_000: return f"${v/1_000_000:.1f}M"
+        if v >= 1_000:     return f"${v/1_000:.0f}K"
+        return f"${v}"
+    except: return "—"
+
+def fmt_ts(ts_ms):
+    try: return datetime.datetime.fromtimestamp(ts_ms/1000).strftime("%H:%M:%S")
+    except: return "—"
+
+
+# ── UI UPDATE BUS ─────────────────────────────────────────────────────────────
+UI_REFRESH_HZ = 8   # how often queued account updates are drawn
+
+class UiBus:
+    """Coalesces worker-thread updates into one Tk timer.
+
+    Workers post the latest value per (account, field); the timer applies
+    them in one batch, newest value only. Accounts whose tab is hidden keep
+    their pending values until the tab is shown.
+    """
+
+    def __init__(self, root, hz: float = UI_REFRESH_HZ):
+        self.root     = root
+        self._ms      = max(1, int(1000 / hz))
+        self._lock    = threading.Lock()
+        self._pending = collections.defaultdict(dict)   # account id -> {field: value}
+        self._targets = {}                              # account id -> apply(field, value)
+        self._active  = None
+        self.applied  = 0    # updates drawn
+        self.dropped  = 0    # updates overwritten before they were drawn
+
+    def post(self, account_id: str, field: str, value, merge=None):
+        """Queue a value; merge(old, new) combines instead of replacing (e.g. counts)."""
+        with self._lock:
+            fields = self._pending[account_id]
+            if field in fields:
+                if merge:
+                    value = merge(fields[field], value)
+                else:
+                    self.dropped += 1
+            fields[field] = value
+
+    def register(self, account_id: str, apply_fn):
+        self._targets[account_id] = apply_fn
+
+    def unregister(self, account_id: str):
+        self._targets.pop(account_id, None)
+        with self._lock:
+            self._pending.pop(account_id, None)
+
+    def set_active(self, account_id):
+        """Only the shown account is drawn; switching flushes its backlog at once."""
+        self._active = account_id
+        self._flush()
+
+    def start(self):
+        self.root.after(self._ms, self._tick)
+
+    def _tick(self):
+        self._flush()
+        self.root.after(self._ms, self._tick)
+
+    def _flush(self):
+        aid = self._active
+        apply_fn = self._targets.get(aid)
+        if not apply_fn:
+            return
+        with self._lock:
+            fields = self._pending.pop(aid, None)
+        for field, value in (fields or {}).items():
+            try:
+                apply_fn(field, value)
+                self.applied += 1
+            except Exception as e:
+                LOGS.emit("app", f"⚠ UI update {aid}/{field}: {e}")
+
+# ── DEPARTURE LOG VIEW ────────────────────────────────────────────────────────
+class DepartureLogView(ctk.CTkFrame):
+    """Shows a window of a DepartureLog through a fixed pool of row widgets.
+
+    Only the rows that fit are ever built; scrolling re-labels them instead
+    of creating widgets per departure.
+    """
+    ROW_H = 46
+
+    def __init__(self, parent, dlog: DepartureLog, **kw):
+        super().__init__(parent, fg_color=C["bg"], corner_radius=0, **kw)
+        self.dlog  = dlog
+        self._top  = 0       # index of the entry shown in the first row
+        self._rows = []      # pooled (frame, title, income, detail) widgets
+        self._visible = 0
+        self._bar = ctk.CTkScrollbar(self, command=self._on_scrollbar,
+                                     button_color=C["border"])
+        self._bar.pack(side="right", fill="y")
+        self._body = ctk.CTkFrame(self, fg_color=C["bg"], corner_radius=0)
+        self._body.pack(side="left", fill="both", expand=True)
+        self._body.pack_propagate(False)   # rows must not resize the viewport
+        self._body.bind("<Configure>", self._on_resize)
+        for w in (self, self._body):
+            w.bind("<MouseWheel>", self._on_wheel)
+            w.bind("<Button-4>", lambda e: self.scroll(-3))
+            w.bind("<Button-5>", lambda e: self.scroll(3))
+
+    def _make_row(self):
+        row = ctk.CTkFrame(self._body, fg_color=C["card"], corner_radius=6, height=self.ROW_H - 4)
+        top = ctk.CTkFrame(row, fg_color="transparent")
+        top.pack(fill="x", padx=8, pady=(5, 0))
+        title = ctk.CTkLabel(top, text="", font=("Segoe UI", 10), text_color=C["text"])
+        title.pack(side="left")
+        income = ctk.CTkLabel(top, text="", font=("Consolas", 10, "bold"), text_color=C["green"])
+        income.pack(side="right")
+        detail = ctk.CTkLabel(row, text="", font=("Segoe UI", 9), text_color=C["muted"])
+        detail.pack(anchor="w", padx=8, pady=(0, 5))
+        for w in (row, top, title, income, detail):
+            w.bind("<MouseWheel>", self._on_wheel)
+            w.bind("<Button-4>", lambda e: self.scroll(-3))
+            w.bind("<Button-5>", lambda e: self.scroll(3))
+        return row, title, income, detail
+
+    def _on_resize(self, event):
+        fit = max(1, event.height // self.ROW_H)
+        while len(self._rows) < fit:
+            self._rows.append(self._make_row())
+        if fit != self._visible:
+            self._visible = fit
+            self.refresh()
+
+    def _on_wheel(self, event):
+        self.scroll(-1 if event.delta > 0 else 1)
+
+    def _on_scrollbar(self, *args):
+        total = len(self.dlog)
+        if args[0] == "moveto":
+            self._top = int(float(args[1]) * total)
+        elif args[0] == "scroll":
+            step = self._visible if args[2] == "pages" else 1
+            self._top += int(args[1]) * step
+        self.refresh()
+
+    def scroll(self, rows: int):
+        self._top += rows
+        self.refresh()
+
+    def added(self, count: int = 1):
+        """New entries arrived: stay on the newest, or keep the current view steady."""
+        if self._top:
+            self._top += count
+        self.refresh()
+
+    def refresh(self):
+        total = len(self.dlog)
+        self._top = max(0, min(self._top, total - self._visible))
+        shown = self.dlog.entries(self._top, self._visible)
+        for i, (row, title, income, detail) in enumerate(self._rows):
+            if i >= len(shown):
+                row.pack_forget()
+                continue
+            e = shown[i]
+            util_str = f"  util {e.get('util','')}%" if e.get('util') else ""
+            title.configure(text=f"{fmt_ts(e.get('timestamp',0))}  {e.get('vessel','?')}")
+            income.configure(text=f"+${e.get('income',0):,}")
+            detail.configure(text=f"⛽ {e.get('fuelUsed',0):.0f}t  🌿 {e.get('co2Used',0):.0f}t{util_str}")
+            row.pack(fill="x", pady=2)
+        if total:
+            self._bar.set(self._top / total, min(1.0, (self._top + len(shown)) / total))
+        else:
+            self._bar.set(0.0, 1.0)
+
+# ── ACCOUNT TAB ───────────────────────────────────────────────────────────────
+ACTIVITY_LINES = 50   # log lines shown on the Status page
+
+class AccountTab(ctk.CTkFrame):
+    """A full dashboard panel for one account."""
+
+    def __init__(self, parent, account: dict, browser: BrowserController,
+                 manager: AutoManager, bus: UiBus, **kw):
+        super().__init__(parent, fg_color=C["bg"], corner_radius=0, **kw)
+        self.account    = account
+        self.browser    = browser
+        self.manager    = manager
+        self.bus        = bus
+        self.account_id = account["id"]
+        self._session_income  = 0
+        self._session_departs = 0
+        self._session_lock    = threading.Lock()
+        self._status_var = tk.StringVar(value="Starting…")
+        self.dlog = DepartureLog(self.account_id,
+                                 AccountManager.get_settings(self.account_id)["log_buffer"])
+        AccountManager.subscribe(self.account_id, self._on_settings)
+        self._build()
+        bus.register(self.account_id, self.apply)
+        LOGS.name(self.account_id, account["name"])
+        LOGS.subscribe(self._on_log)
+
+    def _on_settings(self, s):
+        self.dlog.resize(s["log_buffer"])
+
+    def destroy(self):
+        LOGS.unsubscribe(self._on_log)
+        self.bus.unregister(self.account_id)
+        AccountManager.unsubscribe(self.account_id, self._on_settings)
+        self.dlog.close()
+        super().destroy()
+
+    def _build(self):
+        # Sub-tab bar
+        tab_bar = ctk.CTkFrame(self, fg_color=C["panel"], height=32, corner_radius=0)
+        tab_bar.pack(fill="x")
+        tab_bar.pack_propagate(False)
+        self._pages    = {}
+        self._tab_btns = {}
+        for tid, label in [("status","📊 Status"),("logs","📋 Logs"),("settings","⚙ Settings")]:
+            b = ctk.CTkButton(tab_bar, text=label, font=("Segoe UI", 10),
+                              width=90, height=28, corner_radius=0,
+                              fg_color="transparent", hover_color=C["border"],
+                              text_color=C["dim"],
+                              command=lambda t=tid: self._show(t))
+            b.pack(side="left", padx=1)
+            self._tab_btns[tid] = b
+
+        self._content = ctk.CTkFrame(self, fg_color=C["bg"], corner_radius=0)
+        self._content.pack(fill="both", expand=True)
+
+        self._build_status()
+        self._build_logs()
+        self._build_settings()
+        self._show("status")
+
+        ctk.CTkLabel(self, textvariable=self._status_var,
+                     font=("Consolas", 9), text_color=C["dim"],
+                     anchor="w").pack(fill="x", padx=8, pady=2)
+
+    def _show(self, tab_id):
+        for tid, page in self._pages.items():
+            if tid == tab_id:
+                page.pack(fill="both", expand=True)
+                self._tab_btns[tid].configure(text_color=C["accent"], fg_color=C["border"])
+            else:
+                page.pack_forget()
+                self._tab_btns[tid].configure(text_color=C["dim"], fg_color="transparent")
+
+    def _sec(self, parent, title):
+        f = ctk.CTkFrame(parent, fg_color="transparent")
+        f.pack(fill="x", padx=10, pady=(10, 2))
+        ctk.CTkLabel(f, text=title.upper(), font=("Segoe UI", 8, "bold"),
+                     text_color=C["muted"]).pack(side="left")
+        ctk.CTkFrame(f, height=1, fg_color=C["border"]).pack(
+            side="left", fill="x", expand=True, padx=(6, 0))
+
+    def _build_status(self):
+        page = ctk.CTkScrollableFrame(self._content, fg_color=C["bg"],
+                                       scrollbar_button_color=C["border"])
+        self._pages["status"] = page
+
+        def stat(label, var):
+            f = ctk.CTkFrame(page, fg_color=C["card"], corner_radius=8)
+            f.pack(fill="x", padx=10, pady=2)
+            ctk.CTkLabel(f, text=label, font=("Segoe UI", 10),
+                         text_color=C["dim"]).pack(side="left", padx=10, pady=8)
+            lbl = ctk.CTkLabel(f, textvariable=var, font=("Consolas", 11, "bold"),
+                               text_color=C["accent"])
+            lbl.pack(side="right", padx=10)
+            return lbl
+
+        self._sec(page, "Bunker")
+        self._v_fuel = tk.StringVar(value="—")
+        self._v_co2  = tk.StringVar(value="—")
+        self._v_cash = tk.StringVar(value="—")
+        stat("⛽  Fuel",  self._v_fuel)
+        stat("🌿  CO2",   self._v_co2)
+        stat("💰  Cash",  self._v_cash)
+
+        self._sec(page, "Market Prices")
+        self._v_fp = tk.StringVar(value="—")
+        self._v_cp = tk.StringVar(value="—")
+        self._lbl_fp = stat("⛽  Fuel Price", self._v_fp)
+        self._lbl_cp = stat("🌿  CO2 Price",  self._v_cp)
+
+        self._sec(page, "Session")
+        self._v_session = tk.StringVar(value="No departures yet")
+        ctk.CTkLabel(page, textvariable=self._v_session,
+                     font=("Segoe UI", 10), text_color=C["dim"],
+                     anchor="w", wraplength=340).pack(fill="x", padx=12, pady=4)
+
+        self._sec(page, "Activity")
+        self._v_grep = tk.StringVar()
+        grep = ctk.CTkEntry(page, textvariable=self._v_grep, height=26,
+                            placeholder_text="Filter recent log (regex), Enter to apply",
+                            font=("Consolas", 9), fg_color=C["card"],
+                            text_color=C["text"], border_color=C["border"])
+        grep.pack(fill="x", padx=10, pady=(2, 0))
+        grep.bind("<Return>", lambda e: self._show_activity())
+        self._activity = ctk.CTkTextbox(page, height=150, font=("Consolas", 9),
+                                        fg_color=C["card"], text_color=C["dim"],
+                                        wrap="word", state="disabled")
+        self._activity.pack(fill="x", padx=10, pady=4)
+
+        self._sec(page, "Actions")
+        ctk.CTkButton(page, text="▶  Run Check Now",
+                      font=("Segoe UI", 11, "bold"),
+                      fg_color=C["accent"], hover_color="#0a9bd0",
+                      height=38, corner_radius=8,
+                      command=self.manager.run_now).pack(fill="x", padx=10, pady=3)
+        ctk.CTkButton(page, text="🔄  Refresh Status",
+                      font=("Segoe UI", 10),
+                      fg_color=C["border"], hover_color=C["card"],
+                      text_color=C["text"], height=32, corner_radius=8,
+                      command=self._refresh).pack(fill="x", padx=10, pady=3)
+
+    def _refresh(self):
+        self.manager.refresh()
+
+    def _build_logs(self):
+        page = ctk.CTkFrame(self._content, fg_color=C["bg"], corner_radius=0)
+        self._pages["logs"] = page
+        hdr = ctk.CTkFrame(page, fg_color="transparent")
+        hdr.pack(fill="x", padx=10, pady=6)
+        ctk.CTkLabel(hdr, text="DEPARTURE LOG", font=("Segoe UI", 8, "bold"),
+                     text_color=C["muted"]).pack(side="left")
+        ctk.CTkButton(hdr, text="Clear", font=("Segoe UI", 9), width=48, height=22,
+                      fg_color=C["red"], hover_color="#b91c1c", text_color="white",
+                      corner_radius=4, command=self._clear_logs).pack(side="right")
+        self._log_view = DepartureLogView(page, self.dlog)
+        self._log_view.pack(fill="both", expand=True, padx=6)
+
+    def _clear_logs(self):
+        self.dlog.clear()
+        self._log_view.refresh()
+        with self._session_lock:
+            self._session_income = 0; self._session_departs = 0
+        self._v_session.set("No departures yet")
+
+    def _build_settings(self):
+        page = ctk.CTkScrollableFrame(self._content, fg_color=C["bg"],
+                                       scrollbar_button_color=C["border"])
+        self._pages["settings"] = page
+        s = AccountManager.get_settings(self.account_id)
+
+        def field(lbl, var, width=90):
+            f = ctk.CTkFrame(page, fg_color=C["card"], corner_radius=8)
+            f.pack(fill="x", padx=10, pady=2)
+            ctk.CTkLabel(f, text=lbl, font=("Segoe UI", 10),
+                         text_color=C["text"]).pack(side="left", padx=10, pady=7)
+            ctk.CTkEntry(f, textvariable=var, width=width, font=("Consolas", 10),
+                         fg_color=C["border"], text_color=C["text"],
+                         border_color=C["border"]).pack(side="right", padx=10, pady=5)
+
+        def toggle(lbl, var):
+            f = ctk.CTkFrame(page, fg_color=C["card"], corner_radius=8)
+            f.pack(fill="x", padx=10, pady=2)
+            ctk.CTkLabel(f, text=lbl, font=("Segoe UI", 10),
+                         text_color=C["text"]).pack(side="left", padx=10, pady=7)
+            ctk.CTkSwitch(f, variable=var, text="", width=40,
+                          fg_color=C["border"], progress_color=C["green"],
+                          button_color=C["text"]).pack(side="right", padx=10)
+
+        def dropdown(lbl, var, values):
+            f = ctk.CTkFrame(page, fg_color=C["card"], corner_radius=8)
+            f.pack(fill="x", padx=10, pady=2)
+            ctk.CTkLabel(f, text=lbl, font=("Segoe UI", 10),
+                         text_color=C["text"]).pack(side="left", padx=10, pady=7)
+            ctk.CTkOptionMenu(f, variable=var, values=values, font=("Segoe UI", 10),
+                              width=110, fg_color=C["border"], button_color=C["accent"],
+                              text_color=C["text"]).pack(side="right", padx=10, pady=5)
+
+        self._sec(page, "⛽ Fuel")
+        self._sv_fm = tk.StringVar(value=s["fuel_mode"])
+        self._sv_ft = tk.StringVar(value=str(s["fuel_threshold"]))
+        self._sv_fc = tk.StringVar(value=str(s["fuel_min_cash"]))
+        dropdown("Mode",                  self._sv_fm, ["off","basic","intelligent"])
+        field   ("Price Threshold ($/t)", self._sv_ft)
+        field   ("Min Cash Reserve ($)",  self._sv_fc, 110)
+
+        self._sec(page, "🌿 CO2")
+        self._sv_cm = tk.StringVar(value=s["co2_mode"])
+        self._sv_ct = tk.StringVar(value=str(s["co2_threshold"]))
+        self._sv_cc = tk.StringVar(value=str(s["co2_min_cash"]))
+        dropdown("Mode",                  self._sv_cm, ["off","basic"])
+        field   ("Price Threshold ($/t)", self._sv_ct)
+        field   ("Min Cash Reserve ($)",  self._sv_cc, 110)
+
+        self._sec(page, "🚢 Auto-Depart")
+        self._sv_ad  = tk.BooleanVar(value=s["auto_depart"])
+        self._sv_ci  = tk.StringVar(value=str(s["check_interval"]))
+        self._sv_mu  = tk.StringVar(value=str(s.get("min_utilization", 50)))
+        self._sv_lua = tk.StringVar(value=s.get("low_util_action", "skip"))
+        toggle  ("Enable Auto-Depart",    self._sv_ad)
+        field   ("Check Interval (secs)", self._sv_ci)
+        field   ("Min Utilization (%)",   self._sv_mu, 70)
+        dropdown("Low Util Action",       self._sv_lua, ["skip","moor"])
+        self._sv_dc  = tk.StringVar(value=str(s.get("depart_concurrency", 4)))
+        self._sv_dr  = tk.StringVar(value=str(s.get("depart_rate", 5)))
+        field   ("Parallel Departures",   self._sv_dc, 70)
+        field   ("Departures / sec",      self._sv_dr, 70)
+        self._sv_lb  = tk.StringVar(value=str(s.get("log_buffer", 500)))
+        field   ("Log Entries in Memory", self._sv_lb, 70)
+
+        self._sec(page, "🔌 Connection")
+        self._sv_api = tk.BooleanVar(value=s.get("api_direct", False))
+        toggle  ("Direct API (bypass browser)", self._sv_api)
+
+        self._sec(page, "🔐 Account")
+        ctk.CTkButton(page, text="🗑  Forget Saved Login",
+                      font=("Segoe UI", 10),
+                      fg_color=C["red"], hover_color="#b91c1c",
+                      text_color="white", height=34, corner_radius=8,
+                      command=self._forget_login).pack(fill="x", padx=10, pady=4)
+
+        ctk.CTkButton(page, text="💾  Save Settings",
+                      font=("Segoe UI", 11, "bold"),
+                      fg_color=C["green"], hover_color="#16a34a",
+                      height=38, corner_radius=8,
+                      command=self._save).pack(fill="x", padx=10, pady=14)
+
+    def _save(self):
+        try:
+            s = AccountManager.get_settings(self.account_id)
+            s.update({
+                "fuel_mode":       self._sv_fm.get(),
+                "fuel_threshold":  int(self._sv_ft.get()),
+                "fuel_min_cash":   int(self._sv_fc.get()),
+                "co2_mode":        self._sv_cm.get(),
+                "co2_threshold":   int(self._sv_ct.get()),
+                "co2_min_cash":    int(self._sv_cc.get()),
+                "auto_depart":     self._sv_ad.get(),
+                "check_interval":  int(self._sv_ci.get()),
+                "min_utilization": int(self._sv_mu.get()),
+                "low_util_action": self._sv_lua.get(),
+                "depart_concurrency": int(self._sv_dc.get()),
+                "depart_rate":     float(self._sv_dr.get()),
+                "api_direct":      self._sv_api.get(),
+                "log_buffer":      int(self._sv_lb.get()),
+            })
+            AccountManager.save_settings(self.account_id, s)
+            self.set_status("✅ Settings saved")
+        except ValueError as e:
+            self.set_status(f"❌ Bad value: {e}")
+
+    def _forget_login(self):
+        AccountManager.clear_credentials(self.account_id)
+        self.set_status("✅ Login cleared — will ask next launch")
+
+    # ── Callbacks (worker threads post, the UI bus applies) ───────────────────
+    def on_bunker(self, d):
+        self.bus.post(self.account_id, "bunker", d)
+
+    def on_prices(self, d):
+        self.bus.post(self.account_id, "prices", d)
+
+    def on_depart(self, entry):
+        # The log buffer is thread-safe; only the redraw waits for the bus
+        self.dlog.append(entry)
+        with self._session_lock:
+            self._session_departs += 1
+            self._session_income  += entry.get("income", 0)
+        self.bus.post(self.account_id, "departs", 1, merge=operator.add)
+
+    def set_status(self, msg):
+        self.bus.post(self.account_id, "status", msg)
+
+    def apply(self, field, value):
+        """Draw one coalesced update (Tk thread)."""
+        if field == "bunker":
+            d = value
+            self._v_fuel.set(f"{d.get('fuel',0):,.0f} / {d.get('maxFuel',0):,.0f} t")
+            self._v_co2.set( f"{d.get('co2', 0):,.0f} / {d.get('maxCO2', 0):,.0f} t")
+            self._v_cash.set(fmt_cash(d.get("cash", 0)))
+        elif field == "prices":
+            s = AccountManager.get_settings(self.account_id)
+            fp = value.get("fuelPrice"); cp = value.get("co2Price")
+            if fp is not None:
+                self._v_fp.set(f"${fp}/t")
+                self._lbl_fp.configure(
+                    text_color=C["green"] if fp <= s["fuel_threshold"] else C["red"])
+            if cp is not None:
+                self._v_cp.set(f"${cp}/t")
+                self._lbl_cp.configure(
+                    text_color=C["green"] if cp <= s["co2_threshold"] else C["red"])
+        elif field == "departs":
+            with self._session_lock:
+                departs, income = self._session_departs, self._session_income
+            if departs:
+                self._v_session.set(f"{departs} departure(s)  •  +${income:,}")
+            self._log_view.added(value)
+        elif field == "status":
+            self._status_var.set(value)
+            self._show_activity()
+
+    def _show_activity(self, lines: int = ACTIVITY_LINES):
+        """Fill the Activity box from the log sink's in-memory tail."""
+        pattern = self._v_grep.get().strip()
+        try:
+            recs = (LOGS.grep(pattern, self.account_id, lines) if pattern
+                    else LOGS.tail(self.account_id, lines))
+        except re.error as e:
+            recs = [{"ts": time.time(), "msg": f"❌ Bad filter: {e}"}]
+        text = "\n".join(
+            f"{datetime.datetime.fromtimestamp(r['ts']).strftime('%H:%M:%S')}  {r['msg']}"
+            for r in reversed(recs))
+        self._activity.configure(state="normal")
+        self._activity.delete("1.0", "end")
+        self._activity.insert("1.0", text)
+        self._activity.configure(state="disabled")
+
+    def _on_log(self, rec):
+        if rec["source"] == self.account_id:
+            self.set_status(rec["msg"])
+
+
+# ── MAIN DASHBOARD ────────────────────────────────────────────────────────────
+class PirateBrowserDashboard:
+    def __init__(self, workers: bool = False):
+        self.root = ctk.CTk()
+        self.root.title("Pirate Browser")
+        self.root.geometry("380x900+0+0")
+        self.root.resizable(False, True)
+        self.root.configure(fg_color=C["bg"])
+        self.root.protocol("WM_DELETE_WINDOW", self._on_close)
+        self._account_tabs: dict[str, AccountTab] = {}
+        self._browsers:     dict[str, BrowserController] = {}
+        self._managers:     dict[str, AutoManager] = {}
+        self._acct_buttons: dict[str, ctk.CTkButton] = {}
+        self._pool = BrowserPool(lambda m: LOGS.emit("browser", m))
+        # Worker mode: each account's controller + manager run in their own process
+        self._workers = WorkerSupervisor(self._on_worker_event) if workers else None
+        self._build()
+
+    def _build(self):
+        # Header
+        hdr = ctk.CTkFrame(self.root, fg_color=C["panel"], height=54, corner_radius=0)
+        hdr.pack(fill="x"); hdr.pack_propagate(False)
+        ctk.CTkLabel(hdr, text="🏴‍☠️  PIRATE BROWSER",
+                     font=("Segoe UI", 13, "bold"),
+                     text_color=C["accent"]).place(relx=0.4, rely=0.5, anchor="center")
+        ctk.CTkButton(hdr, text="+ Account", font=("Segoe UI", 9),
+                      width=80, height=26, corner_radius=6,
+                      fg_color=C["border"], hover_color=C["card"],
+                      text_color=C["text"],
+                      command=self._add_account_dialog).place(relx=0.82, rely=0.5, anchor="center")
+
+        # Top-level nav (Accounts | Chatbot)
+        nav = ctk.CTkFrame(self.root, fg_color=C["panel"], height=32, corner_radius=0)
+        nav.pack(fill="x")
+        nav.pack_propagate(False)
+        self._nav_accounts_btn = ctk.CTkButton(
+            nav, text="⚓ Accounts", font=("Segoe UI", 10),
+            width=100, height=28, corner_radius=0,
+            fg_color=C["border"], hover_color=C["border"], text_color=C["accent"],
+            command=self._show_accounts)
+        self._nav_accounts_btn.pack(side="left", padx=1)
+        self._nav_bot_btn = ctk.CTkButton(
+            nav, text="🤖 Chatbot", font=("Segoe UI", 10),
+            width=100, height=28, corner_radius=0,
+            fg_color="transparent", hover_color=C["border"], text_color=C["dim"],
+            command=self._show_chatbot)
+        self._nav_bot_btn.pack(side="left", padx=1)
+
+        # Account tab bar
+        self._acct_bar = ctk.CTkFrame(self.root, fg_color=C["panel"],
+                                       height=32, corner_radius=0)
+        self._acct_bar.pack(fill="x")
+
+        # Content area
+        self._content = ctk.CTkFrame(self.root, fg_color=C["bg"], corner_radius=0)
+        self._content.pack(fill="both", expand=True)
+
+        # Chatbot panel (hidden initially)
+        self._chatbot_panel = ctk.CTkFrame(self.root, fg_color=C["bg"], corner_radius=0)
+        self._chatbot_tab_widget: ChatBotTab = None
+
+        # No accounts placeholder
+        self._placeholder = ctk.CTkLabel(
+            self._content,
+            text="No accounts yet.\nClick '+ Account' to add one.",
+            font=("Segoe UI", 12), text_color=C["dim"], justify="center")
+        self._placeholder.place(relx=0.5, rely=0.5, anchor="center")
+
+        # Browser command queue footer
+        self._browser_stats_var = tk.StringVar(value="")
+        ctk.CTkLabel(self.root, textvariable=self._browser_stats_var,
+                     font=("Consolas", 8), text_color=C["muted"],
+                     anchor="w").pack(side="bottom", fill="x", padx=8)
+
+        self._active_account_id = None
+        self._ui_bus = UiBus(self.root)
+
+    def _add_account_dialog(self):
+        popup = ctk.CTkToplevel(self.root)
+        popup.title("Add Account")
+        popup.geometry("320x180")
+        popup.resizable(False, False)
+        popup.configure(fg_color="#0a0f1e")
+        popup.grab_set()
+
+        ctk.CTkLabel(popup, text="Account Name",
+                     font=("Segoe UI", 11), text_color=C["dim"]).pack(pady=(20, 4))
+        name_var = tk.StringVar()
+        entry = ctk.CTkEntry(popup, textvariable=name_var,
+                             placeholder_text="e.g. Main Account",
+                             font=("Segoe UI", 11), height=36,
+                             fg_color=C["card"], text_color=C["text"],
+                             border_color=C["border"])
+        entry.pack(fill="x", padx=20)
+        entry.focus()
+
+        def _confirm():
+            name = name_var.get().strip()
+            if not name:
+                return
+            popup.destroy()
+            account = AccountManager.add_account(name)
+            self._launch_account(account)
+
+        ctk.CTkButton(popup, text="Add & Login",
+                      font=("Segoe UI", 11, "bold"),
+                      fg_color=C["accent"], hover_color="#0a9bd0",
+                      height=36, corner_radius=8,
+                      command=_confirm).pack(fill="x", padx=20, pady=12)
+        popup.bind("<Return>", lambda e: _confirm())
+
+    def _launch_account(self, account: dict):
+        aid   = account["id"]
+        email, password = AccountManager.load_credentials(aid)
+
+        # Show login dialog if no saved creds
+        if not email or not password:
+            creds = [None, None]
+            def on_login(em, pw, remember):
+                creds[0] = em; creds[1] = pw
+                if remember:
+                    AccountManager.save_credentials(aid, em, pw)
+            submitted = show_login_dialog(self.root, account["name"], on_login)
+            if not submitted or not creds[0]:
+                AccountManager.remove_account(aid)
+                return
+            email, password = creds[0], creds[1]
+
+        if self._workers:
+            browser = manager = WorkerHandle(self._workers, aid)
+        else:
+            # The pool places the account's tab when browser.start() runs below
+            browser = BrowserController(
+                lambda m, a=account: self._log(a, m), aid, self._pool)
+            manager = AutoManager(
+                browser     = browser,
+                account_id  = aid,
+                log_fn      = lambda m, a=account: self._log(a, m),
+                on_bunker   = lambda d, a=aid: self._on_bunker(a, d),
+                on_prices   = lambda d, a=aid: self._on_prices(a, d),
+                on_depart   = lambda d, a=aid: self._on_depart(a, d),
+            )
+
+        self._browsers[aid] = browser
+        self._managers[aid] = manager
+
+        # Add account button to tab bar
+        btn = ctk.CTkButton(
+            self._acct_bar, text=account["name"],
+            font=("Segoe UI", 10), height=28, corner_radius=0,
+            fg_color="transparent", hover_color=C["border"],
+            text_color=C["dim"],
+            command=lambda a=aid: self._switch_account(a))
+        btn.pack(side="left", padx=1)
+        self._acct_buttons[aid] = btn
+
+        # Remove button (right-click)
+        def _remove(event, a=aid, b=btn):
+            if ctk.CTkInputDialog(text=f"Remove account '{account['name']}'?",
+                                  title="Confirm").get_input() is not None:
+                self._remove_account(a, b)
+        btn.bind("<Button-3>", _remove)
+
+        # Build account tab content
+        tab = AccountTab(self._content, account, browser, manager, self._ui_bus)
+        self._account_tabs[aid] = tab
+
+        self._placeholder.place_forget()
+        self._switch_account(aid)
+
+        if self._workers:
+            self._workers.start(account, email, password)
+            return
+
+        # Start browser + manager
+        def _start():
+            browser.start()
+            if browser.ready and email and password:
+                self._log(account, "🔐 Attempting auto-login…")
+                if browser.auto_login(email, password):
+                    self._log(account, "✅ Auto-login successful")
+                else:
+                    self._log(account, "⚠ Auto-login failed — please log in manually")
+            manager.start()
+
+        ORCH.submit(_start, lane="login")
+
+    def _switch_account(self, account_id: str):
+        self._active_account_id = account_id
+        self._ui_bus.set_active(account_id)
+        for aid, tab in self._account_tabs.items():
+            if aid == account_id:
+                tab.pack(fill="both", expand=True)
+            else:
+                tab.pack_forget()
+        # Update tab button colours
+        for aid, btn in self._acct_buttons.items():
+            match = aid == account_id
+            btn.configure(
+                text_color=C["accent"] if match else C["dim"],
+                fg_color=C["border"] if match else "transparent")
+
+    def _remove_account(self, account_id: str, btn):
+        if account_id in self._managers:
+            self._managers[account_id].stop()
+        if account_id in self._browsers:
+            self._browsers[account_id].close()
+        if account_id in self._account_tabs:
+            self._account_tabs[account_id].destroy()
+            del self._account_tabs[account_id]
+        AccountManager.remove_account(account_id)
+        self._acct_buttons.pop(account_id, None)
+        btn.destroy()
+        del self._browsers[account_id]
+        del self._managers[account_id]
+        if not self._account_tabs:
+            self._placeholder.place(relx=0.5, rely=0.5, anchor="center")
+
+    def _show_accounts(self):
+        self._chatbot_panel.pack_forget()
+        self._acct_bar.pack(fill="x")
+        self._content.pack(fill="both", expand=True)
+        self._nav_accounts_btn.configure(fg_color=C["border"], text_color=C["accent"])
+        self._nav_bot_btn.configure(fg_color="transparent", text_color=C["dim"])
+        self._ui_bus.set_active(self._active_account_id)
+
+    def _show_chatbot(self):
+        self._ui_bus.set_active(None)
+        self._acct_bar.pack_forget()
+        self._content.pack_forget()
+        self._chatbot_panel.pack(fill="both", expand=True)
+        self._nav_bot_btn.configure(fg_color=C["border"], text_color=C["accent"])
+        self._nav_accounts_btn.configure(fg_color="transparent", text_color=C["dim"])
+        if self._chatbot_tab_widget is None and self._workers:
+            ctk.CTkLabel(self._chatbot_panel,
+                         text="The chatbot needs the browser in this process —\n"
+                              "start without --workers to use it",
+                         font=("Segoe UI", 12), text_color=C["dim"]).place(
+                relx=0.5, rely=0.5, anchor="center")
+        elif self._chatbot_tab_widget is None and self._browsers:
+            first_aid = next(iter(self._browsers))
+            self._chatbot_tab_widget = ChatBotTab(
+                self._chatbot_panel, self._browsers[first_aid], first_aid)
+            self._chatbot_tab_widget.pack(fill="both", expand=True)
+        elif self._chatbot_tab_widget is None:
+            ctk.CTkLabel(self._chatbot_panel,
+                         text="Add an account first to use the chatbot",
+                         font=("Segoe UI", 12), text_color=C["dim"]).place(
+                relx=0.5, rely=0.5, anchor="center")
+
+    def _log(self, account: dict, msg: str):
+        LOGS.emit(account["id"], msg)
+
+    def _on_bunker(self, account_id: str, data: dict):
+        if account_id in self._account_tabs:
+            self._account_tabs[account_id].on_bunker(data)
+
+    def _on_prices(self, account_id: str, data: dict):
+        if account_id in self._account_tabs:
+            self._account_tabs[account_id].on_prices(data)
+
+    def _on_depart(self, account_id: str, entry: dict):
+        if account_id in self._account_tabs:
+            self._account_tabs[account_id].on_depart(entry)
+
+    def _on_worker_event(self, kind: str, account_id: str, payload):
+        handler = {"bunker": self._on_bunker, "prices": self._on_prices,
+                   "depart": self._on_depart}.get(kind)
+        if handler:
+            handler(account_id, payload)
+
+    def _on_close(self):
+        for manager in self._managers.values():
+            manager.stop()
+        self._pool.close()
+        if self._workers:
+            self._workers.close()
+        ORCH.close()
+        LOGS.close()
+        self.root.destroy()
+
+    def run(self):
+        threading.Thread(target=self._check_updates, daemon=True).start()
+        # Auto-launch saved accounts
+        accounts = AccountManager.load_accounts()
+        if accounts:
+            for account in accounts:
+                self.root.after(100, lambda a=account: self._launch_account(a))
+        self.root.after(2000, self._update_browser_stats)
+        self._ui_bus.start()
+        self.root.mainloop()
+
+    def _update_browser_stats(self):
+        if self._workers:
+            ws = self._workers.stats()
+            self._browser_stats_var.set(
+                f"Workers {sum(w['alive'] for w in ws)}/{len(ws)} alive"
+                f"  •  {sum(w['restarts'] for w in ws)} restart(s)"
+                f"  •  UI {self._ui_bus.applied} drawn / {self._ui_bus.dropped} coalesced")
+        ready = [b for b in self._pool.stats() if b["ready"]]
+        if ready:
+            load = "  |  ".join(
+                f"#{b['number']} {b['accounts']} acct, q{b['queued']},"
+                f" p95 {b['wait_p95_ms']:.0f}ms" for b in ready)
+            self._browser_stats_var.set(
+                f"Browsers {load}  •  UI {self._ui_bus.applied} drawn / {self._ui_bus.dropped} coalesced")
+        self.root.after(2000, self._update_browser_stats)
+
+    def _check_updates(self):
+        time.sleep(3)
+        latest, url = check_for_updates()
+        if latest and version_tuple(latest) > version_tuple(CURRENT_VERSION):
+            self.root.after(0, lambda: show_update_dialog(latest))
+
+
+# ── CHATBOT TAB ───────────────────────────────────────────────────────────────
+class ChatBotTab(ctk.CTkFrame):
+    """Dashboard tab for managing the alliance chatbot."""
+
+    def __init__(self, parent, browser: BrowserController, account_id: str, **kw):
+        super().__init__(parent, fg_color=C["bg"], corner_radius=0, **kw)
+        self.browser     = browser
+        self.account_id  = account_id
+        self.bot: AllianceChatBot = None
+        self._status_var  = tk.StringVar(value="Bot offline")
+        self._alliance_id = None
+        self._bot_user_id = None
+        self._build()
+        LOGS.subscribe(self._on_log)
+
+    def _on_log(self, rec):
+        if rec["source"] == "chatbot":
+            self.after(0, lambda: self._status_var.set(rec["msg"]))
+
+    def _build(self):
+        # Sub-tabs
+        tab_bar = ctk.CTkFrame(self, fg_color=C["panel"], height=32, corner_radius=0)
+        tab_bar.pack(fill="x")
+        tab_bar.pack_propagate(False)
+        self._pages    = {}
+        self._tab_btns = {}
+        for tid, label in [("control","🤖 Bot"), ("commands","📜 Commands"), ("log","💬 Chat Log")]:
+            b = ctk.CTkButton(tab_bar, text=label, font=("Segoe UI", 10),
+                              width=100, height=28, corner_radius=0,
+                              fg_color="transparent", hover_color=C["border"],
+                              text_color=C["dim"],
+                              command=lambda t=tid: self._show(t))
+            b.pack(side="left", padx=1)
+            self._tab_btns[tid] = b
+
+        self._content = ctk.CTkFrame(self, fg_color=C["bg"], corner_radius=0)
+        self._content.pack(fill="both", expand=True)
+
+        self._build_control()
+        self._build_commands()
+        self._build_log()
+        self._show("control")
+
+        ctk.CTkLabel(self, textvariable=self._status_var,
+                     font=("Consolas", 9), text_color=C["dim"],
+                     anchor="w").pack(fill="x", padx=8, pady=2)
+
+    def _show(self, tab_id):
+        for tid, page in self._pages.items():
+            if tid == tab_id:
+                page.pack(fill="both", expand=True)
+                self._tab_btns[tid].configure(text_color=C["accent"], fg_color=C["border"])
+            else:
+                page.pack_forget()
+                self._tab_btns[tid].configure(text_color=C["dim"], fg_color="transparent")
+
+    def _build_control(self):
+        page = ctk.CTkScrollableFrame(self._content, fg_color=C["bg"],
+                                       scrollbar_button_color=C["border"])
+        self._pages["control"] = page
+
+        # Status card
+        status_card = ctk.CTkFrame(page, fg_color=C["card"], corner_radius=10)
+        status_card.pack(fill="x", padx=10, pady=10)
+        ctk.CTkLabel(status_card, text="🤖  Alliance Chatbot",
+                     font=("Segoe UI", 13, "bold"),
+                     text_color=C["accent"]).pack(pady=(12, 2))
+        self._status_lbl = ctk.CTkLabel(status_card, textvariable=self._status_var,
+                                         font=("Segoe UI", 10), text_color=C["dim"])
+        self._status_lbl.pack(pady=(0, 12))
+
+        # Alliance ID input
+        f = ctk.CTkFrame(page, fg_color=C["card"], corner_radius=8)
+        f.pack(fill="x", padx=10, pady=2)
+        ctk.CTkLabel(f, text="Alliance ID", font=("Segoe UI", 10),
+                     text_color=C["text"]).pack(side="left", padx=10, pady=7)
+        self._sv_aid = tk.StringVar(value="6338")
+        ctk.CTkEntry(f, textvariable=self._sv_aid, width=90,
+                     font=("Consolas", 10), fg_color=C["border"],
+                     text_color=C["text"], border_color=C["border"]).pack(
+            side="right", padx=10, pady=5)
+
+        # Separator
+        ctk.CTkFrame(page, fg_color=C["border"], height=1).pack(
+            fill="x", padx=10, pady=8)
+
+        # Welcome message editor
+        ctk.CTkLabel(page, text="WELCOME MESSAGE",
+                     font=("Segoe UI", 8, "bold"),
+                     text_color=C["muted"], anchor="w").pack(fill="x", padx=12)
+        ctk.CTkLabel(page, text="Use {company} for the new member's name",
+                     font=("Segoe UI", 9), text_color=C["dim"],
+                     anchor="w").pack(fill="x", padx=12, pady=(2, 4))
+        self._welcome_text = ctk.CTkTextbox(page, height=80, font=("Segoe UI", 10),
+                                             fg_color=C["card"], text_color=C["text"],
+                                             border_color=C["border"], border_width=1)
+        self._welcome_text.pack(fill="x", padx=10, pady=(0, 8))
+        self._welcome_text.insert("1.0", WELCOME_MESSAGE)
+
+        # Buttons
+        self._start_btn = ctk.CTkButton(
+            page, text="▶  Start Bot",
+            font=("Segoe UI", 11, "bold"),
+            fg_color=C["green"], hover_color="#16a34a",
+            height=38, corner_radius=8,
+            command=self._start_bot)
+        self._start_btn.pack(fill="x", padx=10, pady=3)
+
+        self._stop_btn = ctk.CTkButton(
+            page, text="⏹  Stop Bot",
+            font=("Segoe UI", 11, "bold"),
+            fg_color=C["red"], hover_color="#b91c1c",
+            height=38, corner_radius=8,
+            state="disabled",
+            command=self._stop_bot)
+        self._stop_btn.pack(fill="x", padx=10, pady=3)
+
+        ctk.CTkButton(page, text="📢  Send !ports Now",
+                      font=("Segoe UI", 10),
+                      fg_color=C["border"], hover_color=C["card"],
+                      text_color=C["text"], height=32, corner_radius=8,
+                      command=self._send_ports_now).pack(fill="x", padx=10, pady=3)
+
+    def _build_commands(self):
+        page = ctk.CTkFrame(self._content, fg_color=C["bg"], corner_radius=0)
+        self._pages["commands"] = page
+
+        ctk.CTkLabel(page, text="Custom Commands",
+                     font=("Segoe UI", 12, "bold"),
+                     text_color=C["accent"]).pack(pady=(12, 2))
+        ctk.CTkLabel(page, text="Members type !command in chat to trigger a response",
+                     font=("Segoe UI", 9), text_color=C["dim"]).pack(pady=(0, 8))
+
+        # Add new command
+        add_frame = ctk.CTkFrame(page, fg_color=C["card"], corner_radius=8)
+        add_frame.pack(fill="x", padx=10, pady=4)
+        ctk.CTkLabel(add_frame, text="Command (with !) — add aliases after commas",
+                     font=("Segoe UI", 9), text_color=C["dim"],
+                     anchor="w").pack(fill="x", padx=10, pady=(8, 2))
+        self._sv_cmd = tk.StringVar()
+        ctk.CTkEntry(add_frame, textvariable=self._sv_cmd,
+                     placeholder_text="!example, !ex",
+                     font=("Segoe UI", 10), height=32,
+                     fg_color=C["border"], text_color=C["text"],
+                     border_color=C["border"]).pack(fill="x", padx=10, pady=(0, 4))
+        ctk.CTkLabel(add_frame, text="Response text",
+                     font=("Segoe UI", 9), text_color=C["dim"],
+                     anchor="w").pack(fill="x", padx=10, pady=(4, 2))
+        self._cmd_response = ctk.CTkTextbox(
+            add_frame, height=60, font=("Segoe UI", 10),
+            fg_color=C["border"], text_color=C["text"],
+            border_color=C["border"], border_width=1)
+        self._cmd_response.pack(fill="x", padx=10, pady=(0, 4))
+        ctk.CTkButton(add_frame, text="➕  Add Command",
+                      font=("Segoe UI", 10, "bold"),
+                      fg_color=C["accent"], hover_color="#0a9bd0",
+                      height=32, corner_radius=6,
+                      command=self._add_command).pack(fill="x", padx=10, pady=(0, 10))
+
+        # Existing commands list
+        ctk.CTkLabel(page, text="SAVED COMMANDS",
+                     font=("Segoe UI", 8, "bold"),
+                     text_color=C["muted"], anchor="w").pack(fill="x", padx=12, pady=(8, 2))
+        self._cmd_list = ctk.CTkScrollableFrame(
+            page, fg_color=C["bg"], scrollbar_button_color=C["border"])
+        self._cmd_list.pack(fill="both", expand=True, padx=6, pady=4)
+        self._refresh_cmd_list()
+
+    def _build_log(self):
+        page = ctk.CTkFrame(self._content, fg_color=C["bg"], corner_radius=0)
+        self._pages["log"] = page
+        hdr = ctk.CTkFrame(page, fg_color="transparent")
+        hdr.pack(fill="x", padx=10, pady=6)
+        ctk.CTkLabel(hdr, text="CHAT LOG", font=("Segoe UI", 8, "bold"),
+                     text_color=C["muted"]).pack(side="left")
+        ctk.CTkButton(hdr, text="Clear", font=("Segoe UI", 9), width=48, height=22,
+                      fg_color=C["red"], hover_color="#b91c1c", text_color="white",
+                      corner_radius=4,
+                      command=self._clear_log).pack(side="right")
+        self._log_scroll = ctk.CTkScrollableFrame(
+            page, fg_color=C["bg"], scrollbar_button_color=C["border"])
+        self._log_scroll.pack(fill="both", expand=True, padx=6)
+
+    def _clear_log(self):
+        for w in self._log_scroll.winfo_children():
+            w.destroy()
+
+    def _add_log_entry(self, entry: dict):
+        def _do():
+            ts   = datetime.datetime.fromtimestamp(
+                entry.get("ts", time.time())).strftime("%H:%M:%S")
+            row  = ctk.CTkFrame(self._log_scroll, fg_color=C["card"], corner_radius=6)
+            row.pack(fill="x", pady=2)
+            if entry["type"] == "join":
+                text = f"👋 {entry['company']} joined"
+                col  = C["green"]
+            else:
+                text = entry.get("text", "")
+                col  = C["text"]
+            ctk.CTkLabel(row, text=f"[{ts}] {text}",
+                         font=("Segoe UI", 9), text_color=col,
+                         anchor="w", wraplength=320).pack(
+                fill="x", padx=8, pady=4)
+        self.after(0, _do)
+
+    def _refresh_cmd_list(self):
+        for w in self._cmd_list.winfo_children():
+            w.destroy()
+        commands = load_custom_commands()
+        if not commands:
+            ctk.CTkLabel(self._cmd_list, text="No custom commands yet",
+                         font=("Segoe UI", 10), text_color=C["dim"]).pack(pady=10)
+            return
+        for cmd, value in commands.items():
+            response = value.get("response", "") if isinstance(value, dict) else value
+            aliases  = (value.get("aliases") or []) if isinstance(value, dict) else []
+            row = ctk.CTkFrame(self._cmd_list, fg_color=C["card"], corner_radius=6)
+            row.pack(fill="x", pady=2)
+            ctk.CTkLabel(row, text=", ".join([cmd, *aliases]), font=("Consolas", 10, "bold"),
+                         text_color=C["accent"]).pack(side="left", padx=10, pady=6)
+            preview = response[:40] + "…" if len(response) > 40 else response
+            ctk.CTkLabel(row, text=preview, font=("Segoe UI", 9),
+                         text_color=C["dim"]).pack(side="left", padx=4)
+            ctk.CTkButton(row, text="✕", width=28, height=24,
+                          font=("Segoe UI", 9),
+                          fg_color=C["red"], hover_color="#b91c1c",
+                          text_color="white", corner_radius=4,
+                          command=lambda c=cmd: self._delete_command(c)
+                          ).pack(side="right", padx=6, pady=4)
+
+    def _add_command(self):
+        names    = [n.strip().lower() for n in self._sv_cmd.get().split(",") if n.strip()]
+        names    = [n if n.startswith("!") else "!" + n for n in names]
+        response = self._cmd_response.get("1.0", "end").strip()
+        if not names or not response:
+            self._status_var.set("⚠ Enter both command and response")
+            return
+        cmd, aliases = names[0], names[1:]
+        commands = load_custom_commands()
+        commands[cmd] = {"response": response, "aliases": aliases} if aliases else response
+        save_custom_commands(commands)   # also reloads the bot's command table
+        self._sv_cmd.set("")
+        self._cmd_response.delete("1.0", "end")
+        self._refresh_cmd_list()
+        self._status_var.set(f"✅ Command {cmd} saved")
+
+    def _delete_command(self, cmd: str):
+        commands = load_custom_commands()
+        commands.pop(cmd, None)
+        save_custom_commands(commands)   # also reloads the bot's command table
+        self._refresh_cmd_list()
+        self._status_var.set(f"🗑 Command {cmd} removed")
+
+    def _start_bot(self):
+        try:
+            alliance_id = int(self._sv_aid.get().strip())
+        except ValueError:
+            self._status_var.set("⚠ Invalid Alliance ID")
+            return
+
+        # Get bot user ID from browser
+        def _do():
+            uid = self.browser.user_id()
+            self._bot_user_id = uid
+            self._alliance_id = alliance_id
+            self.bot = AllianceChatBot(
+                browser      = self.browser,
+                alliance_id  = alliance_id,
+                bot_user_id  = uid,
+                log_fn       = lambda m: LOGS.emit("chatbot", m),
+                on_chat_message = self._add_log_entry,
+                welcome_message = self._welcome_text.get("1.0", "end").strip(),
+            )
+            self.bot.start()
+            self.after(0, lambda: [
+                self._start_btn.configure(state="disabled"),
+                self._stop_btn.configure(state="normal"),
+                self._status_var.set(f"✅ Bot running — watching alliance {alliance_id}"),
+                self._status_lbl.configure(text_color=C["green"]),
+            ])
+        ORCH.submit(_do, lane="chat")
+
+    def _stop_bot(self):
+        if self.bot:
+            self.bot.stop()
+            self.bot = None
+        self._start_btn.configure(state="normal")
+        self._stop_btn.configure(state="disabled")
+        self._status_var.set("Bot offline")
+        self._status_lbl.configure(text_color=C["dim"])
+
+    def _send_ports_now(self):
+        if not self.bot:
+            self._status_var.set("⚠ Start the bot first")
+            return
+        ORCH.submit(self.bot._cmd_ports, [], lane="chat")
+
+
+# ── ENTRY POINT ───────────────────────────────────────────────────────────────
+def main(workers: bool = False):
+    dash = PirateBrowserDashboard(workers)
+    dash.run()
@@ -0,0 +1,219 @@
+"""
+Pirate Browser Trace Replay
+Feeds a trace recorded with `pirate_browser.py --trace` (traces/*.jsonl.gz)
+back through AutoManager offline, as fast as the decision logic runs.
+
+    python replay.py traces/abc-20260101-120000.jsonl.gz --out decisions.jsonl
+    python replay.py TRACE --baseline decisions.jsonl       # compare with an older run
+    python replay.py TRACE --settings what_if.json --profile
+
+Each recorded tick is re-run with its recorded settings (plus --settings
+overrides) and a simulated clock set to the recorded time. Game calls are answered
+from that tick's records: the same endpoint and payload if it was
+recorded, else the next unused call to that endpoint, else a failure. The
+decisions (purchases, departures, moorings) are written per tick.
+"""
+
+import argparse
+import collections
+import cProfile
+import json
+import os
+import pstats
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Replays must not touch the real accounts, settings or fleet caches
+os.environ["APPDATA"] = tempfile.mkdtemp(prefix="pirate-replay-")
+os.environ.pop("PIRATE_TRACE", None)
+sys.path.insert(0, str(Path(__file__).parent))
+
+import clock
+import pirate_browser as pb
+
+DECISION_PATHS = ("bunker/purchase-fuel", "bunker/purchase-co2", "route/depart", "vessel/moor")
+NOT_RECORDED   = {"ok": False, "status": 0, "error": "replay", "message": "not in trace"}
+
+
+# ── STUB CONTROLLER ───────────────────────────────────────────────────────────
+class StubController(pb.BrowserController):
+    """BrowserController whose transport answers from one tick's records.
+
+    Only the transport is replaced, so snapshot decoding, the fleet cache
+    and depart/purchase result parsing are the real code.
+    """
+
+    def __init__(self, account_id: str, sim: clock.SimClock):
+        super().__init__(lambda m: None, account_id, pool=None)
+        self.ready     = True
+        self.sim       = sim
+        self.decisions = []
+        self.served    = 0
+        self.missing   = collections.Counter()   # endpoint -> calls not in the trace
+
+    def load(self, records: list):
+        """Make `records` (one tick) the answers for the next calls."""
+        self._records = records
+        self._used    = set()
+        self._exact   = collections.defaultdict(collections.deque)
+        self._by_path = collections.defaultdict(collections.deque)
+        self._bunkers = collections.deque()
+        for i, r in enumerate(records):
+            if r["k"] == "api":
+                key = json.dumps(r.get("payload") or {}, sort_keys=True)
+                self._exact[(r["path"], key)].append(i)
+                self._by_path[r["path"]].append(i)
+            elif r["k"] == "bunker":
+                self._bunkers.append(i)
+        self.decisions = []
+
+    def _take(self, *queues):
+        for q in queues:
+            while q:
+                i = q.popleft()
+                if i not in self._used:
+                    self._used.add(i)
+                    self.sim.set_time(self._records[i]["t"])
+                    return self._records[i]
+        return None
+
+    # ── Transport ─────────────────────────────────────────────────────────────
+    def use_direct_api(self, enabled: bool, base_url: str = None) -> bool:
+        return bool(enabled)
+
+    def fetch_bunker(self):
+        r = self._take(self._bunkers)
+        return r["value"] if r else None
+
+    def api_batch(self, calls: list, timeout: float = None, with_bunker: bool = False,
+                  concurrency: int = None, interval: float = 0.0) -> dict:
+        results = []
+        for path, payload in calls:
+            payload = payload or {}
+            if path in DECISION_PATHS:
+                self.decisions.append([path, payload])
+            key = json.dumps(payload, sort_keys=True)
+            r   = self._take(self._exact[(path, key)], self._by_path[path])
+            if r:
+                self.served += 1
+                results.append(r["result"])
+            else:
+                self.missing[path] += 1
+                results.append(dict(NOT_RECORDED))
+        return {"bunker": self.fetch_bunker() if with_bunker else None, "results": results}
+
+
+# ── REPLAY ────────────────────────────────────────────────────────────────────
+def ticks(path: Path):
+    """(tick record, records until the next tick) pairs; also returns the header."""
+    header, tick, records, out = None, None, [], []
+    for r in pb.read_trace(path):
+        if r["k"] == "header":
+            header = r
+        elif r["k"] == "tick":
+            if tick:
+                out.append((tick, records))
+            tick, records = r, []
+        elif tick:
+            records.append(r)
+    if tick:
+        out.append((tick, records))
+    return header, out
+
+def replay(path: Path, overrides: dict = None, log=None) -> dict:
+    header, recorded = ticks(path)
+    if not recorded:
+        raise SystemExit(f"❌ No ticks in {path}")
+    account = (header or {}).get("account") or "replay"
+    real = clock.current()
+    sim  = clock.install(clock.SimClock(start=recorded[0][0]["t"]))
+    try:
+        controller = StubController(account, sim)
+        manager    = pb.AutoManager(controller, account, log or (lambda m: None),
+                                    on_bunker=lambda d: None, on_prices=lambda d: None,
+                                    on_depart=lambda d: None)
+        out = []
+        t0  = time.perf_counter()
+        for tick, records in recorded:
+            sim.set_time(tick["t"])
+            controller.load(records)
+            s = dict(tick["settings"], **(overrides or {}))
+            manager._settings = s
+            manager._tick(s, tick["fetch_prices"], tick["depart"])
+            out.append({"t": tick["t"], "decisions": controller.decisions})
+        wall = time.perf_counter() - t0
+    finally:
+        clock.install(real)
+    return {"account": account, "version": (header or {}).get("version"),
+            "ticks": out, "wall": wall, "served": controller.served,
+            "missing": dict(controller.missing)}
+
+def brief(decisions: list) -> str:
+    """One-line summary of a tick's decisions."""
+    parts, departs, moors = [], 0, 0
+    for path, payload in decisions:
+        if path == "route/depart":
+            departs += 1
+        elif path == "vessel/moor":
+            moors += 1
+        else:
+            kind = "fuel" if path.endswith("fuel") else "CO2"
+            parts.append(f"{kind} {payload.get('amount', 0) / 1000:,.0f}t")
+    if departs: parts.append(f"{departs} depart(s)")
+    if moors:   parts.append(f"{moors} moor(s)")
+    return ", ".join(parts) or "nothing"
+
+def compare(ticks_now: list, baseline: Path, show: int = 10) -> int:
+    """Print the ticks whose decisions differ from a previous --out file."""
+    before = [json.loads(line) for line in baseline.read_text(encoding="utf-8").splitlines()
+              if line.strip()]
+    old    = {round(t["t"], 3): t["decisions"] for t in before}
+    diffs  = [t for t in ticks_now if old.get(round(t["t"], 3)) != t["decisions"]]
+    print(f"🔎 {len(diffs)} of {len(ticks_now)} tick(s) decide differently from {baseline}")
+    for t in diffs[:show]:
+        stamp = time.strftime("%Y-%m-%d %H:%M:%S", time.gmtime(t["t"]))
+        print(f"   {stamp}  before: {brief(old.get(round(t['t'], 3)) or [])}")
+        print(f"   {' ' * len(stamp)}  now:    {brief(t['decisions'])}")
+    return len(diffs)
+
+
+# ── ENTRY POINT ───────────────────────────────────────────────────────────────
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Replay a Pirate Browser trace offline")
+    ap.add_argument("trace", type=Path)
+    ap.add_argument("--settings", type=Path, help="JSON settings to override in every tick")
+    ap.add_argument("--out", type=Path, help="write each tick's decisions here (JSONL)")
+    ap.add_argument("--baseline", type=Path, help="compare decisions with an earlier --out file")
+    ap.add_argument("--profile", action="store_true", help="profile the replay with cProfile")
+    ap.add_argument("--verbose", action="store_true", help="print the manager's log lines")
+    args = ap.parse_args(argv)
+
+    overrides = json.loads(args.settings.read_text(encoding="utf-8")) if args.settings else None
+    log       = print if args.verbose else None
+    if args.profile:
+        prof   = cProfile.Profile()
+        result = prof.runcall(replay, args.trace, overrides, log)
+    else:
+        result = replay(args.trace, overrides, log)
+
+    n         = len(result["ticks"])
+    decisions = sum(len(t["decisions"]) for t in result["ticks"])
+    print(f"✅ Replayed {n} tick(s) of {result['account']} (recorded by "
+          f"v{result['version']}) in {result['wall']:.2f}s — "
+          f"{n / result['wall'] if result['wall'] else 0:,.0f} ticks/s, {decisions} decision(s)")
+    if result["missing"]:
+        print(f"⚠ Calls not in the trace: {result['missing']}")
+    if args.out:
+        args.out.write_text("".join(json.dumps(t) + "\n" for t in result["ticks"]),
+                            encoding="utf-8")
+    code = 0
+    if args.baseline:
+        code = 1 if compare(result["ticks"], args.baseline) else 0
+    if args.profile:
+        pstats.Stats(prof).sort_stats("cumulative").print_stats(25)
+    return code
+
+if __name__ == "__main__":
+    sys.exit(main())
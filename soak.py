@@ -0,0 +1,159 @@
+"""
+Pirate Browser Soak Test
+Runs auto-managers, the alliance chatbot and the member tracker's hourly
+snapshots against an in-process mock game server on a simulated clock, so
+a month of operation passes in minutes.
+
+    python soak.py --days 30 --accounts 3 --vessels 20 --voyage-hours 6
+
+One line is printed per simulated day: real time taken, memory, the
+tracker's history size and schedule slip, the chatbot's dedupe memory,
+and how long vessels waited in port between arriving and departing again.
+"""
+
+import argparse
+import contextlib
+import os
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+# Soak accounts, settings and fleet caches stay out of the real data folder
+os.environ["APPDATA"] = tempfile.mkdtemp(prefix="pirate-soak-")
+os.environ.pop("PIRATE_TRACE", None)
+sys.path.insert(0, str(Path(__file__).parent))
+
+import clock
+import pirate_browser as pb
+import member_tracker as mt
+from benchmark import BENCH_SETTINGS, FakeDriver, make_controller, peak_rss_mb
+from mock_server import MockConfig, MockServer
+
+
+def rss_mb():
+    """Current resident memory (peak where /proc is not available)."""
+    try:
+        pages = int(Path("/proc/self/statm").read_text().split()[1])
+        return pages * os.sysconf("SC_PAGE_SIZE") / (1024 * 1024)
+    except (OSError, ValueError, AttributeError):
+        return peak_rss_mb()
+
+def metric_count(name: str) -> int:
+    """Samples recorded for a METRICS histogram, over all label sets."""
+    return sum(s.get("count", 0) for s in pb.METRICS.snapshot()["metrics"].get(name, []))
+
+
+# ── TRACKER ───────────────────────────────────────────────────────────────────
+class Tracker:
+    """member_tracker.main's fetch → add_snapshot → sleep loop, without the uploads."""
+
+    def __init__(self, base_url: str):
+        self.driver  = FakeDriver(base_url, "tracker")
+        self.history = []
+        self.taken   = 0      # snapshots taken (history is downsampled)
+        self.started = None
+
+    def run(self, stop: threading.Event):
+        interval     = mt.CHECK_INTERVAL_MINUTES * 60
+        self.started = next_run = int(clock.time())
+        while not stop.is_set():
+            now          = int(clock.time())
+            members      = mt.fetch_all_stats(self.driver)
+            self.history = mt.add_snapshot(self.history, members, now)
+            self.taken  += 1
+            next_run += interval
+            while next_run <= clock.time():
+                next_run += interval
+            clock.sleep(next_run - clock.time())
+
+    def slip(self) -> float:
+        """How far the latest snapshot is behind its hourly schedule (seconds)."""
+        if not self.taken:
+            return 0.0
+        due = self.started + (self.taken - 1) * mt.CHECK_INTERVAL_MINUTES * 60
+        return self.history[-1]["timestamp"] - due
+
+
+# ── ENTRY POINT ───────────────────────────────────────────────────────────────
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Pirate Browser soak test (simulated clock)")
+    ap.add_argument("--days", type=float, default=30, help="simulated days to run")
+    ap.add_argument("--accounts", type=int, default=3)
+    ap.add_argument("--vessels", type=int, default=20, help="vessels per account")
+    ap.add_argument("--voyage-hours", type=float, default=6, help="mean voyage length")
+    ap.add_argument("--members", type=int, default=40)
+    ap.add_argument("--chat-per-min", type=float, default=0.1, help="new chat messages per minute")
+    ap.add_argument("--no-chatbot", action="store_true")
+    ap.add_argument("--settle", type=float, default=0.1,
+                    help="real seconds a woken task may work before the clock moves on")
+    args = ap.parse_args(argv)
+
+    out  = sys.stdout
+    sim  = clock.install(clock.SimClock(settle=args.settle))
+    mock = MockServer(MockConfig(args.vessels, voyage_secs=args.voyage_hours * 3600,
+                                 members=args.members, chat_per_min=args.chat_per_min,
+                                 seed=1)).start()
+    game = mock.game
+
+    managers = []
+    for i in range(args.accounts):
+        aid = f"soak{i:03d}"
+        pb.STORE.set_settings(aid, BENCH_SETTINGS, persist=False)
+        c = make_controller(mock.base_url, aid)
+        c.is_logged_in = lambda: True
+        managers.append(pb.AutoManager(c, aid, lambda m: None, on_bunker=lambda d: None,
+                                       on_prices=lambda d: None, on_depart=lambda d: None))
+    bot = None
+    if not args.no_chatbot:
+        bot = pb.AllianceChatBot(make_controller(mock.base_url, "soakbot"), mt.ALLIANCE_ID,
+                                 bot_user_id=0, log_fn=lambda m: None,
+                                 on_chat_message=lambda e: None)
+    tracker = Tracker(mock.base_url)
+    stop    = threading.Event()
+    lag     = dict(game.lag)
+
+    print(f"⚙ {args.days:g} simulated day(s): {args.accounts} accounts × {args.vessels} vessels, "
+          f"{'chatbot, ' if bot else ''}hourly tracker snapshots", file=out)
+    print(f"\n{'day':>5}{'real s':>9}{'RSS MB':>9}{'history':>9}{'slip s':>8}"
+          f"{'cycles':>8}{'polls':>7}{'chat keys':>10}{'departs':>9}{'port wait':>11}{'wakes':>9}", file=out)
+    t0 = time.perf_counter()
+    with open(os.devnull, "w", encoding="utf-8") as devnull, contextlib.redirect_stdout(devnull):
+        for m in managers:
+            m.start()
+        if bot:
+            bot.start()
+        thread = threading.Thread(target=tracker.run, args=(stop,), daemon=True, name="tracker")
+        thread.start()
+        day, days = 0, int(args.days + 0.999)
+        try:
+            while day < days:
+                clock.sleep(min(1.0, args.days - day) * 86400)
+                day += 1
+                with game._lock:
+                    lag = dict(game.lag)
+                wait = lag["total"] / lag["count"] / 60 if lag["count"] else 0.0
+                print(f"{day:>5}{time.perf_counter() - t0:>9.1f}{rss_mb() or 0:>9.1f}"
+                      f"{len(tracker.history):>9}{tracker.slip():>8.0f}"
+                      f"{metric_count('pirate_cycle_seconds'):>8}"
+                      f"{metric_count('pirate_chat_poll_seconds'):>7}"
+                      f"{len(bot._seen) if bot else 0:>10}"
+                      f"{lag['count']:>9}{wait:>8.1f} min{sim.wakes:>9}", file=out, flush=True)
+        except KeyboardInterrupt:
+            pass
+        finally:
+            stop.set()
+            thread.join(5)   # the simulated clock wakes it straight away
+            for m in managers:
+                m.stop()
+            if bot:
+                bot.stop()
+            pb.ORCH.close()
+            mock.stop()
+    if lag["count"]:
+        print(f"\nLongest port wait: {lag['max'] / 60:.1f} min", file=out)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())